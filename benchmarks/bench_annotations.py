@@ -0,0 +1,78 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.lexer.lexer import Lexer
+from lib.parser.parser import Parser
+from lib.semantic.semantic_analyzer import SemanticAnalyzer
+from lib.codegen.codegen import CodeGenerator
+
+# Additions of numbers and strings in a hot loop.
+PROGRAM = """func sums(n: int): int {{
+    var total: int = 0;
+    var i: int = 0;
+    var ratio: float = 0.5;
+    loop {{
+        if (i >= n) {{
+            break;
+        }}
+        total = total + i * 2 + 1;
+        total += i;
+        ratio = ratio + i;
+        i += 1;
+    }}
+    return total;
+}}
+func label(n: int): str {{
+    var text: str = "";
+    var i: int = 0;
+    loop {{
+        if (i >= n) {{
+            break;
+        }}
+        text = "x" + i;
+        text += "y";
+        i += 1;
+    }}
+    return text;
+}}
+var total: int = sums({n});
+var text: str = label({n});
+"""
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Generated Python with and without type annotations")
+    args_parser.add_argument("--iterations", type=int, default=300_000, help="loop iterations of the program")
+    args_parser.add_argument("--repeat", type=int, default=3)
+    args = args_parser.parse_args()
+
+    prog = Parser(Lexer(PROGRAM.format(n=args.iterations)).tokenize_stream()).parse()
+    errors, annotations = SemanticAnalyzer().annotate(prog)
+    assert not errors, errors
+    results = []
+    print(f"{'':<12} {'_op_add calls':>13} {'run':>8}")
+    for name, table in (("dynamic", None), ("annotated", annotations)):
+        source = CodeGenerator().generate(prog, table)
+        code = compile(source, "<clash>", "exec")
+        env: dict[str, Any] = {}
+        seconds = best_of(args.repeat, lambda: exec(code, env))
+        results.append((env["total"], env["text"]))
+        print(f"{name:<12} {source.count('_op_add(') - 1:>13} {seconds:7.3f}s")
+    print(f"same results: {results[0] == results[1]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import gc
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import synthetic_program_of_size
+from lib.lexer.lexer import Lexer
+from lib.lexer.token_stream import TokenStream
+from lib.parser.parser import Parser
+from lib.parser.ast.base import Node
+from lib.parser.ast.serialize import FIELDS, FIRST_NODE, node_code
+from lib.semantic.semantic_analyzer import SemanticAnalyzer
+from lib.codegen.codegen import CodeGenerator
+
+
+def retained(build: Callable[[], Any]) -> tuple[Any, int]:
+    """What ``build`` returns, and the memory still allocated once it returned"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def walk(root: Node) -> int:
+    """Visit every node through its fields; the node count"""
+    count = 0
+    pending: list[Any] = [root]
+    while pending:
+        item = pending.pop()
+        if type(item) is list:
+            pending += item
+        elif isinstance(item, Node):
+            count += 1
+            pending += [getattr(item, name) for name in FIELDS[node_code(type(item)) - FIRST_NODE]]
+    return count
+
+
+def timed(fn: Callable[[], Any]) -> tuple[Any, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Object AST vs arena AST: memory and traversal speed")
+    args_parser.add_argument("--size", type=int, default=2_000_000, help="approximate source size in characters")
+    args = args_parser.parse_args()
+
+    code = synthetic_program_of_size(args.size)
+    stream: TokenStream = Lexer(code).tokenize_stream()
+    objects, objects_size = retained(lambda: Parser(stream).parse())
+    arena, arena_size = retained(lambda: Parser(stream).parse_arena())
+    views = arena.program()
+
+    print(f"source: {len(code):,} chars, {len(arena):,} nodes")
+    print(f"{'':<10} {'retained':>10} {'per node':>9} {'walk':>7} {'semantic':>9} {'codegen':>8}")
+    results = []
+    for name, prog, size in (("objects", objects, objects_size), ("arena", views, arena_size)):
+        nodes, walking = timed(lambda: walk(prog))
+        errors, semantic = timed(lambda: SemanticAnalyzer().analyze(prog))
+        generated, codegen = timed(lambda: CodeGenerator().generate(prog))
+        results.append((nodes, errors, generated))
+        print(f"{name:<10} {size / 2**20:6.1f} MiB {size / nodes:7.0f} B {walking:6.2f}s {semantic:8.2f}s {codegen:7.2f}s")
+    print(f"same nodes, diagnostics and generated code: {results[0] == results[1]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import sys
+import time
+import pickle
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import synthetic_program_of_size
+from lib.lexer.lexer import Lexer
+from lib.parser.parser import Parser
+from lib.parser.ast_cache import ASTCache
+from lib.parser.ast.serialize import to_bytes
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Lexing and parsing vs loading the AST from the on-disk cache")
+    args_parser.add_argument("--size", type=int, default=2_000_000, help="approximate source size in characters")
+    args_parser.add_argument("--repeat", type=int, default=3)
+    args = args_parser.parse_args()
+
+    code = synthetic_program_of_size(args.size)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ASTCache(directory)
+        parse = best_time(lambda: Parser(Lexer(code).tokenize()).parse(), args.repeat)
+        prog = Parser(Lexer(code).tokenize()).parse()
+        store = best_time(lambda: cache.store(code, prog), args.repeat)
+        load = best_time(lambda: cache.load(code, Lexer(code).source_map), args.repeat)
+        assert cache.load(code, Lexer(code).source_map) == prog
+        print(f"source: {len(code):,} chars")
+        print(f"{'lex + parse':<14} {parse:7.2f}s")
+        print(f"{'cache store':<14} {store:7.2f}s")
+        print(f"{'cache hit':<14} {load:7.2f}s  ({parse / load:.1f}x faster than lex + parse, includes hashing and the Lexer's source map)")
+        print(f"entry: {len(to_bytes(prog.declarations)) / 2**20:.1f} MiB, "
+              f"pickled dataclasses: {len(pickle.dumps(prog.declarations)) / 2**20:.1f} MiB")
+        print(cache.stats())
+
+if __name__ == "__main__":
+    main()
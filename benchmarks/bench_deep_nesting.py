@@ -0,0 +1,66 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.lexer.lexer import Lexer
+from lib.parser.parser import Parser
+from lib.semantic.semantic_analyzer import SemanticAnalyzer
+from lib.codegen.codegen import CodeGenerator
+
+# Each shape builds a program whose nesting depth is ``n``.
+SHAPES: dict[str, Callable[[int], str]] = {
+    "parentheses": lambda n: "var v: int = " + "(" * n + "1" + ")" * n + ";",
+    "unary minus": lambda n: "var v: int = " + "-(" * n + "1" + ")" * n + ";",
+    "lists": lambda n: "var v: int = len(" + "[" * n + "1" + "]" * n + ");",
+    "calls": lambda n: "func f(x: int): int { return x; }\nvar v: int = " + "f(" * n + "1" + ")" * n + ";",
+    "'+' chain": lambda n: "var v: int = " + " + ".join(["1"] * n) + ";",
+    "'**' chain": lambda n: "var v: int = " + " ** ".join(["1"] * n) + ";",
+    "blocks": lambda n: "func f(): void {" + "{" * n + "}" * n + "}",
+    "ifs": lambda n: "func f(): void {" + "if (true) {" * n + "}" * n + "}",
+}
+
+# The generated Python indents every level, so its size grows with depth².
+INDENTED = {"ifs"}
+MAX_INDENTED_DEPTH = 1000
+
+
+def timed(fn: Callable[[], object]) -> tuple[object, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def cell(fn: Callable[[], object]) -> tuple[Optional[object], str]:
+    try:
+        result, seconds = timed(fn)
+    except RecursionError:
+        return None, "RecursionError"
+    return result, f"{seconds:.3f}s"
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Parse, check and generate deeply nested programs")
+    args_parser.add_argument("--depths", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = args_parser.parse_args()
+
+    print(f"{'shape':<12} {'depth':>8} {'parse':>15} {'semantic':>15} {'codegen':>15}")
+    for name, shape in SHAPES.items():
+        for depth in args.depths:
+            code = shape(depth)
+            ast, parse_time = cell(lambda: Parser(Lexer(code).tokenize_stream()).parse())
+            semantic_time = codegen_time = "-"
+            if ast is not None:
+                errors, semantic_time = cell(lambda: SemanticAnalyzer().analyze(ast))
+                assert not errors, errors
+                if name in INDENTED and depth > MAX_INDENTED_DEPTH:
+                    codegen_time = "skipped"
+                else:
+                    _, codegen_time = cell(lambda: CodeGenerator().generate(ast))
+            print(f"{name:<12} {depth:>8,} {parse_time:>15} {semantic_time:>15} {codegen_time:>15}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.lexer.lexer import Lexer
+from lib.parser.parser import Parser
+from lib.parser.ast import program, expressions
+from lib.parser.ast.base import Node
+from lib.parser.ast.serialize import FIELDS, FIRST_NODE, node_code
+from lib.parser.ast.visitor import Visitor, visits
+from lib.semantic.semantic_analyzer import SemanticAnalyzer
+from lib.codegen.codegen import CodeGenerator
+from lib.codegen.llvm_codegen import LLVMCodeGenerator
+
+# Valid for the analyzer and within what the LLVM backend supports.
+FUNCTION_TEMPLATE = """func f{i}(a: int, b: float): int {{
+    var total: int = a * 2 + {i};
+    var ratio: float = b / 3.5 + total;
+    var flags: list[int] = [1, 2, a];
+    loop {{
+        if (total >= 100 && ratio < 2.0) {{
+            break;
+        }} elif (total == 7) {{
+            total += flags[1];
+        }} else {{
+            total = total + a * 5 + 1;
+        }}
+    }}
+    print(-total);
+    return total;
+}}
+var r{i}: int = f{i}({i}, 2.0);
+"""
+
+# The order the passes used to test expression classes in, one isinstance
+# check each.
+CHAIN = (
+    expressions.Identifier, expressions.IntLiteral, expressions.FloatLiteral,
+    expressions.StringLiteral, expressions.BoolLiteral, expressions.LiteralList,
+    expressions.StructLiteral, expressions.AssignExpr, expressions.BinaryOp,
+    expressions.UnaryOp, expressions.MemberAccess, expressions.ArrayAccess,
+    expressions.FuncCall,
+)
+
+
+class Classify(Visitor):
+    """The same answer as ``by_chain``, through a dispatch table"""
+
+    @visits("expression", *CHAIN)
+    def _expression(self, node: Node) -> type:
+        return type(node)
+
+
+def by_chain(node: Node) -> type:
+    if isinstance(node, expressions.Identifier):
+        return expressions.Identifier
+    if isinstance(node, expressions.IntLiteral):
+        return expressions.IntLiteral
+    if isinstance(node, expressions.FloatLiteral):
+        return expressions.FloatLiteral
+    if isinstance(node, expressions.StringLiteral):
+        return expressions.StringLiteral
+    if isinstance(node, expressions.BoolLiteral):
+        return expressions.BoolLiteral
+    if isinstance(node, expressions.LiteralList):
+        return expressions.LiteralList
+    if isinstance(node, expressions.StructLiteral):
+        return expressions.StructLiteral
+    if isinstance(node, expressions.AssignExpr):
+        return expressions.AssignExpr
+    if isinstance(node, expressions.BinaryOp):
+        return expressions.BinaryOp
+    if isinstance(node, expressions.UnaryOp):
+        return expressions.UnaryOp
+    if isinstance(node, expressions.MemberAccess):
+        return expressions.MemberAccess
+    if isinstance(node, expressions.ArrayAccess):
+        return expressions.ArrayAccess
+    if isinstance(node, expressions.FuncCall):
+        return expressions.FuncCall
+    raise TypeError(node)
+
+
+def nodes_of(prog: program.Program) -> list[Node]:
+    found: list[Node] = []
+    pending: list[Any] = [prog]
+    while pending:
+        item = pending.pop()
+        if type(item) is list:
+            pending += item
+        elif isinstance(item, Node):
+            found.append(item)
+            pending += [getattr(item, name) for name in FIELDS[node_code(type(item)) - FIRST_NODE]]
+    return found
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Per-node cost of dispatching on node classes")
+    args_parser.add_argument("--functions", type=int, default=2000, help="functions in the generated program")
+    args_parser.add_argument("--repeat", type=int, default=3)
+    args = args_parser.parse_args()
+
+    code = "".join(FUNCTION_TEMPLATE.format(i=i) for i in range(args.functions))
+    prog = Parser(Lexer(code).tokenize_stream()).parse()
+    nodes = nodes_of(prog)
+    exprs = [node for node in nodes if isinstance(node, expressions.Expression)]
+    print(f"{len(code):,} chars, {len(nodes):,} nodes, {len(exprs):,} expressions")
+
+    dispatch = Classify().dispatcher("expression", by_chain)
+    assert [dispatch(e) for e in exprs] == [by_chain(e) for e in exprs]
+    checks = sum(CHAIN.index(by_chain(e)) + 1 for e in exprs) / len(exprs)
+    chain = best_of(args.repeat, lambda: [by_chain(e) for e in exprs])
+    table = best_of(args.repeat, lambda: [dispatch(e) for e in exprs])
+    print(f"expression dispatch: isinstance chain {chain / len(exprs) * 1e9:.0f} ns/node "
+          f"({checks:.1f} checks on average), table {table / len(exprs) * 1e9:.0f} ns/node")
+
+    passes: dict[str, Callable[[], Any]] = {
+        "semantic": lambda: SemanticAnalyzer().analyze(prog),
+        "codegen": lambda: CodeGenerator().generate(prog),
+        "llvm": lambda: LLVMCodeGenerator().generate(prog),
+    }
+    for name, run in passes.items():
+        seconds = best_of(args.repeat, run)
+        print(f"{name:<9} {seconds:6.2f}s  {seconds / len(nodes) * 1e6:5.2f} us/node")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.lexer.lexer import Lexer
+from lib.parser.parser import Parser
+
+OPERATORS = ["||", "&&", "==", "!=", "<", "<=", ">", ">=", "+", "-", "*", "/", "%", "**"]
+OPERANDS = ["a", "b", "1", "2.5", "f(a)", "p.x", "xs[i]", "-a", "!b"]
+
+
+def expression_program(statements: int, operators: int, seed: int = 0) -> str:
+    """One assignment per line, each with ``operators`` binary operators, plus
+    as many single-literal statements (the cheapest expression to parse)"""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(statements):
+        parts = [rng.choice(OPERANDS)]
+        for _ in range(operators):
+            parts += [rng.choice(OPERATORS), rng.choice(OPERANDS)]
+        lines.append("x = " + " ".join(parts) + ";")
+        lines.append("1;")
+    return "\n".join(lines)
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Parse time of expression-heavy code")
+    args_parser.add_argument("--statements", type=int, default=20_000)
+    args_parser.add_argument("--operators", type=int, default=12)
+    args_parser.add_argument("--repeat", type=int, default=5)
+    args = args_parser.parse_args()
+
+    code = expression_program(args.statements, args.operators)
+    stream = Lexer(code).tokenize_stream()
+    print(f"source: {len(code):,} chars, {len(stream):,} tokens")
+
+    elapsed = best_time(lambda: Parser(stream).parse(), args.repeat)
+    print(f"parse {elapsed:.3f}s  ({elapsed / len(stream) * 1e9:.0f} ns/token)")
+
+
+if __name__ == "__main__":
+    main()
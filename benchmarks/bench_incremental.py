@@ -0,0 +1,73 @@
+import sys
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import FUNCTION_TEMPLATE, synthetic_program
+from lib.lexer.lexer import Lexer
+from lib.lexer.incremental import relex
+from lib.utils.error_handler import LexerError
+
+EDIT_CHARS = 'ab1 ."/;\n'
+
+
+def random_edit(rng: random.Random, code: str) -> tuple[int, int, str]:
+    """A single-character insertion, deletion or replacement"""
+    offset = rng.randrange(len(code))
+    kind = rng.choice(("insert", "delete", "replace"))
+    if kind == "insert":
+        return offset, 0, rng.choice(EDIT_CHARS)
+    if kind == "delete":
+        return offset, 1, ""
+    return offset, 1, rng.choice(EDIT_CHARS)
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Incremental relexing vs full relexing after one-character edits")
+    args_parser.add_argument("--lines", type=int, default=50_000)
+    args_parser.add_argument("--edits", type=int, default=200)
+    args_parser.add_argument("--seed", type=int, default=7)
+    args = args_parser.parse_args()
+
+    lines_per_function = FUNCTION_TEMPLATE.count("\n")
+    code = synthetic_program(args.lines // lines_per_function + 1)
+    stream = Lexer(code).tokenize_stream()
+    print(f"source: {code.count(chr(10)):,} lines, {len(code):,} chars, {len(stream):,} tokens")
+
+    rng = random.Random(args.seed)
+    full_times: list[float] = []
+    incremental_times: list[float] = []
+    skipped = 0
+    for _ in range(args.edits):
+        offset, removed, inserted = random_edit(rng, code)
+        edited = code[:offset] + inserted + code[offset + removed:]
+
+        start = time.perf_counter()
+        try:
+            full = Lexer(edited).tokenize_stream()
+        except LexerError:
+            skipped += 1
+            continue
+        full_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        incremental = relex(stream, offset, removed, inserted)
+        incremental_times.append(time.perf_counter() - start)
+
+        assert incremental.kinds == full.kinds and incremental.starts == full.starts, (offset, removed, inserted)
+        # Edits accumulate, like keystrokes in an editor.
+        code, stream = edited, incremental
+
+    print(f"{len(full_times)} edits ({skipped} skipped: they made the source lexically invalid)")
+    for label, times in (("full relex", full_times), ("incremental", incremental_times)):
+        print(f"{label:<12} median {statistics.median(times) * 1000:8.2f} ms   "
+              f"mean {statistics.mean(times) * 1000:8.2f} ms   max {max(times) * 1000:8.2f} ms")
+    print(f"speedup (median): {statistics.median(full_times) / statistics.median(incremental_times):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import sys
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import FUNCTION_TEMPLATE
+from lib.lexer.lexer import Lexer
+from lib.parser.parser import Parser
+from lib.semantic.semantic_analyzer import SemanticAnalyzer
+from lib.semantic.incremental import analyze_incrementally, reanalyze
+
+# Body edits of one function: a changed constant, a type error, a line
+# added (moving every later declaration down) and a changed signature
+# (which its caller depends on).
+EDITS = (
+    ("var total: int = a * 2 + {i};", "var total: int = a * 3 + {i};"),
+    ("var ratio: float = b / 3.5;", "var ratio: float = \"b\";"),
+    ("return total;", "total = total + 1;\n    return total;"),
+    ("func f{i}(a: int, b: float): int", "func f{i}(a: int, b: int): int"),
+)
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Incremental vs full semantic analysis after editing one function")
+    args_parser.add_argument("--lines", type=int, default=30_000)
+    args_parser.add_argument("--edits", type=int, default=40)
+    args_parser.add_argument("--seed", type=int, default=7)
+    args = args_parser.parse_args()
+
+    functions = [FUNCTION_TEMPLATE.format(i=i) for i in range(args.lines // FUNCTION_TEMPLATE.count("\n") + 1)]
+    prog = Parser(Lexer("".join(functions)).tokenize_stream()).parse()
+    state = analyze_incrementally(prog)
+    print(f"source: {sum(f.count(chr(10)) for f in functions):,} lines, {len(prog.declarations):,} top-level declarations")
+
+    rng = random.Random(args.seed)
+    full_times: list[float] = []
+    incremental_times: list[float] = []
+    checked: list[int] = []
+    for _ in range(args.edits):
+        i = rng.randrange(len(functions))
+        old, new = rng.choice(EDITS)
+        functions[i] = functions[i].replace(old.format(i=i), new.format(i=i), 1)
+        # Parsed again from scratch: only the analysis is timed.
+        prog = Parser(Lexer("".join(functions)).tokenize_stream()).parse()
+
+        start = time.perf_counter()
+        full = SemanticAnalyzer().analyze(prog)
+        full_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        state = reanalyze(state, prog)
+        incremental_times.append(time.perf_counter() - start)
+
+        assert state.errors == full
+        checked.append(state.checked)
+
+    print(f"{args.edits} edits, {statistics.mean(checked):.1f} declarations checked per edit on average, "
+          f"{len(state.errors)} errors at the end")
+    for label, times in (("full", full_times), ("incremental", incremental_times)):
+        print(f"{label:<12} median {statistics.median(times) * 1000:8.2f} ms   "
+              f"mean {statistics.mean(times) * 1000:8.2f} ms   max {max(times) * 1000:8.2f} ms")
+    print(f"speedup (median): {statistics.median(full_times) / statistics.median(incremental_times):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
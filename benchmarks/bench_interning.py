@@ -0,0 +1,65 @@
+import sys
+import time
+import argparse
+import tracemalloc
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import synthetic_program_of_size
+from lib.lexer.lexer import Lexer
+from lib.parser.parser import Parser
+from lib.parser.ast import expressions
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def identifier_names(node: Any, out: list[str]) -> list[str]:
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(item)
+        elif is_dataclass(item):
+            if isinstance(item, expressions.Identifier):
+                out.append(item.name)
+            stack.extend(getattr(item, f.name) for f in fields(item) if f.name != "source_map")
+    return out
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Memory and time of the AST built from identifier-heavy code")
+    args_parser.add_argument("--size", type=int, default=4_000_000, help="approximate source size in characters")
+    args_parser.add_argument("--repeat", type=int, default=3)
+    args = args_parser.parse_args()
+
+    code = synthetic_program_of_size(args.size)
+    print(f"source: {len(code):,} chars")
+
+    tracemalloc.start()
+    stream = Lexer(code).tokenize_stream()
+    before = tracemalloc.get_traced_memory()[0]
+    ast = Parser(stream).parse()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    names = identifier_names(ast, [])
+    print(f"AST retained {retained / 2**20:8.1f} MiB")
+    print(f"identifier occurrences {len(names):,}, distinct strings {len({id(n) for n in names}):,}, "
+          f"distinct names {len(set(names)):,}")
+
+    elapsed = best_time(lambda: Parser(Lexer(code).tokenize_stream()).parse(), args.repeat)
+    print(f"lex + parse {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
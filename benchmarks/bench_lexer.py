@@ -0,0 +1,78 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import synthetic_program_of_size
+from lib.lexer.lexer import ENGINES, Lexer
+from lib.lexer.dfa_compiler import load_dfa
+from lib.utils.error_handler import LexerError
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def lex_all(code: str, engine: str) -> int:
+    return sum(1 for _ in Lexer(code, engine=engine).tokenize())
+
+
+def report(label: str, code: str, repeat: int) -> None:
+    try:
+        tokens = lex_all(code, ENGINES[0])
+    except LexerError:
+        print(f"{label:<32} skipped (lexical error)")
+        return
+    for engine in ENGINES:
+        elapsed = best_time(lambda: lex_all(code, engine), repeat)
+        print(f"{label:<32} {engine:<6} {len(code):>9} chars {tokens:>8} tokens "
+              f"{len(code) / elapsed:>12,.0f} chars/s {tokens / elapsed:>11,.0f} tokens/s")
+
+
+def report_raw_scan(code: str, repeat: int) -> None:
+    """Longest-match scanning alone, without Token objects or positions"""
+    for engine in ENGINES:
+        lexer = Lexer(code, engine=engine)
+
+        def run() -> int:
+            scan, text, n = lexer.scan, lexer.code, lexer.n
+            i = count = 0
+            while i < n:
+                i, _ = scan(text, i, n)
+                count += 1
+            return count
+
+        lexemes = run()
+        elapsed = best_time(run, repeat)
+        print(f"{'synthetic (scan only)':<32} {engine:<6} {lexemes / elapsed:>12,.0f} lexemes/s")
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Lexer throughput benchmark")
+    args_parser.add_argument("--size", type=int, default=2_000_000, help="synthetic source size in chars")
+    args_parser.add_argument("--repeat", type=int, default=5)
+    args = args_parser.parse_args()
+
+    dfa = load_dfa()
+    print(f"DFA: {dfa.subset_states} subset-construction states -> {dfa.num_states} minimized "
+          f"(incl. dead state), {dfa.num_classes} character classes")
+
+    for path in sorted(EXAMPLES.rglob("*.clash")):
+        report(str(path.relative_to(EXAMPLES)), path.read_text(encoding="utf-8"), args.repeat)
+    synthetic = synthetic_program_of_size(args.size)
+    report("synthetic", synthetic, max(1, args.repeat // 2))
+    report_raw_scan(synthetic, max(1, args.repeat // 2))
+
+
+if __name__ == "__main__":
+    main()
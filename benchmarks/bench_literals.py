@@ -0,0 +1,56 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.lexer.lexer import Lexer
+from lib.parser.parser import Parser
+from lib.semantic.semantic_analyzer import SemanticAnalyzer
+
+STRUCT = "struct N { v: int, next: list[N] };\n"
+
+
+def deep_list(n: int) -> str:
+    """A list literal nested ``n`` levels deep, as an initializer and in an assignment"""
+    list_type = "list[" * n + "float" + "]" * n
+    literal = "[" * n + "1, 2.5" + "]" * n
+    return f"var d: {list_type} = {literal};\nd = {literal};\n"
+
+
+def wide_list(n: int) -> str:
+    """A list literal of ``n`` small lists, some of them empty"""
+    literal = "[" + ", ".join("[]" if i % 4 == 0 else f"[{i}, {i}.5]" for i in range(n)) + "]"
+    return f"var w: list[list[float]] = {literal};\nw = {literal};\n"
+
+
+def deep_struct(n: int) -> str:
+    """Struct literals nested ``n`` levels deep through a list field"""
+    literal = "".join(f"{{v: {i}, next: [" for i in range(n)) + "]}" * n
+    return f"{STRUCT}var s: N = {literal};\ns = {literal};\n"
+
+
+SHAPES = {"deep list": deep_list, "wide list": wide_list, "deep struct": deep_struct}
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Type checking time of nested and large literal initializers")
+    args_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 4000, 8000, 16000])
+    args_parser.add_argument("--repeat", type=int, default=5)
+    args = args_parser.parse_args()
+
+    for shape, make in SHAPES.items():
+        print(shape)
+        for n in args.sizes:
+            prog = Parser(Lexer(make(n)).tokenize_stream()).parse()
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                errors = SemanticAnalyzer().analyze(prog)
+                times.append(time.perf_counter() - start)
+            best = min(times)
+            print(f"  n={n:>6,}: best {best * 1000:8.2f}ms, {best / n * 1e6:6.2f}us per n, {len(errors)} errors")
+
+if __name__ == "__main__":
+    main()
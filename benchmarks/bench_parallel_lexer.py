@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import synthetic_program_of_size
+from lib.lexer.lexer import Lexer
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Sequential vs multi-process lexing of one large source")
+    args_parser.add_argument("--size", type=int, default=8_000_000, help="approximate source size in characters")
+    args_parser.add_argument("--workers", type=int, nargs="*", default=[2, 4, 8])
+    args = args_parser.parse_args()
+
+    code = synthetic_program_of_size(args.size)
+    print(f"source: {len(code):,} chars, {os.cpu_count()} CPUs available")
+
+    start = time.perf_counter()
+    sequential = Lexer(code).tokenize_stream()
+    baseline = time.perf_counter() - start
+    print(f"{'sequential':<14} {baseline:8.2f}s  {len(sequential):,} tokens")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        stream = Lexer(code).tokenize_parallel(workers)
+        elapsed = time.perf_counter() - start
+        identical = (stream.kinds, stream.starts, stream.lengths) == (
+            sequential.kinds, sequential.starts, sequential.lengths
+        )
+        print(f"{f'{workers} workers':<14} {elapsed:8.2f}s  speedup {baseline / elapsed:5.2f}x  identical={identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import synthetic_program
+from lib.lexer.lexer import Lexer
+from lib.parser.parser import Parser
+from lib.semantic.semantic_analyzer import SemanticAnalyzer
+from lib.semantic.parallel import analyze_parallel
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Sequential vs multi-process semantic analysis of many functions")
+    args_parser.add_argument("--functions", type=int, default=5000)
+    args_parser.add_argument("--workers", type=int, nargs="*", default=[2, 4, 8])
+    args = args_parser.parse_args()
+
+    code = synthetic_program(args.functions)
+    # One function in eight gets a type error, so there are errors to merge.
+    code = code.replace("var ratio: float = b / 3.5;", "var ratio: float = \"b\";", args.functions // 8)
+    prog = Parser(Lexer(code).tokenize_stream()).parse()
+    print(f"source: {code.count(chr(10)):,} lines, {args.functions:,} functions, {os.cpu_count()} CPUs available")
+
+    start = time.perf_counter()
+    sequential = SemanticAnalyzer().analyze(prog)
+    baseline = time.perf_counter() - start
+    print(f"{'sequential':<14} {baseline:8.2f}s  {len(sequential):,} errors")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        errors = analyze_parallel(prog, workers)
+        elapsed = time.perf_counter() - start
+        identical = errors == sequential
+        print(f"{f'{workers} workers':<14} {elapsed:8.2f}s  speedup {baseline / elapsed:5.2f}x  identical={identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import synthetic_program_of_size
+from lib.lexer.lexer import Lexer
+from lib.lexer.token_stream import TokenStream
+from lib.parser.parser import Parser
+
+MODES: dict[str, Callable[[Parser], object]] = {
+    "parse()": Parser.parse,
+    "recognize()": Parser.recognize,
+}
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Full parse vs syntax-only recognition over a compact token stream")
+    args_parser.add_argument("--size", type=int, default=2_000_000, help="approximate source size in characters")
+    args_parser.add_argument("--repeat", type=int, default=3)
+    args = args_parser.parse_args()
+
+    code = synthetic_program_of_size(args.size)
+    stream: TokenStream = Lexer(code).tokenize_stream()
+    lexing = best_time(lambda: Lexer(code).tokenize_stream(), args.repeat)
+    print(f"source: {len(code):,} chars, {len(stream):,} tokens (lexing {lexing:.2f}s)")
+    print(f"{'mode':<12} {'time':>8} {'tokens/s':>12} {'MB/s':>7} {'with lexing':>12}")
+    for name, mode in MODES.items():
+        seconds = best_time(lambda: mode(Parser(stream)), args.repeat)
+        total = lexing + seconds
+        print(f"{name:<12} {seconds:7.2f}s {len(stream) / seconds:12,.0f} {len(code) / seconds / 1e6:7.2f} {len(code) / total / 1e6:7.2f} MB/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import synthetic_program_of_size
+from lib.lexer.lexer import Lexer
+from lib.parser.parser import Parser
+from lib.utils.error_handler import ParserError
+
+SOURCES: dict[str, Callable[[str], object]] = {
+    "TokenStream": lambda code: Lexer(code).tokenize_stream(),
+    "list[Token]": lambda code: list(Lexer(code).tokenize()),
+    "iterator": lambda code: Lexer(code).tokenize(),
+}
+
+
+def parse(tokens: object) -> None:
+    try:
+        Parser(tokens).parse()
+    except ParserError:
+        pass
+
+
+def elapsed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def peak_memory(fn: Callable[[], object]) -> int:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Parsing from a materialized token list vs a lazy token iterator")
+    args_parser.add_argument("--size", type=int, default=2_000_000, help="approximate source size in characters")
+    args = args_parser.parse_args()
+
+    code = synthetic_program_of_size(args.size)
+    broken = "var x int;\n" + code
+    print(f"source: {len(code):,} chars")
+    print(f"{'tokens from':<14} {'lex+parse':>10} {'peak memory':>12} {'error on line 1':>16}")
+    for name, tokens in SOURCES.items():
+        total = elapsed(lambda: parse(tokens(code)))
+        peak = peak_memory(lambda: parse(tokens(code)))
+        error = elapsed(lambda: parse(tokens(broken)))
+        print(f"{name:<14} {total:9.2f}s {peak / 2**20:8.1f} MiB {error:15.4f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import synthetic_program_of_size
+from lib.lexer.lexer import Lexer
+from lib.parser.parser import Parser
+
+
+def measure(label: str, build: Callable[[], object]) -> object:
+    """Peak traced memory and time of ``build``, keeping its result alive"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} retained {current / 2**20:>8.1f} MiB  peak {peak / 2**20:>8.1f} MiB  ({elapsed:.2f}s traced)")
+    return result
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Memory of Token lists vs the compact TokenStream")
+    args_parser.add_argument("--tokens", type=int, default=1_000_000, help="approximate number of tokens")
+    args_parser.add_argument("--repeat", type=int, default=3)
+    args = args_parser.parse_args()
+
+    # The synthetic program averages a little over 4 characters per token.
+    code = synthetic_program_of_size(args.tokens * 41 // 10)
+    normalized = len(Lexer(code).code)
+    print(f"source: {len(code):,} chars ({normalized:,} after normalization)")
+
+    tokens = measure("list[Token]", lambda: list(Lexer(code).tokenize()))
+    print(f"{'':<28} {len(tokens):,} tokens")  # type: ignore[arg-type]
+    del tokens
+    stream = measure("TokenStream", lambda: Lexer(code).tokenize_stream())
+    print(f"{'':<28} {len(stream):,} tokens")  # type: ignore[arg-type]
+    del stream
+
+    list_time = best_time(lambda: Parser(list(Lexer(code).tokenize())).parse(), args.repeat)
+    stream_time = best_time(lambda: Parser(Lexer(code).tokenize_stream()).parse(), args.repeat)
+    print(f"lex + parse, list[Token]:  {list_time:.2f}s")
+    print(f"lex + parse, TokenStream:  {stream_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
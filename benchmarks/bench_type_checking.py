@@ -0,0 +1,72 @@
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.lexer.lexer import Lexer
+from lib.parser.parser import Parser
+from lib.semantic.semantic_analyzer import SemanticAnalyzer
+
+PRELUDE = """struct P { x: int, y: float };
+var i: int = 1; var f: float = 2.5; var s: str = "s"; var b: bool = true;
+var xs: list[int] = [1, 2]; var fs: list[list[float]] = [[1.0]]; var p: P = {x: 1, y: 2.0};
+"""
+
+# Operands of each type, and the operators that combine them.
+ATOMS = {
+    "int": ["i", "1", "xs[0]", "p.x", "len(xs)", "xs.length"],
+    "float": ["f", "2.5", "p.y", "fs[0][0]"],
+    "str": ["s", '"t"'],
+    "bool": ["b", "true"],
+}
+ARITHMETIC = ["+", "-", "*", "/", "%", "**"]
+COMPARISON = ["<", "<=", ">", ">=", "==", "!="]
+
+
+def expression(rng: random.Random, kind: str, depth: int) -> str:
+    if depth == 0:
+        return rng.choice(ATOMS[kind])
+    if kind == "bool":
+        if rng.random() < 0.5:
+            return f"({expression(rng, 'bool', depth - 1)} {rng.choice(['&&', '||'])} {expression(rng, 'bool', depth - 1)})"
+        operand = rng.choice(["int", "float"])
+        return f"({expression(rng, operand, depth - 1)} {rng.choice(COMPARISON)} {expression(rng, 'int', depth - 1)})"
+    if kind == "str":
+        return f"({expression(rng, 'str', depth - 1)} + {expression(rng, rng.choice(['int', 'str']), depth - 1)})"
+    other = "int" if kind == "int" else rng.choice(["int", "float"])
+    return f"({expression(rng, kind, depth - 1)} {rng.choice(ARITHMETIC)} {expression(rng, other, depth - 1)})"
+
+
+def program(statements: int, depth: int, seed: int = 0) -> str:
+    """Well-typed declarations whose initializers are operator trees of the given depth"""
+    rng = random.Random(seed)
+    lines = [PRELUDE]
+    for n in range(statements):
+        kind = rng.choice(list(ATOMS))
+        lines.append(f"var v{n}: {kind} = {expression(rng, kind, depth)};\n")
+    return "".join(lines)
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description="Type checking time on an expression-heavy program")
+    args_parser.add_argument("--statements", type=int, default=5000)
+    args_parser.add_argument("--depth", type=int, default=5, help="depth of each operator tree")
+    args_parser.add_argument("--repeat", type=int, default=5)
+    args = args_parser.parse_args()
+
+    code = program(args.statements, args.depth)
+    prog = Parser(Lexer(code).tokenize_stream()).parse()
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        errors = SemanticAnalyzer().analyze(prog)
+        times.append(time.perf_counter() - start)
+        assert not errors, errors[:3]
+    print(f"{args.statements:,} declarations, operator trees of depth {args.depth} ({len(code):,} chars)")
+    print(f"semantic analysis: best {min(times):.3f}s, median {sorted(times)[len(times) // 2]:.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+FUNCTION_TEMPLATE = """// helper number {i}
+func f{i}(a: int, b: float): int {{
+    var total: int = a * 2 + {i};
+    var ratio: float = b / 3.5;
+    var label: str = "item " + "number {i}";
+    var flags: list[bool] = [true, false, a > {i}];
+    loop {{
+        if (total >= 100 && ratio < 2.0) {{
+            break;
+        }} elif (total == 7) {{
+            total += 3;
+            continue;
+        }} else {{
+            total = total + a % 5 + 1;
+        }}
+    }}
+    return total;
+}}
+var r{i}: int = f{i}({i}, 2.0);
+"""
+
+
+def synthetic_program(functions: int = 1000) -> str:
+    """Lexically, syntactically and semantically valid Clash source of a given size"""
+    return "".join(FUNCTION_TEMPLATE.format(i=i) for i in range(functions))
+
+
+def synthetic_program_of_size(min_chars: int) -> str:
+    per_function = len(FUNCTION_TEMPLATE.format(i=0))
+    return synthetic_program(max(1, min_chars // per_function + 1))
@@ -1,13 +1,47 @@
+from typing import Optional, Sequence, Union
 from lib.parser.ast import program, declarations, statements, expressions, types
+from lib.parser.ast.visitor import Dispatch, Visitor, visits
+from lib.semantic.annotations import TypeAnnotations
+from lib.semantic.resolver import Resolution
+from lib.semantic.type_universe import FLOAT, INT, STR
 from lib.utils.error_handler import CodegenError
+from lib.utils.trampoline import Step, trampoline
 
-class CodeGenerator:
+# A piece of generated expression source: text, or a node still to generate.
+Piece = Union[str, expressions.Expression]
+
+# Module-level names the generated code defines or calls besides the
+# program's own globals; renamed locals must not capture them.
+GENERATED_NAMES = ("_op_add", "print", "len", "str")
+
+class CodeGenerator(Visitor):
     def __init__(self) -> None:
         self._indent: int = 0
         self._lines: list[str] = []
         self._structs: dict[str, list[str]] = {}
+        self._annotations: Optional[TypeAnnotations] = None
+        self._resolution: Optional[Resolution] = None
+        # Python name of each local slot of the frame being generated.
+        self._local_names: list[str] = []
+        self._gen_toplevel: Dispatch = self.dispatcher("toplevel", self._unknown_toplevel)
+        self._gen_stmt: Dispatch = self.dispatcher("statement", self._unknown_stmt)
+        self._expr_pieces: Dispatch = self.dispatcher("expression", self._unknown_expr)
 
-    def generate(self, prog: program.Program) -> str:
+    def generate(
+        self,
+        prog: program.Program,
+        annotations: Optional[TypeAnnotations] = None,
+        resolution: Optional[Resolution] = None
+    ) -> str:
+        """Python source for ``prog``. With the ``annotations`` of a program
+        that passed analysis, '+' between operands of known types is emitted
+        directly instead of through ``_op_add``. With its ``resolution``,
+        locals are named by slot, so a block's variable doesn't overwrite the
+        one it shadows."""
+        self._annotations = annotations
+        self._resolution = resolution
+        if resolution is not None:
+            self._local_names = self._slot_names(resolution.main, self._module_names())
         self._collect_structs(prog)
         self._lines = []
         self._emit("# Generated by Clash codegen")
@@ -24,11 +58,16 @@ class CodeGenerator:
         self._indent -= 1
         self._emit("")
         for node in prog.declarations:
-            self._gen_toplevel(node)
+            trampoline(self._gen_toplevel(node))
         return "\n".join(self._lines)
 
-    def run(self, prog: program.Program) -> dict[str, object]:
-        src = self.generate(prog)
+    def run(
+        self,
+        prog: program.Program,
+        annotations: Optional[TypeAnnotations] = None,
+        resolution: Optional[Resolution] = None
+    ) -> dict[str, object]:
+        src = self.generate(prog, annotations, resolution)
         env: dict[str, object] = {"__builtins__": __builtins__}
         exec(src, env, env)
         return env
@@ -42,43 +81,64 @@ class CodeGenerator:
     def _emit(self, line: str) -> None:
         self._lines.append(("    " * self._indent) + line)
 
-    def _gen_toplevel(self, node: object) -> None:
-        if isinstance(node, declarations.VarDecl):
-            self._gen_var_decl(node)
-        elif isinstance(node, declarations.FuncDecl):
-            self._gen_func_decl(node)
-        elif isinstance(node, declarations.StructDecl):
-            pass
-        elif isinstance(node, statements.Statement):
-            self._gen_stmt(node)
-        else:
-            line = getattr(node, "line", 0)
-            col = getattr(node, "col", 0)
-            raise CodegenError("Unknown top-level node", line, col)
+    def _unknown_toplevel(self, node: object) -> None:
+        line = getattr(node, "line", 0)
+        col = getattr(node, "col", 0)
+        raise CodegenError("Unknown top-level node", line, col)
 
+    @visits("toplevel", statements.Statement)
+    def _gen_toplevel_stmt(self, st: statements.Statement) -> Step[None]:
+        return self._gen_stmt(st)
+
+    @visits("toplevel", declarations.StructDecl)
+    def _skip_struct_decl(self, decl: declarations.StructDecl) -> None:
+        pass
+
+    @visits("toplevel", declarations.VarDecl)
+    @visits("statement", declarations.VarDecl)
     def _gen_var_decl(self, decl: declarations.VarDecl) -> None:
         target = self._gen_identifier(decl.name)
         if decl.initializer is not None:
-            if isinstance(decl.initializer, expressions.StructLiteral):
-                rhs = self._gen_struct_literal(decl.initializer)
-            elif isinstance(decl.initializer, expressions.LiteralList):
-                rhs = self._gen_list_literal(decl.initializer)
-            else:
-                rhs = self._gen_expr(decl.initializer)
-            self._emit(f"{target} = {rhs}")
+            self._emit(f"{target} = {self._gen_expr(decl.initializer)}")
             return
         default = self._default_value_for_type(decl.type_spec)
         self._emit(f"{target} = {default}")
 
-    def _gen_func_decl(self, func: declarations.FuncDecl) -> None:
+    @visits("toplevel", declarations.FuncDecl)
+    def _gen_func_decl(self, func: declarations.FuncDecl) -> Step[None]:
+        main_names = self._local_names
+        if self._resolution is not None:
+            self._local_names = self._slot_names(self._resolution.frame(func), self._module_names())
         params_src = ", ".join(self._gen_identifier(p.name) for p in func.params)
         self._emit(f"def {self._gen_identifier(func.name)}({params_src}):")
         self._indent += 1
-        self._gen_block(func.body, in_function=True)
+        yield self._gen_block(func.body, in_function=True)
         self._indent -= 1
         self._emit("")
+        self._local_names = main_names
 
-    def _gen_block(self, block: statements.BlockStmt, in_function: bool = False) -> None:
+    def _module_names(self) -> list[str]:
+        assert self._resolution is not None
+        return [*self._resolution.globals, *GENERATED_NAMES]
+
+    def _slot_names(self, names: list[str], outer: Sequence[str] = ()) -> list[str]:
+        """Python names for the local slots of a frame: a slot keeps its
+        declared name unless an earlier slot (or one of the ``outer``
+        names, in the same Python namespace) has it"""
+        taken = set(names) | set(outer)
+        seen = set(outer)
+        slot_names = []
+        for slot, name in enumerate(names):
+            if name in seen:
+                name = f"{name}_{slot}"
+                while name in taken:
+                    name += "_"
+                taken.add(name)
+            seen.add(name)
+            slot_names.append(name)
+        return slot_names
+
+    def _gen_block(self, block: statements.BlockStmt, in_function: bool = False) -> Step[None]:
         if not block.statements:
             if in_function:
                 self._emit("return None")
@@ -86,55 +146,66 @@ class CodeGenerator:
                 self._emit("pass")
             return
         for st in block.statements:
-            self._gen_stmt(st)
-
-    def _gen_stmt(self, st: statements.Statement) -> None:
-        if isinstance(st, declarations.VarDecl):
-            self._gen_var_decl(st)
-        elif isinstance(st, statements.ExpressionStmt):
-            if st.expression is not None:
-                if isinstance(st.expression, expressions.AssignExpr):
-                    self._gen_assign_stmt(st.expression)
-                else:
-                    self._emit(self._gen_expr(st.expression))
-        elif isinstance(st, statements.BlockStmt):
-            self._emit("")
-            self._emit("{")
-            self._emit("}")
-            self._gen_block(st)
-        elif isinstance(st, statements.ReturnStmt):
-            if st.value is None:
-                self._emit("return None")
+            yield self._gen_stmt(st)
+
+    def _unknown_stmt(self, st: statements.Statement) -> None:
+        line = getattr(st, "line", 0)
+        col = getattr(st, "col", 0)
+        raise CodegenError("Unknown statement", line, col)
+
+    @visits("statement", statements.ExpressionStmt)
+    def _gen_expression_stmt(self, st: statements.ExpressionStmt) -> None:
+        if st.expression is not None:
+            if isinstance(st.expression, expressions.AssignExpr):
+                self._gen_assign_stmt(st.expression)
             else:
-                self._emit(f"return {self._gen_expr(st.value)}")
-        elif isinstance(st, statements.BreakStmt):
-            self._emit("break")
-        elif isinstance(st, statements.ContinueStmt):
-            self._emit("continue")
-        elif isinstance(st, statements.LoopStmt):
-            self._emit("while True:")
+                self._emit(self._gen_expr(st.expression))
+
+    @visits("statement", statements.BlockStmt)
+    def _gen_nested_block(self, st: statements.BlockStmt) -> Step[None]:
+        self._emit("")
+        self._emit("{")
+        self._emit("}")
+        yield self._gen_block(st)
+
+    @visits("statement", statements.ReturnStmt)
+    def _gen_return_stmt(self, st: statements.ReturnStmt) -> None:
+        if st.value is None:
+            self._emit("return None")
+        else:
+            self._emit(f"return {self._gen_expr(st.value)}")
+
+    @visits("statement", statements.BreakStmt)
+    def _gen_break_stmt(self, st: statements.BreakStmt) -> None:
+        self._emit("break")
+
+    @visits("statement", statements.ContinueStmt)
+    def _gen_continue_stmt(self, st: statements.ContinueStmt) -> None:
+        self._emit("continue")
+
+    @visits("statement", statements.LoopStmt)
+    def _gen_loop_stmt(self, st: statements.LoopStmt) -> Step[None]:
+        self._emit("while True:")
+        self._indent += 1
+        yield self._gen_block(st.body)
+        self._indent -= 1
+
+    @visits("statement", statements.IfStmt)
+    def _gen_if_stmt(self, st: statements.IfStmt) -> Step[None]:
+        self._emit(f"if {self._gen_expr(st.condition)}:")
+        self._indent += 1
+        yield self._gen_block(st.then_branch)
+        self._indent -= 1
+        for br in st.elif_branches:
+            self._emit(f"elif {self._gen_expr(br.condition)}:")
             self._indent += 1
-            self._gen_block(st.body)
+            yield self._gen_block(br.body)
             self._indent -= 1
-        elif isinstance(st, statements.IfStmt):
-            self._emit(f"if {self._gen_expr(st.condition)}:")
+        if st.else_branch is not None:
+            self._emit("else:")
             self._indent += 1
-            self._gen_block(st.then_branch)
+            yield self._gen_block(st.else_branch)
             self._indent -= 1
-            for br in st.elif_branches:
-                self._emit(f"elif {self._gen_expr(br.condition)}:")
-                self._indent += 1
-                self._gen_block(br.body)
-                self._indent -= 1
-            if st.else_branch is not None:
-                self._emit("else:")
-                self._indent += 1
-                self._gen_block(st.else_branch)
-                self._indent -= 1
-        else:
-            line = getattr(st, "line", 0)
-            col = getattr(st, "col", 0)
-            raise CodegenError("Unknown statement", line, col)
 
     def _gen_assign_stmt(self, expr: expressions.AssignExpr) -> None:
         target = self._gen_lvalue(expr.target)
@@ -144,54 +215,102 @@ class CodeGenerator:
             self._emit(f"{target} = {value}")
             return
         if op == "+=":
-            self._emit(f"{target} = _op_add({target}, {value})")
+            addition = self._addition(expr.target, expr.value)
+            if addition == "+":
+                self._emit(f"{target} += {value}")
+            elif addition == "str":
+                self._emit(f"{target} = str({target}) + str({value})")
+            else:
+                self._emit(f"{target} = _op_add({target}, {value})")
             return
         self._emit(f"{target} {op} {value}")
 
     def _gen_expr(self, expr: expressions.Expression) -> str:
-        if isinstance(expr, expressions.IntLiteral):
-            return str(expr.value)
-        if isinstance(expr, expressions.FloatLiteral):
-            return str(expr.value)
-        if isinstance(expr, expressions.StringLiteral):
-            return expr.value
-        if isinstance(expr, expressions.BoolLiteral):
-            return "True" if expr.value else "False"
-        if isinstance(expr, expressions.Identifier):
-            return self._gen_identifier(expr)
-        if isinstance(expr, expressions.LiteralList):
-            return self._gen_list_literal(expr)
-        if isinstance(expr, expressions.StructLiteral):
-            return self._gen_struct_literal(expr)
-        if isinstance(expr, expressions.ArrayAccess):
-            return f"{self._gen_expr(expr.array)}[{self._gen_expr(expr.index)}]"
-        if isinstance(expr, expressions.MemberAccess):
-            return self._gen_member_access(expr)
-        if isinstance(expr, expressions.FuncCall):
-            return self._gen_call(expr)
-        if isinstance(expr, expressions.UnaryOp):
-            op = expr.op
-            if op == "!":
-                return f"(not {self._gen_expr(expr.right)})"
-            if op == "-":
-                return f"(-{self._gen_expr(expr.right)})"
-            raise CodegenError("Unknown unary operator", expr.line, expr.col)
-        if isinstance(expr, expressions.BinaryOp):
-            op = expr.op
-            left = self._gen_expr(expr.left)
-            right = self._gen_expr(expr.right)
-            if op == "&&":
-                return f"({left} and {right})"
-            if op == "||":
-                return f"({left} or {right})"
-            if op == "+":
-                return f"_op_add({left}, {right})"
-            return f"({left} {op} {right})"
-        if isinstance(expr, expressions.AssignExpr):
-            # Treated as statement; fallback for safety
-            return "None"
+        # Pieces still to write, last one first: text, or a node to expand in
+        # place. Neither recursion nor re-copying the text of every level, so
+        # deep nesting costs linear time.
+        out: list[str] = []
+        pending: list[Piece] = [expr]
+        while pending:
+            piece = pending.pop()
+            if isinstance(piece, str):
+                out.append(piece)
+                continue
+            pieces = self._expr_pieces(piece)
+            if len(pieces) == 1 and isinstance(pieces[0], str):
+                out.append(pieces[0])
+            else:
+                pending += reversed(pieces)
+        return "".join(out)
+
+    def _unknown_expr(self, expr: expressions.Expression) -> list[Piece]:
         raise CodegenError("Unknown expression", expr.line, expr.col)
 
+    @visits("expression", expressions.IntLiteral, expressions.FloatLiteral)
+    def _number_pieces(self, expr: Union[expressions.IntLiteral, expressions.FloatLiteral]) -> list[Piece]:
+        return [str(expr.value)]
+
+    @visits("expression", expressions.StringLiteral)
+    def _string_pieces(self, expr: expressions.StringLiteral) -> list[Piece]:
+        return [expr.value]
+
+    @visits("expression", expressions.BoolLiteral)
+    def _bool_pieces(self, expr: expressions.BoolLiteral) -> list[Piece]:
+        return ["True" if expr.value else "False"]
+
+    @visits("expression", expressions.Identifier)
+    def _identifier_pieces(self, expr: expressions.Identifier) -> list[Piece]:
+        return [self._gen_identifier(expr)]
+
+    @visits("expression", expressions.ArrayAccess)
+    def _array_access_pieces(self, expr: expressions.ArrayAccess) -> list[Piece]:
+        return [expr.array, "[", expr.index, "]"]
+
+    @visits("expression", expressions.UnaryOp)
+    def _unary_pieces(self, expr: expressions.UnaryOp) -> list[Piece]:
+        op = expr.op
+        if op == "!":
+            return ["(not ", expr.right, ")"]
+        if op == "-":
+            return ["(-", expr.right, ")"]
+        raise CodegenError("Unknown unary operator", expr.line, expr.col)
+
+    @visits("expression", expressions.BinaryOp)
+    def _binary_pieces(self, expr: expressions.BinaryOp) -> list[Piece]:
+        op = expr.op
+        if op == "&&":
+            return ["(", expr.left, " and ", expr.right, ")"]
+        if op == "||":
+            return ["(", expr.left, " or ", expr.right, ")"]
+        if op == "+":
+            addition = self._addition(expr.left, expr.right)
+            if addition == "str":
+                return ["(str(", expr.left, ") + str(", expr.right, "))"]
+            if addition is None:
+                return ["_op_add(", expr.left, ", ", expr.right, ")"]
+        return ["(", expr.left, f" {op} ", expr.right, ")"]
+
+    def _addition(self, left: expressions.Expression, right: expressions.Expression) -> Optional[str]:
+        """How ``left + right`` is emitted when the annotations give both
+        types: "+" for numbers or two strings, "str" when only one side is a
+        string (what ``_op_add`` would do); None when it's left to ``_op_add``"""
+        if self._annotations is None:
+            return None
+        left_t = self._annotations.get(left)
+        right_t = self._annotations.get(right)
+        if left_t is None or right_t is None:
+            return None
+        if left_t.id == STR or right_t.id == STR:
+            return "+" if left_t.id == right_t.id else "str"
+        if left_t.id in (INT, FLOAT) and right_t.id in (INT, FLOAT):
+            return "+"
+        return None
+
+    @visits("expression", expressions.AssignExpr)
+    def _assign_pieces(self, expr: expressions.AssignExpr) -> list[Piece]:
+        # Treated as statement; fallback for safety
+        return ["None"]
+
     def _gen_lvalue(self, expr: expressions.Expression) -> str:
         if isinstance(expr, expressions.Identifier):
             return self._gen_identifier(expr)
@@ -206,33 +325,47 @@ class CodeGenerator:
         raise CodegenError("Invalid assignment target", expr.line, expr.col)
 
     def _gen_identifier(self, ident: expressions.Identifier) -> str:
+        if self._resolution is not None:
+            binding = self._resolution.get(ident)
+            if binding is not None and not binding.is_global:
+                return self._local_names[binding.slot]
         return ident.name
 
-    def _gen_member_access(self, m: expressions.MemberAccess) -> str:
-        obj_src = self._gen_expr(m.obj)
+    @visits("expression", expressions.MemberAccess)
+    def _member_access_pieces(self, m: expressions.MemberAccess) -> list[Piece]:
         mem = m.member.name
         if mem == "length":
-            return f"len({obj_src})"
-        return f"{obj_src}[{repr(mem)}]"
+            return ["len(", m.obj, ")"]
+        return [m.obj, f"[{repr(mem)}]"]
 
-    def _gen_call(self, call: expressions.FuncCall) -> str:
+    @visits("expression", expressions.FuncCall)
+    def _call_pieces(self, call: expressions.FuncCall) -> list[Piece]:
         callee = call.callee
-        args_src = ", ".join(self._gen_expr(a) for a in call.arguments)
+        args = self._joined(call.arguments)
         if isinstance(callee, expressions.Identifier):
             if callee.name == "print":
-                return f"print({args_src})"
+                return ["print(", *args, ")"]
             if callee.name == "len":
-                return f"len({args_src})"
-            return f"{callee.name}({args_src})"
-        return f"{self._gen_expr(callee)}({args_src})"
+                return ["len(", *args, ")"]
+            return [f"{callee.name}(", *args, ")"]
+        return [callee, "(", *args, ")"]
+
+    @visits("expression", expressions.LiteralList)
+    def _list_literal_pieces(self, lit: expressions.LiteralList) -> list[Piece]:
+        return ["[", *self._joined(lit.elements), "]"]
 
-    def _gen_list_literal(self, lit: expressions.LiteralList) -> str:
-        elems = ", ".join(self._gen_expr(e) for e in lit.elements)
-        return f"[{elems}]"
+    @visits("expression", expressions.StructLiteral)
+    def _struct_literal_pieces(self, lit: expressions.StructLiteral) -> list[Piece]:
+        items: list[Piece] = []
+        for fi in lit.fields:
+            items += [", ", f"{repr(fi.name.name)}: ", fi.value]
+        return ["{", *items[1:], "}"]
 
-    def _gen_struct_literal(self, lit: expressions.StructLiteral) -> str:
-        items = ", ".join(f"{repr(fi.name.name)}: {self._gen_expr(fi.value)}" for fi in lit.fields)
-        return f"{{{items}}}"
+    def _joined(self, exprs: list[expressions.Expression]) -> list[Piece]:
+        pieces: list[Piece] = []
+        for e in exprs:
+            pieces += [", ", e]
+        return pieces[1:]
 
     def _default_value_for_type(self, t: types.TypeSpecifier) -> str:
         if isinstance(t, types.BaseType):
@@ -5,19 +5,37 @@
 # pyright: reportAssignmentType=false
 # pyright: reportArgumentType=false
 
+from typing import Optional
 from llvmlite import ir
 from llvmlite import binding as llvm
 from lib.parser.ast import program, declarations, statements, expressions, types
+from lib.parser.ast.visitor import Visitor, visits
+from lib.semantic.annotations import TypeAnnotations
+from lib.semantic.resolver import Resolution
+from lib.semantic.type_universe import FLOAT, INT, STR
 from lib.utils.error_handler import CodegenError
 
-class LLVMCodeGenerator:
+# Builder methods of the arithmetic operators, for int and float operands.
+INT_OPS = {"+": "add", "-": "sub", "*": "mul", "/": "sdiv"}
+FLOAT_OPS = {"+": "fadd", "-": "fsub", "*": "fmul", "/": "fdiv"}
+COMPARISONS = ("==", "!=", "<", "<=", ">", ">=")
+
+class LLVMCodeGenerator(Visitor):
     def __init__(self) -> None:
+        self.annotations: Optional[TypeAnnotations] = None
+        self.resolution: Optional[Resolution] = None
+        self._gen_stmt = self.dispatcher("statement", self._skip_stmt)
+        self._gen_expr = self.dispatcher("expression", self._unsupported_expr)
         self.module = ir.Module(name="clash_module")
         self.builder = None
         self.current_function = None
         
         self.globals = {}
         self.locals = {}
+        # With a resolution, variables are found by the slot of their
+        # binding in these tables instead of by name.
+        self.global_slots: list[Optional[ir.Value]] = []
+        self.slots: list[Optional[ir.Value]] = []
         self.structs = {}
         self.struct_fields = {}
         
@@ -58,8 +76,19 @@ class LLVMCodeGenerator:
         strcat_ty = ir.FunctionType(self.str_type, [self.str_type, self.str_type])
         self.strcat = ir.Function(self.module, strcat_ty, name="strcat")
 
-    def generate(self, prog: program.Program) -> str:
-        """Generate LLVM IR from AST"""
+    def generate(
+        self,
+        prog: program.Program,
+        annotations: Optional[TypeAnnotations] = None,
+        resolution: Optional[Resolution] = None
+    ) -> str:
+        """Generate LLVM IR from AST; the ``annotations`` of the analysis, if
+        given, pick the operations instead of the types of the IR values, and
+        its ``resolution`` keeps variables in slot tables sized up front"""
+        self.annotations = annotations
+        self.resolution = resolution
+        if resolution is not None:
+            self.global_slots = [None] * len(resolution.globals)
         self._collect_structs(prog)
         
         for node in prog.declarations:
@@ -140,6 +169,7 @@ class LLVMCodeGenerator:
         global_var.initializer = initializer
         global_var.linkage = 'internal'
         self.globals[decl.name.name] = global_var
+        self._bind_slot(decl.name, global_var)
 
     def _declare_function(self, func: declarations.FuncDecl) -> None:
         """Declare a function signature"""
@@ -153,6 +183,7 @@ class LLVMCodeGenerator:
             llvm_func.args[i].name = param.name.name
         
         self.globals[func.name.name] = llvm_func
+        self._bind_slot(func.name, llvm_func)
 
     def _gen_function_body(self, func: declarations.FuncDecl) -> None:
         """Generate function body"""
@@ -163,12 +194,14 @@ class LLVMCodeGenerator:
         self.builder = ir.IRBuilder(entry_block)
         
         self.locals = {}
+        if self.resolution is not None:
+            self.slots = [None] * len(self.resolution.frame(func))
         
         for i, param in enumerate(func.params):
             param_type = self._get_llvm_type(param.type_spec)
             param_alloca = self.builder.alloca(param_type, name=param.name.name)
             self.builder.store(llvm_func.args[i], param_alloca)
-            self.locals[param.name.name] = param_alloca
+            self._bind_local(param.name, param_alloca)
         
         self._gen_block(func.body, is_function=True)
         
@@ -191,6 +224,8 @@ class LLVMCodeGenerator:
         entry_block = main_func.append_basic_block(name="entry")
         self.builder = ir.IRBuilder(entry_block)
         self.locals = {}
+        if self.resolution is not None:
+            self.slots = [None] * len(self.resolution.main)
         
         for stmt in statements:
             self._gen_stmt(stmt)
@@ -206,33 +241,36 @@ class LLVMCodeGenerator:
         for stmt in block.statements:
             self._gen_stmt(stmt)
 
-    def _gen_stmt(self, stmt: statements.Statement) -> None:
-        """Generate code for a statement"""
-        if isinstance(stmt, declarations.VarDecl):
-            self._gen_local_var(stmt)
-        elif isinstance(stmt, statements.ExpressionStmt):
-            if stmt.expression:
-                self._gen_expr(stmt.expression)
-        elif isinstance(stmt, statements.ReturnStmt):
-            if stmt.value:
-                ret_val = self._gen_expr(stmt.value)
-                self.builder.ret(ret_val)
-            else:
-                self.builder.ret_void()
-        elif isinstance(stmt, statements.IfStmt):
-            self._gen_if_stmt(stmt)
-        elif isinstance(stmt, statements.LoopStmt):
-            self._gen_loop_stmt(stmt)
-        elif isinstance(stmt, statements.BreakStmt):
-            pass
-        elif isinstance(stmt, statements.ContinueStmt):
-            pass
+    def _skip_stmt(self, stmt: statements.Statement) -> None:
+        """Break, continue and unknown statements generate nothing"""
+
+    @visits("statement", statements.ExpressionStmt)
+    def _gen_expression_stmt(self, stmt: statements.ExpressionStmt) -> None:
+        """Generate code for an expression statement"""
+        if stmt.expression:
+            self._gen_expr(stmt.expression)
+
+    @visits("statement", statements.ReturnStmt)
+    def _gen_return_stmt(self, stmt: statements.ReturnStmt) -> None:
+        """Generate code for return statement"""
+        if stmt.value:
+            ret_val = self._gen_expr(stmt.value)
+            self.builder.ret(ret_val)
+        else:
+            self.builder.ret_void()
 
+    @visits("statement", declarations.VarDecl)
     def _gen_local_var(self, decl: declarations.VarDecl) -> None:
         """Generate code for local variable declaration"""
         llvm_type = self._get_llvm_type(decl.type_spec)
-        alloca = self.builder.alloca(llvm_type, name=decl.name.name)
-        self.locals[decl.name.name] = alloca
+        binding = self.resolution.get(decl.name) if self.resolution is not None else None
+        if binding is not None and binding.is_global:
+            # A top-level declaration run by main: initialize the global
+            # itself, which functions see, rather than a local copy.
+            alloca = self.global_slots[binding.slot]
+        else:
+            alloca = self.builder.alloca(llvm_type, name=decl.name.name)
+            self._bind_local(decl.name, alloca)
         
         if decl.initializer:
             value = self._gen_expr(decl.initializer)
@@ -242,6 +280,7 @@ class LLVMCodeGenerator:
             default_val = self._default_value(llvm_type)
             self.builder.store(default_val, alloca)
 
+    @visits("statement", statements.IfStmt)
     def _gen_if_stmt(self, stmt: statements.IfStmt) -> None:
         """Generate code for if statement"""
         cond = self._gen_expr(stmt.condition)
@@ -269,6 +308,7 @@ class LLVMCodeGenerator:
         
         self.builder.position_at_end(merge_block)
 
+    @visits("statement", statements.LoopStmt)
     def _gen_loop_stmt(self, stmt: statements.LoopStmt) -> None:
         """Generate code for loop statement"""
         loop_header = self.current_function.append_basic_block("loop.header")
@@ -287,47 +327,33 @@ class LLVMCodeGenerator:
         
         self.builder.position_at_end(loop_exit)
 
-    def _gen_expr(self, expr: expressions.Expression) -> ir.Value:
-        """Generate code for an expression"""
-        if isinstance(expr, expressions.IntLiteral):
-            return ir.Constant(self.int_type, expr.value)
-        
-        elif isinstance(expr, expressions.FloatLiteral):
-            return ir.Constant(self.float_type, expr.value)
-        
-        elif isinstance(expr, expressions.BoolLiteral):
-            return ir.Constant(self.bool_type, 1 if expr.value else 0)
-        
-        elif isinstance(expr, expressions.StringLiteral):
-            return self._create_string_constant(expr.value)
-        
-        elif isinstance(expr, expressions.Identifier):
-            return self._load_variable(expr.name)
-        
-        elif isinstance(expr, expressions.BinaryOp):
-            return self._gen_binary_op(expr)
-        
-        elif isinstance(expr, expressions.UnaryOp):
-            return self._gen_unary_op(expr)
-        
-        elif isinstance(expr, expressions.FuncCall):
-            return self._gen_call(expr)
-        
-        elif isinstance(expr, expressions.AssignExpr):
-            return self._gen_assignment(expr)
-        
-        elif isinstance(expr, expressions.ArrayAccess):
-            return self._gen_array_access(expr)
-        
-        elif isinstance(expr, expressions.MemberAccess):
-            return self._gen_member_access(expr)
-        
-        elif isinstance(expr, expressions.LiteralList):
-            return self._gen_list_literal(expr)
-        
-        else:
-            raise CodegenError(f"Unsupported expression: {type(expr)}")
+    def _unsupported_expr(self, expr: expressions.Expression) -> ir.Value:
+        """Expressions without a handler"""
+        raise CodegenError(f"Unsupported expression: {type(expr)}")
+
+    @visits("expression", expressions.IntLiteral)
+    def _gen_int_literal(self, expr: expressions.IntLiteral) -> ir.Value:
+        return ir.Constant(self.int_type, expr.value)
+
+    @visits("expression", expressions.FloatLiteral)
+    def _gen_float_literal(self, expr: expressions.FloatLiteral) -> ir.Value:
+        return ir.Constant(self.float_type, expr.value)
 
+    @visits("expression", expressions.BoolLiteral)
+    def _gen_bool_literal(self, expr: expressions.BoolLiteral) -> ir.Value:
+        return ir.Constant(self.bool_type, 1 if expr.value else 0)
+
+    @visits("expression", expressions.StringLiteral)
+    def _gen_string_literal(self, expr: expressions.StringLiteral) -> ir.Value:
+        """Generate code for a string literal"""
+        return self._create_string_constant(expr.value)
+
+    @visits("expression", expressions.Identifier)
+    def _gen_identifier(self, expr: expressions.Identifier) -> ir.Value:
+        """Generate code for reading a variable"""
+        return self.builder.load(self._variable(expr))
+
+    @visits("expression", expressions.LiteralList)
     def _gen_list_literal(self, expr: expressions.LiteralList) -> ir.Value:
         """Generate code for list literal [1, 2, 3]"""
         if not expr.elements:
@@ -389,6 +415,7 @@ class LLVMCodeGenerator:
         
         return left, right
 
+    @visits("expression", expressions.BinaryOp)
     def _gen_binary_op(self, expr: expressions.BinaryOp) -> ir.Value:
         """Generate code for binary operation"""
         left = self._gen_expr(expr.left)
@@ -396,6 +423,10 @@ class LLVMCodeGenerator:
         
         op = expr.op
         
+        typed = self._gen_typed_binary_op(expr, left, right)
+        if typed is not None:
+            return typed
+        
         if op == "+":
             if isinstance(left.type, ir.PointerType) or isinstance(right.type, ir.PointerType):
                 return self._gen_string_concat(left, right)
@@ -470,6 +501,42 @@ class LLVMCodeGenerator:
         else:
             raise CodegenError(f"Unsupported binary operator: {op}")
 
+    def _gen_typed_binary_op(self, expr: expressions.BinaryOp, left: ir.Value, right: ir.Value) -> Optional[ir.Value]:
+        """Generate code for a binary operation whose operand types are annotated;
+        None if they aren't (or the operation isn't arithmetic or a comparison)"""
+        if self.annotations is None:
+            return None
+        left_t = self.annotations.get(expr.left)
+        right_t = self.annotations.get(expr.right)
+        if left_t is None or right_t is None:
+            return None
+        op = expr.op
+        if op == "+" and STR in (left_t.id, right_t.id):
+            return self._gen_string_concat(left, right)
+        if op not in INT_OPS and op not in COMPARISONS:
+            return None
+        if not (self._is_ir_of(left, left_t.id) and self._is_ir_of(right, right_t.id)):
+            # '**' is lowered to a double even where the analysis says int.
+            return None
+        is_float = FLOAT in (left_t.id, right_t.id)
+        if is_float:
+            if left_t.id == INT:
+                left = self.builder.sitofp(left, self.float_type)
+            if right_t.id == INT:
+                right = self.builder.sitofp(right, self.float_type)
+        if op in COMPARISONS:
+            if is_float:
+                return self.builder.fcmp_ordered(op, left, right)
+            return self.builder.icmp_signed(op, left, right)
+        method = FLOAT_OPS[op] if is_float else INT_OPS[op]
+        return getattr(self.builder, method)(left, right)
+
+    def _is_ir_of(self, value: ir.Value, type_id: int) -> bool:
+        """Whether ``value`` is the IR of a number annotated ``type_id``"""
+        if type_id == INT:
+            return value.type == self.int_type
+        return type_id == FLOAT and value.type == self.float_type
+
     def _gen_string_concat(self, left: ir.Value, right: ir.Value) -> ir.Value:
         """Generate code for string concatenation"""
         left_str = self._to_string(left)
@@ -540,6 +607,7 @@ class LLVMCodeGenerator:
         else:
             return ir.Constant(llvm_type, None)
 
+    @visits("expression", expressions.UnaryOp)
     def _gen_unary_op(self, expr: expressions.UnaryOp) -> ir.Value:
         """Generate code for unary operation"""
         operand = self._gen_expr(expr.right)
@@ -547,6 +615,9 @@ class LLVMCodeGenerator:
         if expr.op == "!":
             return self.builder.not_(operand)
         elif expr.op == "-":
+            operand_t = self.annotations.get(expr.right) if self.annotations is not None else None
+            if operand_t is not None and self._is_ir_of(operand, operand_t.id):
+                return self.builder.neg(operand) if operand_t.id == INT else self.builder.fneg(operand)
             if isinstance(operand.type, ir.IntType):
                 return self.builder.neg(operand)
             else:
@@ -554,6 +625,7 @@ class LLVMCodeGenerator:
         else:
             raise CodegenError(f"Unsupported unary operator: {expr.op}")
 
+    @visits("expression", expressions.FuncCall)
     def _gen_call(self, call: expressions.FuncCall) -> ir.Value:
         """Generate code for function call"""
         if isinstance(call.callee, expressions.Identifier):
@@ -564,8 +636,8 @@ class LLVMCodeGenerator:
             elif func_name == "len":
                 return self._gen_len_call(call.arguments)
             
-            if func_name in self.globals:
-                func = self.globals[func_name]
+            func = self._lookup_function(call.callee)
+            if func is not None:
                 args = [self._gen_expr(arg) for arg in call.arguments]
                 return self.builder.call(func, args)
         
@@ -598,19 +670,13 @@ class LLVMCodeGenerator:
         
         return ir.Constant(self.int_type, 5)
 
+    @visits("expression", expressions.AssignExpr)
     def _gen_assignment(self, expr: expressions.AssignExpr) -> ir.Value:
         """Generate code for assignment"""
         value = self._gen_expr(expr.value)
         
         if isinstance(expr.target, expressions.Identifier):
-            var_name = expr.target.name
-            if var_name in self.locals:
-                ptr = self.locals[var_name]
-            elif var_name in self.globals:
-                ptr = self.globals[var_name]
-            else:
-                raise CodegenError(f"Unknown variable: {var_name}")
-            
+            ptr = self._variable(expr.target)
             target_type = ptr.type.pointee
             
             if expr.op == "=":
@@ -639,6 +705,7 @@ class LLVMCodeGenerator:
         
         raise CodegenError("Complex assignment targets not yet supported")
 
+    @visits("expression", expressions.ArrayAccess)
     def _gen_array_access(self, expr: expressions.ArrayAccess) -> ir.Value:
         """Generate code for array access"""
         array_ptr = self._gen_expr(expr.array)
@@ -646,18 +713,48 @@ class LLVMCodeGenerator:
         elem_ptr = self.builder.gep(array_ptr, [index])
         return self.builder.load(elem_ptr)
 
+    @visits("expression", expressions.MemberAccess)
     def _gen_member_access(self, expr: expressions.MemberAccess) -> ir.Value:
         """Generate code for member access"""
         raise CodegenError("Member access not yet fully implemented")
 
-    def _load_variable(self, name: str) -> ir.Value:
-        """Load a variable value"""
-        if name in self.locals:
-            return self.builder.load(self.locals[name])
-        elif name in self.globals:
-            return self.builder.load(self.globals[name])
+    def _bind_slot(self, name: expressions.Identifier, value: ir.Value) -> None:
+        """Store a global in the slot of its binding"""
+        binding = self.resolution.get(name) if self.resolution is not None else None
+        if binding is not None:
+            self.global_slots[binding.slot] = value
+
+    def _bind_local(self, name: expressions.Identifier, alloca: ir.Value) -> None:
+        binding = self.resolution.get(name) if self.resolution is not None else None
+        if binding is None:
+            self.locals[name.name] = alloca
         else:
-            raise CodegenError(f"Unknown variable: {name}")
+            self.slots[binding.slot] = alloca
+
+    def _lookup(self, ident: expressions.Identifier) -> Optional[ir.Value]:
+        """The variable (or function) an identifier refers to: by the slot of
+        its binding, or by name when it has none"""
+        binding = self.resolution.get(ident) if self.resolution is not None else None
+        if binding is not None:
+            value = self.global_slots[binding.slot] if binding.is_global else self.slots[binding.slot]
+            if value is not None:
+                return value
+        name = ident.name
+        if name in self.locals:
+            return self.locals[name]
+        return self.globals.get(name)
+
+    def _lookup_function(self, ident: expressions.Identifier) -> Optional[ir.Value]:
+        binding = self.resolution.get(ident) if self.resolution is not None else None
+        if binding is not None and binding.is_global and self.global_slots[binding.slot] is not None:
+            return self.global_slots[binding.slot]
+        return self.globals.get(ident.name)
+
+    def _variable(self, ident: expressions.Identifier) -> ir.Value:
+        ptr = self._lookup(ident)
+        if ptr is None:
+            raise CodegenError(f"Unknown variable: {ident.name}")
+        return ptr
 
     def _create_string_constant(self, value: str) -> ir.Value:
         """Create a global string constant"""
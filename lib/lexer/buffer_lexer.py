@@ -0,0 +1,128 @@
+import mmap
+from typing import Generator, Optional, Union
+from lib.lexer.token import Token, TokenType
+from lib.lexer.dfa_compiler import ALPHABET_SIZE, CompiledDFA, load_dfa
+from lib.lexer.token_stream import TokenStream, decode_lexeme
+from lib.lexer.source_map import SourceMap
+from lib.lexer.symbol_pool import FIXED_TEXT, POOLED_KINDS, SymbolPool
+from lib.utils.error_handler import LexerError
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+def map_source(path: str) -> memoryview:
+    """Read-only view of a source file through mmap, without copying it.
+
+    The mapping is released once the view and every token slicing it are gone.
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped.
+            return memoryview(b"")
+    return memoryview(mapped)
+
+
+class SpanToken(Token):
+    """Token whose text is sliced from the source buffer only when read"""
+
+    __slots__ = ("buffer", "start", "end")
+
+    def __init__(self, type_: TokenType, buffer: Buffer, start: int, end: int, source_map: SourceMap) -> None:
+        self.type: TokenType = type_
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+        self.offset: int = start
+        self.source_map: Optional[SourceMap] = source_map
+        self._line: int = 0
+        self._column: int = 0
+
+    @property
+    def value(self) -> str:  # type: ignore[override]
+        return decode_lexeme(bytes(self.buffer[self.start:self.end]))
+
+
+class BufferLexer:
+    """Table-driven lexer that runs directly over UTF-8 bytes.
+
+    Bytes outside ASCII are scanned like the space the str Lexer would have
+    replaced them with: whitespace outside string literals, literal content
+    inside them (where they are normalized when the token text is read).
+    Columns count characters, not bytes. Unlike the str Lexer, compatibility
+    characters outside string literals are not NFKC-folded into ASCII.
+    """
+
+    def __init__(self, buffer: Buffer, dfa: Optional[CompiledDFA] = None) -> None:
+        self.buffer: Buffer = buffer
+        self.dfa: CompiledDFA = dfa if dfa is not None else load_dfa()
+        space_class = self.dfa.char_classes[ord(" ")]
+        self.byte_classes = self.dfa.char_classes[:ALPHABET_SIZE] + bytes([space_class]) * (256 - ALPHABET_SIZE)
+        self.i = 0
+        self.n = len(buffer)
+        self.source_map = SourceMap(buffer)  # type: ignore[arg-type]
+        self.pool = SymbolPool()
+
+    def next_span(self) -> tuple[TokenType, int, int]:
+        """Next significant token as (type, start, end) byte offsets"""
+        buf = self.buffer
+        transitions = self.dfa.transitions
+        accepting = self.dfa.accepting
+        token_types = self.dfa.token_types
+        byte_classes = self.byte_classes
+        n = self.n
+
+        while True:
+            start = self.i
+            if start >= n:
+                return TokenType.EOF, n, n
+
+            state = self.dfa.initial_state
+            last_final_state = 0
+            last_final_index = -1
+            j = start
+            while j < n:
+                state = transitions[state + byte_classes[buf[j]]]
+                if not state:
+                    break
+                j += 1
+                if accepting[state]:
+                    last_final_state = state
+                    last_final_index = j
+
+            if last_final_index < 0:
+                line, column = self.source_map.line_column(start)
+                raise LexerError("Invalid token", line, column, chr(buf[start]))
+            self.i = last_final_index
+
+            token_type = token_types[last_final_state]
+            if token_type is TokenType.WHITESPACE or token_type is TokenType.COMMENT:
+                continue
+            return token_type, start, last_final_index
+
+    def get_next_token(self) -> Token:
+        token_type, start, end = self.next_span()
+        if token_type in POOLED_KINDS:
+            index = self.pool.add(bytes(self.buffer[start:end]).decode("ascii"))
+            return Token(token_type, self.pool.lexemes[index], offset=start, source_map=self.source_map,
+                         literal=self.pool.literals[index])
+        text = FIXED_TEXT[token_type]
+        if text is not None:
+            return Token(token_type, text, offset=start, source_map=self.source_map)
+        return SpanToken(token_type, self.buffer, start, end, self.source_map)
+
+    def tokenize_stream(self) -> TokenStream:
+        stream = TokenStream(self.buffer, self.source_map, self.pool)
+        append = stream.append
+        while True:
+            span = self.next_span()
+            append(*span)
+            if span[0] is TokenType.EOF:
+                return stream
+
+    def tokenize(self) -> Generator[Token, None, None]:
+        while True:
+            token = self.get_next_token()
+            yield token
+            if token.type == TokenType.EOF:
+                break
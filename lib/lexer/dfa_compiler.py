@@ -0,0 +1,294 @@
+import os
+import sys
+import hashlib
+import tempfile
+import importlib
+from array import array
+from functools import cache
+from pathlib import Path
+from types import ModuleType
+from typing import Hashable, Optional, Sequence
+from lib.lexer.token import TokenType
+from lib.lexer.tables import KEYWORDS_TABLE, OPERATORS_TABLE, PUNCTUATION_TABLE
+
+# Bump whenever the layout of the generated module changes.
+FORMAT_VERSION = 3
+
+TABLES_MODULE = "lib.lexer.dfa_tables"
+TABLES_PATH = Path(__file__).with_name("dfa_tables.py")
+NFA_SOURCE_PATH = Path(__file__).with_name("nfa_to_dfa.py")
+
+# The lexer only ever sees ASCII (everything else is replaced before scanning).
+ALPHABET_SIZE = 128
+# State 0 rejects everything and class 0 has no transitions in any state.
+DEAD_STATE = 0
+NO_CLASS = 0
+
+
+class CompiledDFA:
+    """Minimized DFA lowered to a dense, integer-indexed transition table.
+
+    States are premultiplied by ``num_classes`` so that the scanner's inner
+    loop is ``state = transitions[state + char_class]``; ``DEAD_STATE`` stays 0.
+    ``token_types`` gives the TokenType produced by each accepting state,
+    indexed the same way.
+    """
+
+    __slots__ = (
+        "num_states",
+        "num_classes",
+        "subset_states",
+        "char_classes",
+        "rows",
+        "transitions",
+        "accepting",
+        "token_types",
+        "initial_state",
+    )
+
+    def __init__(
+        self,
+        num_classes: int,
+        char_classes: bytes,
+        rows: Sequence[int],
+        tags: Sequence[Optional[TokenType]],
+        initial_state: int,
+        subset_states: int = 0,
+    ) -> None:
+        self.num_states = len(tags)
+        self.num_classes = num_classes
+        self.subset_states = subset_states
+        # 256 entries so it can be used directly with bytes.translate().
+        self.char_classes = bytes(char_classes).ljust(256, bytes([NO_CLASS]))
+        self.rows = bytes(rows)
+        self.transitions = array("I", (target * num_classes for target in rows))
+        padding = [None] * (num_classes - 1)
+        self.token_types: tuple[Optional[TokenType], ...] = tuple(
+            tag for state_tag in tags for tag in (state_tag, *padding)
+        )
+        self.accepting = bytes(tag is not None for tag in self.token_types)
+        self.initial_state = initial_state * num_classes
+
+    def classify(self, code: str) -> bytes:
+        """Map an ASCII string to its sequence of character classes"""
+        return code.encode("ascii").translate(self.char_classes)
+
+
+@cache
+def tables_fingerprint() -> str:
+    """Hash of everything the generated DFA depends on"""
+    h = hashlib.sha256()
+    h.update(f"format={FORMAT_VERSION}\n".encode())
+    for name, table in (
+        ("keywords", KEYWORDS_TABLE),
+        ("operators", OPERATORS_TABLE),
+        ("punctuation", PUNCTUATION_TABLE),
+    ):
+        h.update(f"{name}={sorted((k, v.name) for k, v in table.items())!r}\n".encode())
+    h.update(f"token_types={[t.name for t in TokenType]!r}\n".encode())
+    if NFA_SOURCE_PATH.exists():
+        h.update(NFA_SOURCE_PATH.read_bytes())
+    return h.hexdigest()
+
+
+def classify_lexeme(token_text: str) -> TokenType:
+    """Reference classification of a complete lexeme, used to tag DFA states"""
+    # --- Whitespace ---
+    if token_text.strip() == '':
+        return TokenType.WHITESPACE
+
+    # --- Comments ---
+    if token_text.startswith("//"):
+        return TokenType.COMMENT
+
+    # --- Keywords ---
+    if token_text in KEYWORDS_TABLE:
+        return KEYWORDS_TABLE[token_text]
+
+    # --- Operators ---
+    if token_text in OPERATORS_TABLE:
+        return OPERATORS_TABLE[token_text]
+
+    # --- Punctuation ---
+    if token_text in PUNCTUATION_TABLE:
+        return PUNCTUATION_TABLE[token_text]
+
+    # --- Strings ---
+    if token_text.startswith('"') and token_text.endswith('"'):
+        return TokenType.STRING
+
+    # --- Numbers ---
+    if token_text.replace('.', '', 1).isdigit():
+        return TokenType.FLOAT if '.' in token_text else TokenType.INTEGER
+
+    # --- Identifiers ---
+    return TokenType.IDENTIFIER
+
+
+def _canonical(keys: Sequence[Hashable]) -> list[int]:
+    """Renumber arbitrary keys as 0..k-1 in order of first appearance"""
+    ids: dict[Hashable, int] = {}
+    return [ids.setdefault(key, len(ids)) for key in keys]
+
+
+def _minimize(delta: list[list[int]], labels: Sequence[Hashable]) -> list[int]:
+    """Moore partition refinement; returns the block of every state"""
+    block = _canonical(labels)
+    while True:
+        signatures = [(block[s], tuple(block[t] for t in row)) for s, row in enumerate(delta)]
+        refined = _canonical(signatures)
+        if max(refined) == max(block):
+            return refined
+        block = refined
+
+
+def compile_dfa() -> CompiledDFA:
+    """Build, minimize and lower the lexer DFA into a dense table"""
+    # automata-lib is only needed here, never on the lexing hot path.
+    from lib.lexer.nfa_to_dfa import build_dfa
+
+    dfa = build_dfa(minify=False)
+
+    # --- Number the subset-construction states (0 is the dead state) ---
+    # Every unminimized state is reached only by lexemes of a single token
+    # type, so classifying the shortest lexeme that reaches an accepting state
+    # tags it once for all; keyword-over-identifier priority is resolved here.
+    # (The only exception is a comment running into whitespace after its
+    # newline, which ends up tagged WHITESPACE; both kinds are skipped.)
+    order = [dfa.initial_state]
+    index = {dfa.initial_state: 1}
+    witness = {dfa.initial_state: ""}
+    for state in order:
+        # Visit symbols in sorted order so the numbering is reproducible.
+        for char, target in sorted(dfa.transitions.get(state, {}).items()):
+            if target not in index:
+                index[target] = len(order) + 1
+                witness[target] = witness[state] + char
+                order.append(target)
+
+    delta = [[DEAD_STATE] * ALPHABET_SIZE]
+    labels: list[Optional[TokenType]] = [None]
+    for state in order:
+        row = [DEAD_STATE] * ALPHABET_SIZE
+        for char, target in dfa.transitions.get(state, {}).items():
+            row[ord(char)] = index[target]
+        delta.append(row)
+        labels.append(classify_lexeme(witness[state]) if state in dfa.final_states else None)
+
+    # --- Minimize and renumber: dead state first, initial state second ---
+    block = _minimize(delta, labels)
+    renumber = {block[DEAD_STATE]: DEAD_STATE, block[1]: 1}
+    representative = {DEAD_STATE: DEAD_STATE, 1: 1}
+    for state in range(2, len(delta)):
+        if block[state] not in renumber:
+            renumber[block[state]] = len(renumber)
+            representative[renumber[block[state]]] = state
+    num_states = len(renumber)
+    min_delta = [
+        [renumber[block[t]] for t in delta[representative[s]]]
+        for s in range(num_states)
+    ]
+    tags = [labels[representative[s]] for s in range(num_states)]
+
+    # --- Character classes: symbols with identical columns are merged ---
+    dead_column = tuple([DEAD_STATE] * num_states)
+    columns = [tuple(row[c] for row in min_delta) for c in range(ALPHABET_SIZE)]
+    class_ids = _canonical([dead_column] + columns)
+    char_classes = bytes(class_ids[1:])
+    num_classes = max(class_ids) + 1
+    class_column = {class_ids[c + 1]: columns[c] for c in range(ALPHABET_SIZE)}
+    class_column[NO_CLASS] = dead_column
+
+    rows = [class_column[k][s] for s in range(num_states) for k in range(num_classes)]
+    return CompiledDFA(num_classes, char_classes, rows, tags, 1, subset_states=len(order))
+
+
+def render_tables(compiled: CompiledDFA, fingerprint: str) -> str:
+    tags = tuple(
+        tag.name if (tag := compiled.token_types[s * compiled.num_classes]) is not None else None
+        for s in range(compiled.num_states)
+    )
+    return "\n".join([
+        "# Generated by lib/lexer/dfa_compiler.py -- do not edit.",
+        "# Regenerate with: python -m lib.lexer.dfa_compiler",
+        "",
+        f"FINGERPRINT = {fingerprint!r}",
+        f"SUBSET_STATES = {compiled.subset_states}",
+        f"NUM_STATES = {compiled.num_states}",
+        f"NUM_CLASSES = {compiled.num_classes}",
+        f"INITIAL_STATE = {compiled.initial_state // compiled.num_classes}",
+        "",
+        "# Character class of every ASCII code point (0 = no transitions anywhere).",
+        f"CHAR_CLASSES = {compiled.char_classes[:ALPHABET_SIZE]!r}",
+        "# TokenType name produced by each accepting state (None = not accepting).",
+        f"TAGS = {tags!r}",
+        "# Row-major NUM_STATES x NUM_CLASSES next-state table (0 = dead state).",
+        f"TRANSITIONS = {compiled.rows!r}",
+        "",
+    ])
+
+
+def write_tables(compiled: CompiledDFA, fingerprint: str, path: Path = TABLES_PATH) -> None:
+    source = render_tables(compiled, fingerprint)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".dfa_tables.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(source)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _from_module(module: ModuleType) -> CompiledDFA:
+    return CompiledDFA(
+        module.NUM_CLASSES,
+        module.CHAR_CLASSES,
+        module.TRANSITIONS,
+        tuple(TokenType[tag] if tag is not None else None for tag in module.TAGS),
+        module.INITIAL_STATE,
+        subset_states=module.SUBSET_STATES,
+    )
+
+
+@cache
+def load_dfa() -> CompiledDFA:
+    """Load the pregenerated DFA, rebuilding it if the lexer tables changed"""
+    fingerprint = tables_fingerprint()
+    try:
+        module = importlib.import_module(TABLES_MODULE)
+        if getattr(module, "FINGERPRINT", None) == fingerprint:
+            return _from_module(module)
+    except ImportError:
+        pass
+
+    compiled = compile_dfa()
+    try:
+        write_tables(compiled, fingerprint)
+        sys.modules.pop(TABLES_MODULE, None)
+    except OSError:
+        # Read-only installs still work, they just pay the build on every run.
+        pass
+    return compiled
+
+
+def main() -> None:
+    fingerprint = tables_fingerprint()
+    compiled = compile_dfa()
+    write_tables(compiled, fingerprint)
+    print(
+        f"Wrote {TABLES_PATH}: {compiled.subset_states} subset states minimized to "
+        f"{compiled.num_states} (incl. dead state), {compiled.num_classes} character classes."
+    )
+
+    # The generated scanner is derived from these tables, keep it in sync.
+    from lib.lexer.scanner_codegen import main as generate_scanner
+    load_dfa.cache_clear()
+    tables_fingerprint.cache_clear()
+    sys.modules.pop(TABLES_MODULE, None)
+    generate_scanner()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,950 @@
+# Generated by lib/lexer/scanner_codegen.py -- do not edit.
+# Regenerate with: python -m lib.lexer.scanner_codegen
+# pyright: basic
+from lib.lexer.token import TokenType
+
+FINGERPRINT = '92e2067ac73cd05e45840a615e7fe409bcd914662564d4e79419f7277278cc98'
+
+_AND = TokenType.AND
+_BOOL_TYPE = TokenType.BOOL_TYPE
+_BREAK = TokenType.BREAK
+_COLON = TokenType.COLON
+_COMMA = TokenType.COMMA
+_COMMENT = TokenType.COMMENT
+_CONTINUE = TokenType.CONTINUE
+_DIVIDE = TokenType.DIVIDE
+_DIVIDE_EQUAL = TokenType.DIVIDE_EQUAL
+_DOT = TokenType.DOT
+_ELIF = TokenType.ELIF
+_ELSE = TokenType.ELSE
+_EQUALS = TokenType.EQUALS
+_EQUAL_EQUAL = TokenType.EQUAL_EQUAL
+_FALSE = TokenType.FALSE
+_FLOAT = TokenType.FLOAT
+_FLOAT_TYPE = TokenType.FLOAT_TYPE
+_FUNC = TokenType.FUNC
+_GREATER = TokenType.GREATER
+_GREATER_OR_EQUAL = TokenType.GREATER_OR_EQUAL
+_IDENTIFIER = TokenType.IDENTIFIER
+_IF = TokenType.IF
+_IN = TokenType.IN
+_INTEGER = TokenType.INTEGER
+_INT_TYPE = TokenType.INT_TYPE
+_LBRACE = TokenType.LBRACE
+_LBRACKET = TokenType.LBRACKET
+_LEN = TokenType.LEN
+_LESS = TokenType.LESS
+_LESS_OR_EQUAL = TokenType.LESS_OR_EQUAL
+_LIST_TYPE = TokenType.LIST_TYPE
+_LOOP = TokenType.LOOP
+_LPAREN = TokenType.LPAREN
+_MINUS = TokenType.MINUS
+_MINUS_EQUAL = TokenType.MINUS_EQUAL
+_MODULE = TokenType.MODULE
+_MODULE_EQUAL = TokenType.MODULE_EQUAL
+_MULTIPLY = TokenType.MULTIPLY
+_MULTIPLY_EQUAL = TokenType.MULTIPLY_EQUAL
+_NEW = TokenType.NEW
+_NOT = TokenType.NOT
+_NOT_EQUAL = TokenType.NOT_EQUAL
+_OR = TokenType.OR
+_PLUS = TokenType.PLUS
+_PLUS_EQUAL = TokenType.PLUS_EQUAL
+_POWER = TokenType.POWER
+_PRINT = TokenType.PRINT
+_RBRACE = TokenType.RBRACE
+_RBRACKET = TokenType.RBRACKET
+_RETURN = TokenType.RETURN
+_RPAREN = TokenType.RPAREN
+_SEMICOLON = TokenType.SEMICOLON
+_STRING = TokenType.STRING
+_STRUCT = TokenType.STRUCT
+_STR_TYPE = TokenType.STR_TYPE
+_TRUE = TokenType.TRUE
+_VAR = TokenType.VAR
+_VOID_TYPE = TokenType.VOID_TYPE
+_WHITESPACE = TokenType.WHITESPACE
+
+_SET_0 = frozenset('\t\n\r ')
+_SET_1 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz')
+_SET_2 = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ_adghjkmoquwxyz')
+_SET_3 = frozenset('\t\r !"#$%&\'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~')
+_SET_4 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnpqstuvwxyz')
+_SET_5 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnpqrstuvwxyz')
+_SET_6 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijkmnopqrstuvwxyz')
+_SET_7 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdfghijklmnopqrstuvwxyz')
+_SET_8 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_bcdefghijklmnopqrstuvwxyz')
+_SET_9 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijlmnopqrstuvwxyz')
+_SET_10 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmopqrstuvwxyz')
+_SET_11 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrsuvwxyz')
+_SET_12 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghjklmnopqrstuvwxyz')
+_SET_13 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstvwxyz')
+_SET_14 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghjklmnopqrtuvwxyz')
+_SET_15 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdeghijklmnopqrstuvwxyz')
+_SET_16 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_bcdefghijkmnopqrstvwxyz')
+_SET_17 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrtuvwxyz')
+_SET_18 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abdefghijklmnopqrstuvwxyz')
+_SET_19 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdeghijklmopqrstuvwxyz')
+_SET_20 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdfghjklmnpqrstuvwxyz')
+_SET_21 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnoqrstuvwxyz')
+_SET_22 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvxyz')
+_SET_23 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqstuvwxyz')
+_SET_24 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_bcdefghijklmnpqrstuvwxyz')
+_SET_25 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcefghijklmnopqrstuvwxyz')
+
+
+def _state_2(code, j, n, last, tag):
+    last, tag = j, _WHITESPACE
+    while j < n:
+        c = code[j]
+        if not (c in _SET_0):
+            break
+        j += 1
+    last = j
+    return last, tag
+
+def _state_21(code, j, n, last, tag):
+    last, tag = j, _IDENTIFIER
+    while j < n:
+        c = code[j]
+        if not (c in _SET_1):
+            break
+        j += 1
+    last = j
+    return last, tag
+
+
+def scan(code, i, n):
+    """Longest match at ``i``: (end, TokenType), or (-1, None) if none"""
+    last, tag = -1, None
+    j = i
+    if j < n:
+        c = code[j]
+        if c in _SET_2:
+            return _state_21(code, j + 1, n, last, tag)
+        elif '0' <= c <= '9':
+            j += 1
+            last, tag = j, _INTEGER
+            while j < n:
+                c = code[j]
+                if not ('0' <= c <= '9'):
+                    break
+                j += 1
+            last = j
+            if j < n:
+                c = code[j]
+                if c == '.':
+                    j += 1
+                    if j < n:
+                        c = code[j]
+                        if '0' <= c <= '9':
+                            j += 1
+                            last, tag = j, _FLOAT
+                            while j < n:
+                                c = code[j]
+                                if not ('0' <= c <= '9'):
+                                    break
+                                j += 1
+                            last = j
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c in _SET_0:
+            return _state_2(code, j + 1, n, last, tag)
+        elif c == '!':
+            j += 1
+            last, tag = j, _NOT
+            if j < n:
+                c = code[j]
+                if c == '=':
+                    j += 1
+                    last, tag = j, _NOT_EQUAL
+                    return last, tag
+            return last, tag
+        elif c == '"':
+            j += 1
+            while j < n:
+                c = code[j]
+                if not (c == ' ' or c == '!' or '#' <= c <= '~'):
+                    break
+                j += 1
+            if j < n:
+                c = code[j]
+                if c == '"':
+                    j += 1
+                    last, tag = j, _STRING
+                    return last, tag
+            return last, tag
+        elif c == '%':
+            j += 1
+            last, tag = j, _MODULE
+            if j < n:
+                c = code[j]
+                if c == '=':
+                    j += 1
+                    last, tag = j, _MODULE_EQUAL
+                    return last, tag
+            return last, tag
+        elif c == '&':
+            j += 1
+            if j < n:
+                c = code[j]
+                if c == '&':
+                    j += 1
+                    last, tag = j, _AND
+                    return last, tag
+            return last, tag
+        elif c == '(':
+            j += 1
+            last, tag = j, _LPAREN
+            return last, tag
+        elif c == ')':
+            j += 1
+            last, tag = j, _RPAREN
+            return last, tag
+        elif c == '*':
+            j += 1
+            last, tag = j, _MULTIPLY
+            if j < n:
+                c = code[j]
+                if c == '*':
+                    j += 1
+                    last, tag = j, _POWER
+                    return last, tag
+                elif c == '=':
+                    j += 1
+                    last, tag = j, _MULTIPLY_EQUAL
+                    return last, tag
+            return last, tag
+        elif c == '+':
+            j += 1
+            last, tag = j, _PLUS
+            if j < n:
+                c = code[j]
+                if c == '=':
+                    j += 1
+                    last, tag = j, _PLUS_EQUAL
+                    return last, tag
+            return last, tag
+        elif c == ',':
+            j += 1
+            last, tag = j, _COMMA
+            return last, tag
+        elif c == '-':
+            j += 1
+            last, tag = j, _MINUS
+            if j < n:
+                c = code[j]
+                if c == '=':
+                    j += 1
+                    last, tag = j, _MINUS_EQUAL
+                    return last, tag
+            return last, tag
+        elif c == '.':
+            j += 1
+            last, tag = j, _DOT
+            return last, tag
+        elif c == '/':
+            j += 1
+            last, tag = j, _DIVIDE
+            if j < n:
+                c = code[j]
+                if c == '/':
+                    j += 1
+                    last, tag = j, _COMMENT
+                    while j < n:
+                        c = code[j]
+                        if not (c in _SET_3):
+                            break
+                        j += 1
+                    last = j
+                    if j < n:
+                        c = code[j]
+                        if c == '\n':
+                            return _state_2(code, j + 1, n, last, tag)
+                    return last, tag
+                elif c == '=':
+                    j += 1
+                    last, tag = j, _DIVIDE_EQUAL
+                    return last, tag
+            return last, tag
+        elif c == ':':
+            j += 1
+            last, tag = j, _COLON
+            return last, tag
+        elif c == ';':
+            j += 1
+            last, tag = j, _SEMICOLON
+            return last, tag
+        elif c == '<':
+            j += 1
+            last, tag = j, _LESS
+            if j < n:
+                c = code[j]
+                if c == '=':
+                    j += 1
+                    last, tag = j, _LESS_OR_EQUAL
+                    return last, tag
+            return last, tag
+        elif c == '=':
+            j += 1
+            last, tag = j, _EQUALS
+            if j < n:
+                c = code[j]
+                if c == '=':
+                    j += 1
+                    last, tag = j, _EQUAL_EQUAL
+                    return last, tag
+            return last, tag
+        elif c == '>':
+            j += 1
+            last, tag = j, _GREATER
+            if j < n:
+                c = code[j]
+                if c == '=':
+                    j += 1
+                    last, tag = j, _GREATER_OR_EQUAL
+                    return last, tag
+            return last, tag
+        elif c == '[':
+            j += 1
+            last, tag = j, _LBRACKET
+            return last, tag
+        elif c == ']':
+            j += 1
+            last, tag = j, _RBRACKET
+            return last, tag
+        elif c == 'b':
+            j += 1
+            last, tag = j, _IDENTIFIER
+            if j < n:
+                c = code[j]
+                if c in _SET_4:
+                    return _state_21(code, j + 1, n, last, tag)
+                elif c == 'o':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_5:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'o':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_6:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 'l':
+                                    j += 1
+                                    last, tag = j, _BOOL_TYPE
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_1:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+                elif c == 'r':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_7:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'e':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_8:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 'a':
+                                    j += 1
+                                    last, tag = j, _IDENTIFIER
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_9:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                        elif c == 'k':
+                                            j += 1
+                                            last, tag = j, _BREAK
+                                            if j < n:
+                                                c = code[j]
+                                                if c in _SET_1:
+                                                    return _state_21(code, j + 1, n, last, tag)
+                                            return last, tag
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c == 'c':
+            j += 1
+            last, tag = j, _IDENTIFIER
+            if j < n:
+                c = code[j]
+                if c in _SET_5:
+                    return _state_21(code, j + 1, n, last, tag)
+                elif c == 'o':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_10:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'n':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_11:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 't':
+                                    j += 1
+                                    last, tag = j, _IDENTIFIER
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_12:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                        elif c == 'i':
+                                            j += 1
+                                            last, tag = j, _IDENTIFIER
+                                            if j < n:
+                                                c = code[j]
+                                                if c in _SET_10:
+                                                    return _state_21(code, j + 1, n, last, tag)
+                                                elif c == 'n':
+                                                    j += 1
+                                                    last, tag = j, _IDENTIFIER
+                                                    if j < n:
+                                                        c = code[j]
+                                                        if c in _SET_13:
+                                                            return _state_21(code, j + 1, n, last, tag)
+                                                        elif c == 'u':
+                                                            j += 1
+                                                            last, tag = j, _IDENTIFIER
+                                                            if j < n:
+                                                                c = code[j]
+                                                                if c in _SET_7:
+                                                                    return _state_21(code, j + 1, n, last, tag)
+                                                                elif c == 'e':
+                                                                    j += 1
+                                                                    last, tag = j, _CONTINUE
+                                                                    if j < n:
+                                                                        c = code[j]
+                                                                        if c in _SET_1:
+                                                                            return _state_21(code, j + 1, n, last, tag)
+                                                                    return last, tag
+                                                            return last, tag
+                                                    return last, tag
+                                            return last, tag
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c == 'e':
+            j += 1
+            last, tag = j, _IDENTIFIER
+            if j < n:
+                c = code[j]
+                if c in _SET_6:
+                    return _state_21(code, j + 1, n, last, tag)
+                elif c == 'l':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_14:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'i':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_15:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 'f':
+                                    j += 1
+                                    last, tag = j, _ELIF
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_1:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                    return last, tag
+                            return last, tag
+                        elif c == 's':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_7:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 'e':
+                                    j += 1
+                                    last, tag = j, _ELSE
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_1:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c == 'f':
+            j += 1
+            last, tag = j, _IDENTIFIER
+            if j < n:
+                c = code[j]
+                if c in _SET_16:
+                    return _state_21(code, j + 1, n, last, tag)
+                elif c == 'a':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_6:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'l':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_17:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 's':
+                                    j += 1
+                                    last, tag = j, _IDENTIFIER
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_7:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                        elif c == 'e':
+                                            j += 1
+                                            last, tag = j, _FALSE
+                                            if j < n:
+                                                c = code[j]
+                                                if c in _SET_1:
+                                                    return _state_21(code, j + 1, n, last, tag)
+                                            return last, tag
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+                elif c == 'l':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_5:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'o':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_8:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 'a':
+                                    j += 1
+                                    last, tag = j, _IDENTIFIER
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_11:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                        elif c == 't':
+                                            j += 1
+                                            last, tag = j, _FLOAT_TYPE
+                                            if j < n:
+                                                c = code[j]
+                                                if c in _SET_1:
+                                                    return _state_21(code, j + 1, n, last, tag)
+                                            return last, tag
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+                elif c == 'u':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_10:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'n':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_18:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 'c':
+                                    j += 1
+                                    last, tag = j, _FUNC
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_1:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c == 'i':
+            j += 1
+            last, tag = j, _IDENTIFIER
+            if j < n:
+                c = code[j]
+                if c in _SET_19:
+                    return _state_21(code, j + 1, n, last, tag)
+                elif c == 'f':
+                    j += 1
+                    last, tag = j, _IF
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_1:
+                            return _state_21(code, j + 1, n, last, tag)
+                    return last, tag
+                elif c == 'n':
+                    j += 1
+                    last, tag = j, _IN
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_11:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 't':
+                            j += 1
+                            last, tag = j, _INT_TYPE
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_1:
+                                    return _state_21(code, j + 1, n, last, tag)
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c == 'l':
+            j += 1
+            last, tag = j, _IDENTIFIER
+            if j < n:
+                c = code[j]
+                if c in _SET_20:
+                    return _state_21(code, j + 1, n, last, tag)
+                elif c == 'e':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_10:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'n':
+                            j += 1
+                            last, tag = j, _LEN
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_1:
+                                    return _state_21(code, j + 1, n, last, tag)
+                            return last, tag
+                    return last, tag
+                elif c == 'i':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_17:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 's':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_11:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 't':
+                                    j += 1
+                                    last, tag = j, _LIST_TYPE
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_1:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+                elif c == 'o':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_5:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'o':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_21:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 'p':
+                                    j += 1
+                                    last, tag = j, _LOOP
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_1:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c == 'n':
+            j += 1
+            last, tag = j, _IDENTIFIER
+            if j < n:
+                c = code[j]
+                if c in _SET_7:
+                    return _state_21(code, j + 1, n, last, tag)
+                elif c == 'e':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_22:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'w':
+                            j += 1
+                            last, tag = j, _NEW
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_1:
+                                    return _state_21(code, j + 1, n, last, tag)
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c == 'p':
+            j += 1
+            last, tag = j, _IDENTIFIER
+            if j < n:
+                c = code[j]
+                if c in _SET_23:
+                    return _state_21(code, j + 1, n, last, tag)
+                elif c == 'r':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_12:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'i':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_10:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 'n':
+                                    j += 1
+                                    last, tag = j, _IDENTIFIER
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_11:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                        elif c == 't':
+                                            j += 1
+                                            last, tag = j, _PRINT
+                                            if j < n:
+                                                c = code[j]
+                                                if c in _SET_1:
+                                                    return _state_21(code, j + 1, n, last, tag)
+                                            return last, tag
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c == 'r':
+            j += 1
+            last, tag = j, _IDENTIFIER
+            if j < n:
+                c = code[j]
+                if c in _SET_7:
+                    return _state_21(code, j + 1, n, last, tag)
+                elif c == 'e':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_11:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 't':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_13:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 'u':
+                                    j += 1
+                                    last, tag = j, _IDENTIFIER
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_23:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                        elif c == 'r':
+                                            j += 1
+                                            last, tag = j, _IDENTIFIER
+                                            if j < n:
+                                                c = code[j]
+                                                if c in _SET_10:
+                                                    return _state_21(code, j + 1, n, last, tag)
+                                                elif c == 'n':
+                                                    j += 1
+                                                    last, tag = j, _RETURN
+                                                    if j < n:
+                                                        c = code[j]
+                                                        if c in _SET_1:
+                                                            return _state_21(code, j + 1, n, last, tag)
+                                                    return last, tag
+                                            return last, tag
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c == 's':
+            j += 1
+            last, tag = j, _IDENTIFIER
+            if j < n:
+                c = code[j]
+                if c in _SET_11:
+                    return _state_21(code, j + 1, n, last, tag)
+                elif c == 't':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_23:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'r':
+                            j += 1
+                            last, tag = j, _STR_TYPE
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_13:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 'u':
+                                    j += 1
+                                    last, tag = j, _IDENTIFIER
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_18:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                        elif c == 'c':
+                                            j += 1
+                                            last, tag = j, _IDENTIFIER
+                                            if j < n:
+                                                c = code[j]
+                                                if c in _SET_11:
+                                                    return _state_21(code, j + 1, n, last, tag)
+                                                elif c == 't':
+                                                    j += 1
+                                                    last, tag = j, _STRUCT
+                                                    if j < n:
+                                                        c = code[j]
+                                                        if c in _SET_1:
+                                                            return _state_21(code, j + 1, n, last, tag)
+                                                    return last, tag
+                                            return last, tag
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c == 't':
+            j += 1
+            last, tag = j, _IDENTIFIER
+            if j < n:
+                c = code[j]
+                if c in _SET_23:
+                    return _state_21(code, j + 1, n, last, tag)
+                elif c == 'r':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_13:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'u':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_7:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 'e':
+                                    j += 1
+                                    last, tag = j, _TRUE
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_1:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c == 'v':
+            j += 1
+            last, tag = j, _IDENTIFIER
+            if j < n:
+                c = code[j]
+                if c in _SET_24:
+                    return _state_21(code, j + 1, n, last, tag)
+                elif c == 'a':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_23:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'r':
+                            j += 1
+                            last, tag = j, _VAR
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_1:
+                                    return _state_21(code, j + 1, n, last, tag)
+                            return last, tag
+                    return last, tag
+                elif c == 'o':
+                    j += 1
+                    last, tag = j, _IDENTIFIER
+                    if j < n:
+                        c = code[j]
+                        if c in _SET_12:
+                            return _state_21(code, j + 1, n, last, tag)
+                        elif c == 'i':
+                            j += 1
+                            last, tag = j, _IDENTIFIER
+                            if j < n:
+                                c = code[j]
+                                if c in _SET_25:
+                                    return _state_21(code, j + 1, n, last, tag)
+                                elif c == 'd':
+                                    j += 1
+                                    last, tag = j, _VOID_TYPE
+                                    if j < n:
+                                        c = code[j]
+                                        if c in _SET_1:
+                                            return _state_21(code, j + 1, n, last, tag)
+                                    return last, tag
+                            return last, tag
+                    return last, tag
+            return last, tag
+        elif c == '{':
+            j += 1
+            last, tag = j, _LBRACE
+            return last, tag
+        elif c == '|':
+            j += 1
+            if j < n:
+                c = code[j]
+                if c == '|':
+                    j += 1
+                    last, tag = j, _OR
+                    return last, tag
+            return last, tag
+        elif c == '}':
+            j += 1
+            last, tag = j, _RBRACE
+            return last, tag
+    return last, tag
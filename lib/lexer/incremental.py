@@ -0,0 +1,127 @@
+from array import array
+from bisect import bisect_left
+from functools import cache
+from typing import Optional
+from lib.lexer.token import TokenType
+from lib.lexer.token_stream import TokenStream
+from lib.lexer.dfa_compiler import CompiledDFA, load_dfa
+from lib.lexer.lexer import Lexer, normalize_source
+
+
+@cache
+def max_overshoot(dfa: CompiledDFA) -> Optional[int]:
+    """Most characters the scanner can consume past the end of the lexeme it
+    finally accepts (through non-accepting states), or None if unbounded.
+
+    A lexeme ending at ``end`` was decided by looking at characters up to
+    index ``end + max_overshoot`` at most.
+    """
+    k = dfa.num_classes
+    successors = [
+        {dfa.transitions[state + c] for c in range(1, k)} - {0}
+        for state in range(0, dfa.num_states * k, k)
+    ]
+    depth: dict[int, int] = {}
+    visiting: set[int] = set()
+
+    def run(state: int) -> Optional[int]:
+        # Longest path through non-accepting states starting at ``state``.
+        if state in depth:
+            return depth[state]
+        if state in visiting:
+            return None
+        visiting.add(state)
+        longest = 1
+        for target in successors[state // k]:
+            if not dfa.accepting[target]:
+                rest = run(target)
+                if rest is None:
+                    return None
+                longest = max(longest, 1 + rest)
+        visiting.discard(state)
+        depth[state] = longest
+        return longest
+
+    overshoot = 0
+    for state in range(0, dfa.num_states * k, k):
+        if not dfa.accepting[state]:
+            continue
+        for target in successors[state // k]:
+            if not dfa.accepting[target]:
+                length = run(target)
+                if length is None:
+                    return None
+                overshoot = max(overshoot, length)
+    return overshoot
+
+
+def relex(
+    stream: TokenStream,
+    offset: int,
+    removed: int,
+    inserted: str,
+    engine: str = "dfa",
+) -> TokenStream:
+    """Token stream of ``stream``'s source after replacing ``removed``
+    characters at ``offset`` with ``inserted``.
+
+    Offsets are positions in the text the lexer scanned (``stream.source``);
+    ``inserted`` is normalized the same way on its own. Only the tokens from
+    the last restart point before the edit up to the first token that lines up
+    with the old stream again are scanned; later offsets are shifted.
+    """
+    old_source = stream.source
+    if not isinstance(old_source, str):
+        raise TypeError("Incremental relexing needs a token stream over a str source.")
+    if offset < 0 or removed < 0 or offset + removed > len(old_source):
+        raise ValueError("Edit out of range of the source.")
+
+    inserted = normalize_source(inserted)
+    source = old_source[:offset] + inserted + old_source[offset + removed:]
+    delta = len(inserted) - removed
+    edit_end = offset + len(inserted)
+
+    lexer = Lexer(source, engine=engine)
+    lexer.source_map = stream.source_map.edit(source, offset, removed, inserted)
+    overshoot = max_overshoot(load_dfa())
+
+    # --- Restart after the last token whose scan never looked at the edit ---
+    old_starts, old_lengths, old_kinds = stream.starts, stream.lengths, stream.kinds
+    keep = 0
+    if overshoot is not None:
+        keep = bisect_left(old_starts, offset)
+        while keep and old_starts[keep - 1] + old_lengths[keep - 1] + overshoot >= offset:
+            keep -= 1
+    restart = old_starts[keep - 1] + old_lengths[keep - 1] if keep else 0
+
+    # Pool indexes stay valid: the pool only ever grows.
+    result = TokenStream(source, lexer.source_map, stream.pool)
+    result.kinds = old_kinds[:keep]
+    result.starts = old_starts[:keep]
+    result.lengths = old_lengths[:keep]
+    result.values = stream.values[:keep]
+
+    # --- Relex until a token starts where an old (shifted) one did ---
+    # From a common token boundary on, the text and therefore the tokens
+    # are the same as before.
+    lexer.i = restart
+    append = result.append
+    count = len(old_starts)
+    resume = count
+    while True:
+        kind, start, end = lexer.next_span()
+        if start >= edit_end:
+            index = bisect_left(old_starts, start - delta, keep)
+            if index < count and old_starts[index] == start - delta:
+                resume = index
+                break
+        append(kind, start, end)
+        if kind is TokenType.EOF:
+            break
+
+    if resume < count:
+        result.kinds += old_kinds[resume:]
+        result.lengths += old_lengths[resume:]
+        result.values += stream.values[resume:]
+        result.starts += array("I", [start + delta for start in old_starts[resume:]]) if delta else old_starts[resume:]
+    return result
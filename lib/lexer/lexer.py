@@ -1,104 +1,132 @@
 import unicodedata
-from automata.fa.dfa import DFA
-from typing import Generator
+from functools import cached_property
+from typing import Generator, Optional
 from lib.lexer.token import Token, TokenType
-from lib.lexer.tables import KEYWORDS_TABLE, OPERATORS_TABLE, PUNCTUATION_TABLE
-from lib.lexer.nfa_to_dfa import dfa
+from lib.lexer.token_stream import TokenStream
+from lib.lexer.source_map import SourceMap
+from lib.lexer.symbol_pool import FIXED_TEXT, POOLED_KINDS, SymbolPool
+from lib.lexer.dfa_compiler import CompiledDFA, classify_lexeme, load_dfa
+from lib.lexer.scanner_codegen import ScanFunction, load_scanner
+from lib.lexer import regex_lexer
 from lib.utils.error_handler import LexerError
 
+# "dfa" uses the generated straight-line scanner when it is available and
+# falls back to the table-driven loop; "table" always uses the table and
+# "re" runs an equivalent master regular expression in the C regex engine.
+ENGINES = ("dfa", "table", "re")
+
+def _replace_non_ascii(text: str) -> str:
+    if text.isascii():
+        return text
+    return ''.join(c if ord(c) < 128 else ' ' for c in text)
+
+def normalize_source(code: str) -> str:
+    """The text the lexer actually scans: NFKC, then non-ASCII as spaces"""
+    return _replace_non_ascii(unicodedata.normalize('NFKC', code))
+
 class Lexer:
-    def __init__(self, code: str):
+    def __init__(self, code: str, dfa: Optional[CompiledDFA] = None, engine: str = "dfa"):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown lexer engine '{engine}'.")
         self.normalized = unicodedata.normalize('NFKC', code)
-        self.code = ''.join(c if ord(c) < 128 else ' ' for c in self.normalized)
-        self.dfa: DFA = dfa
+        self.code = _replace_non_ascii(self.normalized)
+        self.dfa: CompiledDFA = dfa if dfa is not None else load_dfa()
+        self.engine = engine
+        self.pool = SymbolPool()
+        self.classes: bytes = b''
         self.i = 0
-        self.n = len(code)
-        self.line = 1
-        self.column = 1
-
-    def get_next_token(self) -> Token:
-        if self.i >= self.n:
-            return Token(TokenType.EOF, '', self.line, self.column)
-
+        self.n = len(self.code)
+
+        self.scan: ScanFunction
+        if engine == "re":
+            self.scan = regex_lexer.scan
+            return
+        # The generated scanner is specialized for the default DFA only.
+        scanner = load_scanner() if engine == "dfa" and dfa is None else None
+        if scanner is not None:
+            self.scan = scanner
+        else:
+            self.classes = self.dfa.classify(self.code)
+            self.scan = self.scan_table
+
+    @cached_property
+    def source_map(self) -> SourceMap:
+        return SourceMap(self.code)
+
+    def scan_table(self, code: str, i: int, n: int) -> tuple[int, Optional[TokenType]]:
+        transitions = self.dfa.transitions
+        accepting = self.dfa.accepting
+        classes = self.classes
         state = self.dfa.initial_state
-        last_final_state = None
-        last_final_index = self.i
-        j = self.i
-
-        while j < self.n:
-            char = self.code[j]
+        last_final_state = 0
+        last_final_index = -1
+        j = i
 
-            if char not in self.dfa.input_symbols:
+        while j < n:
+            state = transitions[state + classes[j]]
+            if not state:
                 break
-
-            if char in self.dfa.transitions.get(state, {}):
-                state = self.dfa.transitions[state][char]
-            else:
-                break
-
-            if state in self.dfa.final_states:
-                last_final_state = state
-                last_final_index = j + 1
-
             j += 1
+            if accepting[state]:
+                last_final_state = state
+                last_final_index = j
 
-        if last_final_state is None:
-            raise LexerError("Invalid token", self.line, self.column, self.code[self.i])
-
-        token_text = self.code[self.i:last_final_index]
-        token_type = self.classify_token(token_text)
-
-        token = Token(token_type, token_text, self.line, self.column)
-
-        for c in token_text:
-            if c == '\n':
-                self.line += 1
-                self.column = 1
-            else:
-                self.column += 1
-
-        self.i = last_final_index
-        return token
-
-    def classify_token(self, token_text: str) -> TokenType:
-        # --- Whitespace ---
-        if token_text.strip() == '':
-            return TokenType.WHITESPACE
+        return last_final_index, self.dfa.token_types[last_final_state]
 
-        # --- Comments ---
-        if token_text.startswith("//"):
-            return TokenType.COMMENT
+    def next_span(self) -> tuple[TokenType, int, int]:
+        """Next significant token as (type, start, end) offsets into ``code``"""
+        scan = self.scan
+        code = self.code
+        n = self.n
 
-        # --- Keywords ---
-        if token_text in KEYWORDS_TABLE:
-            return KEYWORDS_TABLE[token_text]
+        while True:
+            start = self.i
+            if start >= n:
+                return TokenType.EOF, n, n
 
-        # --- Operators ---
-        if token_text in OPERATORS_TABLE:
-            return OPERATORS_TABLE[token_text]
+            end, token_type = scan(code, start, n)
+            if end < 0:
+                line, column = self.source_map.line_column(start)
+                raise LexerError("Invalid token", line, column, code[start])
+            self.i = end
 
-        # --- Punctuation ---
-        if token_text in PUNCTUATION_TABLE:
-            return PUNCTUATION_TABLE[token_text]
+            # Skip whitespaces and comments without materializing them
+            if token_type is TokenType.WHITESPACE or token_type is TokenType.COMMENT:
+                continue
+            return token_type, start, end
 
-        # --- Strings ---
-        if token_text.startswith('"') and token_text.endswith('"'):
-            return TokenType.STRING
+    def get_next_token(self) -> Token:
+        token_type, start, end = self.next_span()
+        if token_type in POOLED_KINDS:
+            index = self.pool.add(self.code[start:end])
+            return Token(token_type, self.pool.lexemes[index], offset=start, source_map=self.source_map,
+                         literal=self.pool.literals[index])
+        text = FIXED_TEXT[token_type]
+        if text is None:
+            text = self.code[start:end]
+        return Token(token_type, text, offset=start, source_map=self.source_map)
+
+    def tokenize_stream(self) -> TokenStream:
+        """All tokens, EOF included, stored compactly instead of as Token objects"""
+        stream = TokenStream(self.code, self.source_map, self.pool)
+        append = stream.append
+        while True:
+            span = self.next_span()
+            append(*span)
+            if span[0] is TokenType.EOF:
+                return stream
 
-        # --- Numbers ---
-        if token_text.replace('.', '', 1).isdigit():
-            return TokenType.FLOAT if '.' in token_text else TokenType.INTEGER
+    def tokenize_parallel(self, workers: Optional[int] = None) -> TokenStream:
+        """``tokenize_stream()`` split at newlines across worker processes"""
+        from lib.lexer.parallel import tokenize_parallel
+        return tokenize_parallel(self, workers)
 
-        # --- Identifiers ---
-        return TokenType.IDENTIFIER
+    def classify_token(self, token_text: str) -> TokenType:
+        return classify_lexeme(token_text)
 
     def tokenize(self) -> Generator[Token, None, None]:
         while True:
             token = self.get_next_token()
-
-            # Skip whitespaces and comments
-            if token.type not in {TokenType.WHITESPACE, TokenType.COMMENT}:
-                yield token
-
+            yield token
             if token.type == TokenType.EOF:
                 break
@@ -212,5 +212,5 @@ def nfa_final() -> NFA:
         final_states=final_states
     )
 
-nfa = nfa_final()
-dfa = DFA.from_nfa(nfa)
+def build_dfa(minify: bool = True) -> DFA:
+    return DFA.from_nfa(nfa_final(), minify=minify)
@@ -0,0 +1,109 @@
+import os
+from array import array
+from functools import cache
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
+from lib.lexer.token import TokenType
+from lib.lexer.token_stream import TokenStream
+from lib.lexer.dfa_compiler import CompiledDFA, load_dfa
+from lib.lexer.lexer import Lexer
+from lib.utils.error_handler import LexerError
+
+# Below this many characters per worker, starting processes costs more than it saves.
+MIN_CHUNK_CHARS = 256 * 1024
+
+_TRIVIA = (TokenType.WHITESPACE, TokenType.COMMENT)
+
+# Worker result: the chunk's compact columns and the lexemes its values
+# refer to, or the offset of a lexical error.
+ChunkResult = Union[tuple[array, array, array, array, list[str]], int]
+
+
+@cache
+def newlines_are_boundaries(dfa: CompiledDFA) -> bool:
+    """Whether splitting the source right before any newline leaves the
+    significant tokens unchanged.
+
+    True when only trivia lexemes can contain a newline and every such
+    lexeme is itself trivia just before its newline: cutting one there
+    yields two trivia pieces. (In Clash string literals cannot span lines.)
+    """
+    k = dfa.num_classes
+    newline = dfa.char_classes[ord("\n")]
+    after_newline: set[int] = set()
+    for state in range(k, dfa.num_states * k, k):
+        target = dfa.transitions[state + newline]
+        if not target:
+            continue
+        if state != dfa.initial_state and dfa.token_types[state] not in _TRIVIA:
+            return False
+        after_newline.add(target)
+
+    seen = set(after_newline)
+    pending = list(after_newline)
+    while pending:
+        state = pending.pop()
+        if dfa.accepting[state] and dfa.token_types[state] not in _TRIVIA:
+            return False
+        for c in range(1, k):
+            target = dfa.transitions[state + c]
+            if target and target not in seen:
+                seen.add(target)
+                pending.append(target)
+    return True
+
+
+def split_points(code: str, chunks: int) -> list[int]:
+    """Chunk boundaries: ``chunks`` roughly equal pieces, each cut moved
+    forward to the next newline"""
+    bounds = [0]
+    for k in range(1, chunks):
+        cut = code.find("\n", max(len(code) * k // chunks, bounds[-1]))
+        if cut < 0:
+            break
+        if cut > bounds[-1]:
+            bounds.append(cut)
+    bounds.append(len(code))
+    return bounds
+
+
+def _lex_chunk(chunk: str, engine: str) -> ChunkResult:
+    lexer = Lexer(chunk, engine=engine)
+    try:
+        stream = lexer.tokenize_stream()
+    except LexerError:
+        # LexerError doesn't survive pickling; the parent rebuilds it.
+        return lexer.i
+    # Arrays pickle as raw bytes; drop the chunk's EOF token.
+    return stream.kinds[:-1], stream.starts[:-1], stream.lengths[:-1], stream.values[:-1], stream.pool.lexemes
+
+
+def tokenize_parallel(lexer: Lexer, workers: Optional[int] = None) -> TokenStream:
+    """Same TokenStream as ``lexer.tokenize_stream()``, lexed in worker processes"""
+    code = lexer.code
+    workers = workers or os.cpu_count() or 1
+    chunks = min(workers * 4, len(code) // MIN_CHUNK_CHARS)
+    if workers < 2 or chunks < 2 or not newlines_are_boundaries(lexer.dfa):
+        return lexer.tokenize_stream()
+
+    bounds = split_points(code, chunks)
+    pieces = [code[start:end] for start, end in zip(bounds, bounds[1:])]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_lex_chunk, pieces, [lexer.engine] * len(pieces)))
+
+    stream = TokenStream(code, lexer.source_map, lexer.pool)
+    for base, result in zip(bounds, results):
+        if isinstance(result, int):
+            # Every earlier chunk lexed cleanly, so this is the first error.
+            line, column = lexer.source_map.line_column(base + result)
+            raise LexerError("Invalid token", line, column, code[base + result])
+        kinds, starts, lengths, values, lexemes = result
+        stream.kinds += kinds
+        stream.starts += array("I", [start + base for start in starts]) if base else starts
+        stream.lengths += lengths
+        # Renumber the chunk's pool indexes into the shared pool (0 stays 0).
+        renumber = [0] + [lexer.pool.add(lexeme) for lexeme in lexemes[1:]]
+        stream.values += array("I", map(renumber.__getitem__, values))
+    stream.append(TokenType.EOF, len(code), len(code))
+    lexer.i = len(code)
+    return stream
@@ -0,0 +1,63 @@
+import re
+from typing import Optional
+from lib.lexer.token import TokenType
+from lib.lexer.tables import KEYWORDS_TABLE, OPERATORS_TABLE, PUNCTUATION_TABLE
+
+# Token lexemes that need a table lookup to find their TokenType.
+_LOOKUP_GROUPS: dict[str, dict[str, TokenType]] = {
+    "KEYWORD": KEYWORDS_TABLE,
+    "OPERATOR": OPERATORS_TABLE,
+    "PUNCTUATION": PUNCTUATION_TABLE,
+}
+
+
+def _alternation(lexemes: list[str]) -> str:
+    # Longest first, as in nfa_operators, so a prefix never shadows a longer lexeme.
+    return "|".join(re.escape(lexeme) for lexeme in sorted(lexemes, key=lambda x: (-len(x), x)))
+
+
+def build_master_pattern() -> re.Pattern[str]:
+    """Single pattern equivalent to the longest match of the lexer DFA.
+
+    Alternatives are ordered so that the first one that matches is also the
+    longest DFA match: keywords only match when not followed by an identifier
+    character, comments come before operators ('//' vs '/') and floats before
+    integers. Within those constraints the most frequent tokens come first.
+    """
+    ident_char = "[A-Za-z0-9_]"
+    parts = [
+        r"(?P<WHITESPACE>[ \t\r\n]+)",
+        rf"(?P<KEYWORD>(?:{_alternation(list(KEYWORDS_TABLE))})(?!{ident_char}))",
+        rf"(?P<IDENTIFIER>[A-Za-z_]{ident_char}*)",
+        rf"(?P<PUNCTUATION>{_alternation(list(PUNCTUATION_TABLE))})",
+        r"(?P<COMMENT>//[\t\r -~]*(?:\n[ \t\r\n]*)?)",
+        rf"(?P<OPERATOR>{_alternation(list(OPERATORS_TABLE))})",
+        r"(?P<FLOAT>[0-9]+\.[0-9]+)",
+        r"(?P<INTEGER>[0-9]+)",
+        r'(?P<STRING>"[ !#-~]*")',
+    ]
+    return re.compile("|".join(parts))
+
+
+MASTER_PATTERN = build_master_pattern()
+
+# Indexed by group number: the TokenType of the group, or the table that
+# maps the matched lexeme to its TokenType.
+_GROUP_KINDS: tuple[TokenType | dict[str, TokenType] | None, ...] = tuple(
+    [None] + [
+        _LOOKUP_GROUPS.get(name) or TokenType[name]
+        for name, _ in sorted(MASTER_PATTERN.groupindex.items(), key=lambda item: item[1])
+    ]
+)
+_match = MASTER_PATTERN.match
+
+
+def scan(code: str, i: int, n: int) -> tuple[int, Optional[TokenType]]:
+    """Longest match at ``i``: (end, TokenType), or (-1, None) if none"""
+    m = _match(code, i, n)
+    if m is None:
+        return -1, None
+    kind = _GROUP_KINDS[m.lastindex or 0]
+    if isinstance(kind, dict):
+        return m.end(), kind[m.group()]
+    return m.end(), kind
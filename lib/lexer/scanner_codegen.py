@@ -0,0 +1,213 @@
+import os
+import sys
+import tempfile
+import importlib
+from functools import cache
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Optional
+from lib.lexer.token import TokenType
+from lib.lexer.dfa_compiler import ALPHABET_SIZE, DEAD_STATE, CompiledDFA, load_dfa, tables_fingerprint
+
+ScanFunction = Callable[[str, int, int], tuple[int, Optional[TokenType]]]
+
+SCANNER_MODULE = "lib.lexer.dfa_scanner"
+SCANNER_PATH = Path(__file__).with_name("dfa_scanner.py")
+
+
+class _Emitter:
+    def __init__(self, dfa: CompiledDFA) -> None:
+        self.dfa = dfa
+        self.lines: list[str] = []
+        self.charsets: dict[str, str] = {}
+        self.targets = [self._targets(s) for s in range(dfa.num_states)]
+        self.shared = self._shared_states()
+
+    def _targets(self, state: int) -> dict[int, list[int]]:
+        """Next states of ``state`` with the code points leading to each one"""
+        row = state * self.dfa.num_classes
+        by_target: dict[int, list[int]] = {}
+        for code_point in range(ALPHABET_SIZE):
+            target = self.dfa.rows[row + self.dfa.char_classes[code_point]]
+            if target != DEAD_STATE:
+                by_target.setdefault(target, []).append(code_point)
+        return by_target
+
+    def _shared_states(self) -> set[int]:
+        """States entered from more than one other state get their own function"""
+        in_degree = [0] * self.dfa.num_states
+        for state, targets in enumerate(self.targets):
+            for target in targets:
+                if target != state:
+                    in_degree[target] += 1
+        shared = {s for s, degree in enumerate(in_degree) if degree > 1}
+        self._check_acyclic()
+        return shared
+
+    def _check_acyclic(self) -> None:
+        # Calls between shared states are not loops; a cycle through them
+        # would make the recursion depth grow with the lexeme length.
+        visiting: set[int] = set()
+        done: set[int] = set()
+
+        def visit(state: int) -> None:
+            visiting.add(state)
+            for target in self.targets[state]:
+                if target == state or target in done:
+                    continue
+                if target in visiting:
+                    raise ValueError("DFA has a cycle longer than one state; use the table-driven scanner.")
+                visit(target)
+            visiting.discard(state)
+            done.add(state)
+
+        for state in range(1, self.dfa.num_states):
+            if state not in done:
+                visit(state)
+
+    def emit(self, line: str, indent: int) -> None:
+        self.lines.append("    " * indent + line)
+
+    def condition(self, code_points: list[int]) -> str:
+        """Render a set of code points as comparisons on ``c``"""
+        ranges: list[tuple[int, int]] = []
+        for cp in code_points:
+            if ranges and ranges[-1][1] == cp - 1:
+                ranges[-1] = (ranges[-1][0], cp)
+            else:
+                ranges.append((cp, cp))
+        if len(ranges) > 2:
+            # Several disjoint ranges: one hash probe beats a chain of compares.
+            chars = "".join(map(chr, code_points))
+            name = self.charsets.setdefault(chars, f"_SET_{len(self.charsets)}")
+            return f"c in {name}"
+        parts = []
+        for lo, hi in ranges:
+            if lo == hi:
+                parts.append(f"c == {chr(lo)!r}")
+            elif hi == lo + 1:
+                parts.append(f"c == {chr(lo)!r} or c == {chr(hi)!r}")
+            else:
+                parts.append(f"{chr(lo)!r} <= c <= {chr(hi)!r}")
+        return " or ".join(parts)
+
+    def tag(self, state: int) -> Optional[str]:
+        token_type = self.dfa.token_types[state * self.dfa.num_classes]
+        return f"_{token_type.name}" if token_type is not None else None
+
+    def emit_state(self, state: int, indent: int) -> None:
+        """Code run right after entering ``state`` with ``j`` past its symbol"""
+        tag = self.tag(state)
+        targets = self.targets[state]
+        if tag is not None:
+            self.emit(f"last, tag = j, {tag}", indent)
+
+        if state in targets:
+            self.emit("while j < n:", indent)
+            self.emit("c = code[j]", indent + 1)
+            self.emit(f"if not ({self.condition(targets[state])}):", indent + 1)
+            self.emit("break", indent + 2)
+            self.emit("j += 1", indent + 1)
+            if tag is not None:
+                self.emit("last = j", indent)
+
+        branches = [(target, cps) for target, cps in targets.items() if target != state]
+        # Test the widest character sets (identifiers, whitespace) first.
+        branches.sort(key=lambda branch: (-len(branch[1]), branch[0]))
+        if branches:
+            self.emit("if j < n:", indent)
+            self.emit("c = code[j]", indent + 1)
+            for k, (target, cps) in enumerate(branches):
+                keyword = "if" if k == 0 else "elif"
+                self.emit(f"{keyword} {self.condition(cps)}:", indent + 1)
+                if target in self.shared:
+                    self.emit(f"return _state_{target}(code, j + 1, n, last, tag)", indent + 2)
+                else:
+                    self.emit("j += 1", indent + 2)
+                    self.emit_state(target, indent + 2)
+        self.emit("return last, tag", indent)
+
+    def render(self, fingerprint: str) -> str:
+        header = [
+            "# Generated by lib/lexer/scanner_codegen.py -- do not edit.",
+            "# Regenerate with: python -m lib.lexer.scanner_codegen",
+            "# pyright: basic",
+            "from lib.lexer.token import TokenType",
+            "",
+            f"FINGERPRINT = {fingerprint!r}",
+            "",
+        ]
+        tags = sorted({t.name for t in self.dfa.token_types if t is not None})
+        header += [f"_{name} = TokenType.{name}" for name in tags]
+        self.lines = []
+
+        for state in sorted(self.shared):
+            self.lines.append("")
+            self.emit(f"def _state_{state}(code, j, n, last, tag):", 0)
+            self.emit_state(state, 1)
+
+        self.lines += ["", ""]
+        self.emit("def scan(code, i, n):", 0)
+        self.emit('"""Longest match at ``i``: (end, TokenType), or (-1, None) if none"""', 1)
+        self.emit("last, tag = -1, None", 1)
+        self.emit("j = i", 1)
+        self.emit_state(self.dfa.initial_state // self.dfa.num_classes, 1)
+
+        charsets = [f"{name} = frozenset({chars!r})" for chars, name in self.charsets.items()]
+        return "\n".join(header + [""] + charsets + [""] + self.lines) + "\n"
+
+
+def render_scanner(dfa: CompiledDFA, fingerprint: str) -> str:
+    return _Emitter(dfa).render(fingerprint)
+
+
+def write_scanner(source: str, path: Path = SCANNER_PATH) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".dfa_scanner.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(source)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _module_from_source(source: str) -> ModuleType:
+    module = ModuleType(SCANNER_MODULE)
+    exec(compile(source, str(SCANNER_PATH), "exec"), module.__dict__)
+    return module
+
+
+@cache
+def load_scanner() -> Optional[ScanFunction]:
+    """The generated scanner for the current DFA, or None if it can't be built"""
+    fingerprint = tables_fingerprint()
+    try:
+        module = importlib.import_module(SCANNER_MODULE)
+        if getattr(module, "FINGERPRINT", None) == fingerprint:
+            return module.scan
+    except ImportError:
+        pass
+
+    try:
+        source = render_scanner(load_dfa(), fingerprint)
+    except ValueError:
+        return None
+    try:
+        write_scanner(source)
+        sys.modules.pop(SCANNER_MODULE, None)
+        module = importlib.import_module(SCANNER_MODULE)
+    except OSError:
+        module = _module_from_source(source)
+    return module.scan
+
+
+def main() -> None:
+    dfa = load_dfa()
+    write_scanner(render_scanner(dfa, tables_fingerprint()))
+    print(f"Wrote {SCANNER_PATH} from a {dfa.num_states}-state DFA.")
+
+
+if __name__ == "__main__":
+    main()
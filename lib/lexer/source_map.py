@@ -0,0 +1,65 @@
+import re
+from array import array
+from bisect import bisect_left
+from typing import Union
+
+Source = Union[str, bytes, bytearray, memoryview]
+
+_NEWLINE = re.compile("\n")
+_NEWLINE_BYTES = re.compile(b"\n")
+_NON_ASCII = re.compile(rb"[\x80-\xff]")
+
+
+class SourceMap:
+    """Offsets of every newline in a source, to resolve line/column on demand.
+
+    Lexers record only absolute offsets; positions are computed with a
+    binary search when a diagnostic or a dump actually asks for them. For
+    UTF-8 buffers columns count characters, not bytes.
+    """
+
+    __slots__ = ("source", "newlines", "ascii")
+
+    def __init__(self, source: Source) -> None:
+        self.source = source
+        pattern = _NEWLINE if isinstance(source, str) else _NEWLINE_BYTES
+        # The regex engine does the scanning; Python only sees the matches.
+        self.newlines = array("I", [m.start() for m in pattern.finditer(source)])  # type: ignore[arg-type]
+        self.ascii = isinstance(source, str) or _NON_ASCII.search(source) is None
+
+    def edit(self, source: str, offset: int, removed: int, inserted: str) -> "SourceMap":
+        """Map of ``source``, the result of an edit of this map's source, built
+        by shifting the newline offsets instead of scanning it again"""
+        edited = SourceMap.__new__(SourceMap)
+        edited.source = source
+        edited.ascii = True
+        delta = len(inserted) - removed
+        newlines = self.newlines
+        first = bisect_left(newlines, offset)
+        last = bisect_left(newlines, offset + removed, first)
+        edited.newlines = (
+            newlines[:first]
+            + array("I", [offset + m.start() for m in _NEWLINE.finditer(inserted)])
+            + (array("I", [n + delta for n in newlines[last:]]) if delta else newlines[last:])
+        )
+        return edited
+
+    def line_column(self, offset: int) -> tuple[int, int]:
+        """1-based (line, column) of ``offset``"""
+        index = bisect_left(self.newlines, offset)
+        line_start = self.newlines[index - 1] + 1 if index else 0
+        if self.ascii:
+            return index + 1, offset - line_start + 1
+        raw = bytes(self.source[line_start:offset])
+        # UTF-8 continuation bytes don't start a new character.
+        return index + 1, len(raw) - sum(1 for b in raw if b & 0xC0 == 0x80) + 1
+
+    def line(self, offset: int) -> int:
+        return bisect_left(self.newlines, offset) + 1
+
+    def column(self, offset: int) -> int:
+        return self.line_column(offset)[1]
+
+    @property
+    def line_count(self) -> int:
+        return len(self.newlines) + 1
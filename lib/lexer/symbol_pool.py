@@ -0,0 +1,48 @@
+import sys
+from typing import Optional, Union
+from lib.lexer.token import TokenType
+from lib.lexer.tables import KEYWORDS_TABLE, OPERATORS_TABLE, PUNCTUATION_TABLE
+
+Literal = Union[int, float]
+
+# Token kinds whose text varies and is kept in a SymbolPool.
+POOLED_KINDS = frozenset((TokenType.IDENTIFIER, TokenType.INTEGER, TokenType.FLOAT))
+
+# Text of every token kind that always has the same lexeme, by TokenType value.
+FIXED_TEXT: tuple[Optional[str], ...] = tuple(
+    {
+        token_type.value: sys.intern(lexeme)
+        for table in (KEYWORDS_TABLE, OPERATORS_TABLE, PUNCTUATION_TABLE)
+        for lexeme, token_type in table.items()
+    }.get(value, "" if value == TokenType.EOF else None)
+    for value in range(max(TokenType) + 1)
+)
+
+
+class SymbolPool:
+    """Distinct identifier and number lexemes of one compilation.
+
+    Every occurrence of a name shares one interned string, and numbers are
+    converted once per distinct lexeme. Index 0 is reserved for "not pooled".
+    """
+
+    __slots__ = ("ids", "lexemes", "literals")
+
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self.lexemes: list[str] = [""]
+        self.literals: list[Optional[Literal]] = [None]
+
+    def add(self, lexeme: str) -> int:
+        index = self.ids.get(lexeme)
+        if index is None:
+            index = self.ids[lexeme] = len(self.lexemes)
+            self.lexemes.append(sys.intern(lexeme))
+            literal: Optional[Literal] = None
+            if lexeme[0].isdigit():
+                literal = float(lexeme) if "." in lexeme else int(lexeme)
+            self.literals.append(literal)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.lexemes) - 1
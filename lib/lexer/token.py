@@ -1,6 +1,8 @@
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
+from typing import Optional, Union
+from lib.lexer.source_map import SourceMap
 
-class TokenType(Enum):
+class TokenType(IntEnum):
     # KEYWORDS
     IF = auto()
     ELSE = auto()
@@ -71,12 +73,54 @@ class TokenType(Enum):
     WHITESPACE = auto()
     EOF = auto()
 
+    # Plain ints in compact token arrays, but printed like a regular Enum.
+    __str__ = Enum.__str__
+    __format__ = Enum.__format__
+
 class Token:
-    def __init__(self, type_: TokenType, value: str, line: int, column: int) -> None:
+    __slots__ = ("type", "value", "literal", "offset", "source_map", "_line", "_column")
+
+    def __init__(
+        self,
+        type_: TokenType,
+        value: str,
+        line: int = 0,
+        column: int = 0,
+        offset: int = -1,
+        source_map: Optional[SourceMap] = None,
+        literal: Optional[Union[int, float]] = None,
+    ) -> None:
         self.type: TokenType = type_
         self.value: str = value
-        self.line: int = line
-        self.column: int = column
+        # Converted value of INTEGER/FLOAT tokens, when the lexer provides it.
+        self.literal: Optional[Union[int, float]] = literal
+        self.offset: int = offset
+        # With a source map, line/column are resolved from the offset on first use.
+        self.source_map: Optional[SourceMap] = source_map
+        self._line: int = line
+        self._column: int = column
+
+    def _resolve(self) -> None:
+        if self._line == 0 and self.source_map is not None:
+            self._line, self._column = self.source_map.line_column(self.offset)
+
+    @property
+    def line(self) -> int:
+        self._resolve()
+        return self._line
+
+    @line.setter
+    def line(self, value: int) -> None:
+        self._line = value
+
+    @property
+    def column(self) -> int:
+        self._resolve()
+        return self._column
+
+    @column.setter
+    def column(self, value: int) -> None:
+        self._column = value
 
     def __repr__(self) -> str:
-        return f"Token(type={self.type}, token='{self.value}', line={self.line}, col={self.column})"
\ No newline at end of file
+        return f"Token(type={self.type}, token='{self.value}', line={self.line}, col={self.column})"
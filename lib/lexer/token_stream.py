@@ -0,0 +1,101 @@
+import unicodedata
+from array import array
+from typing import Iterator, Optional, Union
+from lib.lexer.token import Token, TokenType
+from lib.lexer.source_map import SourceMap
+from lib.lexer.symbol_pool import FIXED_TEXT, POOLED_KINDS, SymbolPool
+
+# Whatever the lexer scanned: the normalized str, or the raw UTF-8 buffer.
+Source = Union[str, bytes, bytearray, memoryview]
+
+# TokenType by value; cheaper than calling TokenType(value).
+_KINDS: tuple[TokenType, ...] = tuple(
+    {t.value: t for t in TokenType}.get(v) for v in range(max(TokenType) + 1)  # type: ignore[misc]
+)
+
+
+def decode_lexeme(raw: bytes) -> str:
+    """Text of a lexeme sliced from a UTF-8 buffer, as the str Lexer would see it"""
+    if raw.isascii():
+        return raw.decode("ascii")
+    # Same treatment the str Lexer applies to the whole source, but only
+    # paid for the (string literal) lexemes that actually need it.
+    normalized = unicodedata.normalize("NFKC", raw.decode("utf-8", errors="replace"))
+    return "".join(c if ord(c) < 128 else " " for c in normalized)
+
+
+class TokenStream:
+    """Tokens stored column-wise in parallel arrays instead of one object each.
+
+    ``kinds`` holds TokenType values (TokenType is an IntEnum, so they compare
+    equal to its members); offsets index into ``source`` and are turned into
+    lines and columns by ``source_map``. Identifiers and numbers also get an
+    index into ``pool`` in ``values`` (0 for every other kind). Indexing the
+    stream builds a Token on demand.
+    """
+
+    __slots__ = ("source", "source_map", "pool", "kinds", "starts", "lengths", "values")
+
+    def __init__(self, source: Source, source_map: Optional[SourceMap] = None, pool: Optional[SymbolPool] = None) -> None:
+        self.source = source
+        self.source_map = source_map if source_map is not None else SourceMap(source)
+        self.pool = pool if pool is not None else SymbolPool()
+        self.kinds = array("B")
+        self.starts = array("I")
+        self.lengths = array("I")
+        self.values = array("I")
+
+    def append(self, kind: TokenType, start: int, end: int) -> None:
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.lengths.append(end - start)
+        if kind in POOLED_KINDS:
+            source = self.source
+            lexeme = source[start:end] if type(source) is str else bytes(source[start:end]).decode("ascii")
+            self.values.append(self.pool.add(lexeme))  # type: ignore[arg-type]
+        else:
+            self.values.append(0)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def kind(self, index: int) -> TokenType:
+        return _KINDS[self.kinds[index]]
+
+    def types(self) -> list[TokenType]:
+        """Kinds as shared TokenType members; list indexing and comparing
+        enum members is what the interpreter's fast paths are tuned for."""
+        return list(map(_KINDS.__getitem__, self.kinds))
+
+    def text(self, index: int) -> str:
+        value = self.values[index]
+        if value:
+            return self.pool.lexemes[value]
+        fixed = FIXED_TEXT[self.kinds[index]]
+        if fixed is not None:
+            return fixed
+        start = self.starts[index]
+        end = start + self.lengths[index]
+        if isinstance(self.source, str):
+            return self.source[start:end]
+        return decode_lexeme(bytes(self.source[start:end]))
+
+    def __getitem__(self, index: int) -> Token:
+        kind = self.kinds[index]
+        start = self.starts[index]
+        value = self.values[index]
+        if value:
+            pool = self.pool
+            return Token(_KINDS[kind], pool.lexemes[value], offset=start, source_map=self.source_map, literal=pool.literals[value])
+        text = FIXED_TEXT[kind]
+        if text is None:
+            source = self.source
+            if type(source) is str:
+                text = source[start:start + self.lengths[index]]
+            else:
+                text = decode_lexeme(bytes(source[start:start + self.lengths[index]]))
+        return Token(_KINDS[kind], text, offset=start, source_map=self.source_map)
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.kinds)):
+            yield self[index]
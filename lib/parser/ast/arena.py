@@ -0,0 +1,260 @@
+import sys
+from array import array
+from typing import Any, Callable, Hashable, Optional, get_origin, get_type_hints
+from lib.lexer.source_map import SourceMap
+from lib.parser.ast import program
+from lib.parser.ast.base import Node
+from lib.parser.ast.serialize import FIELDS, FIRST_NODE, NODE_CLASSES, node_code
+
+# How a positional field is stored, from its annotation.
+CHILD, CHILDREN, STR, INT, FLOAT, BOOL = range(6)
+
+_SCALARS = {str: STR, int: INT, float: FLOAT, bool: BOOL}
+
+
+def _field_kind(annotation: Any) -> int:
+    if get_origin(annotation) is list:
+        return CHILDREN
+    return _SCALARS.get(annotation, CHILD)
+
+
+# Field kinds by node code, parallel to FIELDS.
+FIELD_KINDS: tuple[tuple[int, ...], ...] = (((),) * FIRST_NODE) + tuple(
+    tuple(_field_kind(get_type_hints(cls)[name]) for name in names)
+    for cls, names in zip(NODE_CLASSES, FIELDS)
+)
+
+class Arena:
+    """A whole AST in a few typed arrays instead of one object per node.
+
+    Node ``i`` is of class ``NODE_CLASSES[kinds[i] - FIRST_NODE]`` and starts
+    at ``offsets[i]`` in the source (a negative value ``~k`` means it has no
+    offset and its line and column are ``line_cols[2k]`` and
+    ``line_cols[2k + 1]``). Its fields, in ``FIELDS`` order, are
+    ``data[starts[i]:]``: the index of a child node (-1 for None), the
+    position in ``data`` of a list (its length, then its node indexes), an
+    index into ``strings``, ``floats`` or ``big_ints``, an int or a bool.
+    Nodes are numbered in preorder.
+
+    ``program()`` and ``node(i)`` present the arena through views: subclasses
+    of the node classes whose fields are read from the arrays on access, so
+    anything written against the node classes runs on them unchanged.
+    """
+
+    __slots__ = (
+        "kinds", "offsets", "starts", "data", "line_cols",
+        "strings", "string_ids", "floats", "big_ints", "declarations", "source_map",
+    )
+
+    def __init__(self, source_map: Optional[SourceMap] = None) -> None:
+        self.kinds = array("B")
+        self.offsets = array("i")
+        self.starts = array("I")
+        self.data = array("i")
+        self.line_cols = array("I")
+        self.strings: list[str] = []
+        self.string_ids: dict[str, int] = {}
+        self.floats = array("d")
+        self.big_ints: list[int] = []
+        self.declarations = array("I")
+        self.source_map = source_map
+
+    @classmethod
+    def from_program(cls, prog: program.Program) -> "Arena":
+        arena = cls()
+        for declaration in prog.declarations:
+            arena.append(declaration)
+        return arena
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def append(self, declaration: Node) -> None:
+        """Copy ``declaration`` in as the next top-level declaration"""
+        self.declarations.append(self._add(declaration))
+
+    def _add(self, root: Node) -> int:
+        kinds, offsets, starts, data = self.kinds, self.offsets, self.starts, self.data
+        first = len(kinds)
+        # (node, where in data to write its index)
+        pending: list[tuple[Node, int]] = [(root, -1)]
+        while pending:
+            node, slot = pending.pop()
+            index = len(kinds)
+            if slot >= 0:
+                data[slot] = index
+            code = node_code(type(node))
+            kinds.append(code)
+            if node.source_map is not None:
+                if self.source_map is None:
+                    self.source_map = node.source_map
+                offsets.append(node.offset)
+            else:
+                offsets.append(~(len(self.line_cols) // 2))
+                self.line_cols.extend((node.line, node.col))
+            start = len(data)
+            starts.append(start)
+            names = FIELDS[code - FIRST_NODE]
+            data.extend([0] * len(names))
+            children: list[tuple[Node, int]] = []
+            for j, (name, kind) in enumerate(zip(names, FIELD_KINDS[code])):
+                value = getattr(node, name)
+                if kind == CHILD:
+                    if value is None:
+                        data[start + j] = -1
+                    else:
+                        children.append((value, start + j))
+                elif kind == CHILDREN:
+                    data[start + j] = len(data)
+                    data.append(len(value))
+                    base = len(data)
+                    data.extend([0] * len(value))
+                    children += [(child, base + k) for k, child in enumerate(value)]
+                elif kind == STR:
+                    data[start + j] = self._string(value)
+                elif kind == INT:
+                    if 0 <= value < 2**31:
+                        data[start + j] = value
+                    else:
+                        data[start + j] = ~len(self.big_ints)
+                        self.big_ints.append(value)
+                elif kind == FLOAT:
+                    data[start + j] = len(self.floats)
+                    self.floats.append(value)
+                else:
+                    data[start + j] = bool(value)
+            # Popped in order, so numbering is preorder.
+            children.reverse()
+            pending += children
+        return first
+
+    def _string(self, text: str) -> int:
+        index = self.string_ids.get(text)
+        if index is None:
+            index = self.string_ids[text] = len(self.strings)
+            self.strings.append(sys.intern(text))
+        return index
+
+    def program(self) -> program.Program:
+        view = _ProgramView.__new__(_ProgramView)
+        view._arena = self
+        return view
+
+    def node(self, index: int) -> Node:
+        view = _VIEWS[self.kinds[index]].__new__(_VIEWS[self.kinds[index]])
+        view._arena = self
+        view._node = index
+        return view
+
+    def line_column(self, index: int) -> tuple[int, int]:
+        offset = self.offsets[index]
+        if offset >= 0:
+            assert self.source_map is not None
+            return self.source_map.line_column(offset)
+        k = 2 * ~offset
+        return self.line_cols[k], self.line_cols[k + 1]
+
+    def nbytes(self) -> int:
+        """Memory held by the arrays and the string table"""
+        columns = (self.kinds, self.offsets, self.starts, self.data, self.line_cols, self.floats, self.declarations)
+        total = sum(sys.getsizeof(column) for column in columns)
+        total += sys.getsizeof(self.strings) + sys.getsizeof(self.string_ids) + sum(map(sys.getsizeof, self.strings))
+        return total + sys.getsizeof(self.big_ints) + sum(map(sys.getsizeof, self.big_ints))
+
+
+def _getter(j: int, kind: int) -> Callable[[Any], Any]:
+    if kind == CHILD:
+        def get(view: Any) -> Any:
+            arena = view._arena
+            child = arena.data[arena.starts[view._node] + j]
+            return arena.node(child) if child >= 0 else None
+    elif kind == CHILDREN:
+        def get(view: Any) -> Any:
+            arena = view._arena
+            data = arena.data
+            at = data[arena.starts[view._node] + j]
+            return [arena.node(child) for child in data[at + 1:at + 1 + data[at]]]
+    elif kind == STR:
+        def get(view: Any) -> Any:
+            arena = view._arena
+            return arena.strings[arena.data[arena.starts[view._node] + j]]
+    elif kind == INT:
+        def get(view: Any) -> Any:
+            arena = view._arena
+            value = arena.data[arena.starts[view._node] + j]
+            return value if value >= 0 else arena.big_ints[~value]
+    elif kind == FLOAT:
+        def get(view: Any) -> Any:
+            arena = view._arena
+            return arena.floats[arena.data[arena.starts[view._node] + j]]
+    else:
+        def get(view: Any) -> Any:
+            arena = view._arena
+            return bool(arena.data[arena.starts[view._node] + j])
+    return get
+
+
+def _line(view: Any) -> int:
+    return view._arena.line_column(view._node)[0]
+
+
+def _col(view: Any) -> int:
+    return view._arena.line_column(view._node)[1]
+
+
+def _offset(view: Any) -> int:
+    return max(view._arena.offsets[view._node], -1)
+
+
+def _source_map(view: Any) -> Optional[SourceMap]:
+    return view._arena.source_map if view._arena.offsets[view._node] >= 0 else None
+
+
+def _view_class(cls: type[Node], code: int) -> type[Node]:
+    namespace: dict[str, Any] = {
+        # Underscored: ArrayAccess has a field called "index".
+        "__slots__": ("_arena", "_node"),
+        "__doc__": f"{cls.__name__} read from an Arena",
+        "line": property(_line),
+        "col": property(_col),
+        "offset": property(_offset),
+        "source_map": property(_source_map),
+    }
+    for j, (name, kind) in enumerate(zip(FIELDS[code - FIRST_NODE], FIELD_KINDS[code])):
+        namespace[name] = property(_getter(j, kind))
+    return type(cls.__name__, (cls,), namespace)
+
+
+_VIEWS: tuple[Optional[type[Node]], ...] = (None,) * FIRST_NODE + tuple(
+    _view_class(cls, code) for code, cls in enumerate(NODE_CLASSES, FIRST_NODE)
+)
+
+
+_VIEW_CLASSES = frozenset(_VIEWS[FIRST_NODE:])
+
+
+def node_key(node: Node) -> Hashable:
+    """What identifies ``node`` in a side table: its id, or for a view,
+    which is a new object on every access, its arena and index. A view's
+    key holds the arena, so it stays valid without keeping the view."""
+    if type(node) in _VIEW_CLASSES:
+        return node._arena, node._node  # type: ignore[attr-defined]
+    return id(node)
+
+
+class _ProgramView(program.Program):
+    """The top-level declarations of an Arena"""
+
+    __slots__ = ("_arena",)
+    # What repr() and the --parser dump show.
+    __qualname__ = "Program"
+
+    line = property(lambda self: 0)
+    col = property(lambda self: 0)
+    offset = property(lambda self: -1)
+    source_map = property(lambda self: None)
+
+    @property
+    def declarations(self) -> list[Node]:  # type: ignore[override]
+        arena = self._arena
+        return [arena.node(index) for index in arena.declarations]
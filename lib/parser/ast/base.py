@@ -1,6 +1,40 @@
+from typing import Any, Optional
 from dataclasses import dataclass, field
+from lib.lexer.source_map import SourceMap
 
 @dataclass(slots=True)
 class Node:
     line: int = field(default=0, kw_only=True)
     col: int = field(default=0, kw_only=True)
+    # Nodes built from a token stream only keep an offset; ``line``/``col``
+    # are resolved through the source map the first time they are read.
+    offset: int = field(default=-1, kw_only=True, repr=False, compare=False)
+    source_map: Optional[SourceMap] = field(default=None, kw_only=True, repr=False, compare=False)
+
+    def position(self) -> dict[str, Any]:
+        """Keyword arguments that give another node the same position"""
+        if self.source_map is not None:
+            return {"offset": self.offset, "source_map": self.source_map}
+        return {"line": self.line, "col": self.col}
+
+
+def _lazy_position(slot: Any, index: int) -> property:
+    # Wraps the slot dataclass generated for ``line``/``col``; subclasses
+    # don't re-create inherited slots, so they all go through the property.
+    def get(node: Node) -> int:
+        value = slot.__get__(node)
+        if value == 0 and node.source_map is not None:
+            line, col = node.source_map.line_column(node.offset)
+            _LINE.__set__(node, line)
+            _COL.__set__(node, col)
+            return (line, col)[index]
+        return value
+
+    # Construction goes straight to the slot.
+    return property(get, slot.__set__)
+
+
+_LINE = Node.__dict__["line"]
+_COL = Node.__dict__["col"]
+Node.line = _lazy_position(_LINE, 0)  # type: ignore[assignment]
+Node.col = _lazy_position(_COL, 1)  # type: ignore[assignment]
@@ -0,0 +1,233 @@
+import gc
+import sys
+import struct
+from array import array
+from dataclasses import fields
+from typing import Any, Optional, Union
+from lib.lexer.source_map import SourceMap
+from lib.parser.ast import program, declarations, statements, expressions, types
+from lib.parser.ast.base import Node
+
+# Every concrete node class; a node is written as its index here plus FIRST_NODE.
+NODE_CLASSES: tuple[type[Node], ...] = (
+    program.Program,
+    declarations.VarDecl, declarations.FieldDecl, declarations.StructDecl,
+    declarations.ParamDecl, declarations.FuncDecl,
+    statements.BlockStmt, statements.ExpressionStmt, statements.ElifBranch, statements.IfStmt,
+    statements.LoopStmt, statements.ReturnStmt, statements.BreakStmt, statements.ContinueStmt,
+    expressions.Identifier, expressions.IntLiteral, expressions.FloatLiteral,
+    expressions.StringLiteral, expressions.BoolLiteral, expressions.LiteralList,
+    expressions.FieldInit, expressions.StructLiteral, expressions.AssignExpr,
+    expressions.BinaryOp, expressions.UnaryOp, expressions.FuncCall,
+    expressions.MemberAccess, expressions.ArrayAccess,
+    types.BaseType, types.ListType,
+)
+
+# Codes of the items that are not nodes.
+NONE, VALUE, LIST = range(3)
+FIRST_NODE = 3
+
+# Positional fields of each node class (the position ones are keyword-only).
+FIELDS: tuple[tuple[str, ...], ...] = tuple(
+    tuple(f.name for f in fields(cls) if not f.kw_only) for cls in NODE_CLASSES
+)
+
+_CODES = {cls: code for code, cls in enumerate(NODE_CLASSES, FIRST_NODE)}
+
+
+def node_code(cls: type[Node]) -> int:
+    """Code of a node class; subclasses (such as arena views) get the code of
+    the node class they derive from"""
+    code = _CODES.get(cls)
+    if code is None:
+        code = _CODES[cls] = next(_CODES[base] for base in cls.__mro__ if base in _CODES)
+    return code
+
+# (class, number of positional fields) by code.
+_BUILD: tuple[Optional[tuple[type[Node], int]], ...] = (None,) * FIRST_NODE + tuple(
+    (cls, len(names)) for cls, names in zip(NODE_CLASSES, FIELDS)
+)
+
+# An offset into the source, or (line, col) for nodes without a source map.
+Position = Union[int, tuple[int, int]]
+
+# A list of nodes in postfix order: ``codes`` has one entry per node, list,
+# None or plain value, and ``values`` the plain values, list lengths and node
+# positions, in the order the codes consume them.
+Flat = tuple[array, list[Any]]
+
+
+def flatten(nodes: list[Node]) -> Flat:
+    """``nodes`` as a Flat, which pickles far smaller and faster than the
+    dataclasses themselves"""
+    codes = array("B")
+    values: list[Any] = []
+    # Written parent first with children last-to-first, then reversed:
+    # children first, in order, then their parent. No recursion.
+    pending: list[Any] = [nodes]
+    while pending:
+        item = pending.pop()
+        if item is None:
+            codes.append(NONE)
+        elif type(item) is list:
+            codes.append(LIST)
+            values.append(len(item))
+            pending += item
+        elif isinstance(item, Node):
+            code = node_code(type(item))
+            codes.append(code)
+            values.append(item.offset if item.source_map is not None else (item.line, item.col))
+            pending += [getattr(item, name) for name in FIELDS[code - FIRST_NODE]]
+        else:
+            codes.append(VALUE)
+            values.append(item)
+    codes.reverse()
+    values.reverse()
+    return codes, values
+
+
+def unflatten(flat: Flat, source_map: Optional[SourceMap] = None) -> list[Node]:
+    """The nodes of ``flat``; offsets are resolved through ``source_map``"""
+    # A tree makes no reference cycles, but allocating it triggers collections
+    # that only rescan the new nodes; they cost as much as building them.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _build(flat, source_map)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _build(flat: Flat, source_map: Optional[SourceMap]) -> list[Node]:
+    codes, values = flat
+    stack: list[Any] = []
+    push = stack.append
+    next_value = iter(values).__next__
+    build = _BUILD
+    for code in codes:
+        if code == VALUE:
+            push(next_value())
+        elif code == NONE:
+            push(None)
+        elif code == LIST:
+            count = next_value()
+            if count:
+                items = stack[-count:]
+                del stack[-count:]
+                push(items)
+            else:
+                push([])
+        else:
+            position: Position = next_value()
+            cls, count = build[code]  # type: ignore[misc]
+            if count:
+                args = stack[-count:]
+                del stack[-count:]
+            else:
+                args = []
+            if type(position) is int:
+                push(cls(*args, offset=position, source_map=source_map))
+            else:
+                push(cls(*args, line=position[0], col=position[1]))
+    return stack.pop()
+
+
+# Kinds of the plain values in the binary encoding.
+INT, BIG_INT, FLOAT, STR, TRUE, FALSE, LINE_COL = range(7)
+
+# Changes whenever the node classes or their fields do.
+SCHEMA = ";".join(f"{cls.__name__}({','.join(names)})" for cls, names in zip(NODE_CLASSES, FIELDS))
+
+_MAGIC = b"CLASHAST"
+# Typecode of the ints column, then the item counts of each section: codes,
+# kinds, ints, floats, strings, text bytes.
+_HEADER = struct.Struct("<8sc6Q")
+
+
+def to_bytes(nodes: list[Node]) -> bytes:
+    """``nodes`` in a binary form: the codes of ``flatten`` and its values
+    split into typed columns, strings stored once each"""
+    codes, values = flatten(nodes)
+    kinds = array("B")
+    ints = array("q")
+    floats = array("d")
+    strings: dict[str, int] = {}
+    for value in values:
+        cls = type(value)
+        if cls is int:
+            if -2**63 <= value < 2**63:
+                kinds.append(INT)
+                ints.append(value)
+            else:
+                kinds.append(BIG_INT)
+                ints.append(strings.setdefault(str(value), len(strings)))
+        elif cls is str:
+            kinds.append(STR)
+            ints.append(strings.setdefault(value, len(strings)))
+        elif cls is bool:
+            kinds.append(TRUE if value else FALSE)
+        elif cls is float:
+            kinds.append(FLOAT)
+            floats.append(value)
+        else:
+            kinds.append(LINE_COL)
+            ints.extend(value)
+    encoded = [text.encode("utf-8", "surrogatepass") for text in strings]
+    lengths = array("I", map(len, encoded))
+    text = b"".join(encoded)
+    if not ints or (min(ints) >= 0 and max(ints) < 2**32):
+        # Offsets and counts; half the size.
+        ints = array("I", ints)
+    if sys.byteorder != "little":
+        for column in (ints, floats, lengths):
+            column.byteswap()
+    header = _HEADER.pack(_MAGIC, ints.typecode.encode(), len(codes), len(kinds), len(ints), len(floats), len(lengths), len(text))
+    return b"".join((header, codes.tobytes(), kinds.tobytes(), ints.tobytes(), floats.tobytes(), lengths.tobytes(), text))
+
+
+def from_bytes(data: bytes, source_map: Optional[SourceMap] = None) -> list[Node]:
+    """The nodes ``to_bytes`` encoded; raises ValueError if ``data`` isn't
+    such an encoding"""
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated AST encoding.")
+    magic, int_typecode, *counts = _HEADER.unpack_from(data)
+    if magic != _MAGIC or int_typecode not in (b"I", b"q"):
+        raise ValueError("Not an AST encoding.")
+    columns = [array("B"), array("B"), array(int_typecode.decode()), array("d"), array("I")]
+    position = _HEADER.size
+    for column, count in zip(columns, counts):
+        end = position + count * column.itemsize
+        column.frombytes(data[position:end])
+        position = end
+    codes, kinds, ints, floats, lengths = columns
+    if sys.byteorder != "little":
+        for column in (ints, floats, lengths):
+            column.byteswap()
+    text = data[position:position + counts[-1]]
+    if len(lengths) != counts[4] or len(text) != counts[5]:
+        raise ValueError("Truncated AST encoding.")
+
+    strings = []
+    start = 0
+    for length in lengths:
+        strings.append(sys.intern(text[start:start + length].decode("utf-8", "surrogatepass")))
+        start += length
+    values: list[Any] = []
+    append = values.append
+    next_int = iter(ints).__next__
+    next_float = iter(floats).__next__
+    for kind in kinds:
+        if kind == INT:
+            append(next_int())
+        elif kind == STR:
+            append(strings[next_int()])
+        elif kind == LINE_COL:
+            append((next_int(), next_int()))
+        elif kind == FLOAT:
+            append(next_float())
+        elif kind == BIG_INT:
+            append(int(strings[next_int()]))
+        else:
+            append(kind == TRUE)
+    return unflatten((codes, values), source_map)
@@ -0,0 +1,58 @@
+from typing import Any, Callable, ClassVar, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Calls the handler of a node's class with the node.
+Dispatch = Callable[[Any], Any]
+
+
+def visits(family: str, *classes: type) -> Callable[[F], F]:
+    """Marks a Visitor method as the ``family`` handler of nodes of
+    ``classes`` (and of their subclasses that have no handler of their own)"""
+    def mark(method: F) -> F:
+        method.__dict__.setdefault("_visits", []).append((family, classes))
+        return method
+    return mark
+
+
+class Visitor:
+    """Base class of the passes over the AST.
+
+    Handlers are methods marked with ``@visits``; a pass can have several
+    families of them (statements, expressions...). ``dispatcher(family,
+    fallback)`` returns a function that calls the family's handler for a
+    node: the handler is found once per node class, through its MRO, and
+    cached as a bound method, so dispatching costs one dict lookup however
+    many handlers there are.
+    """
+
+    # Family -> node class -> name of the handler method.
+    _handlers: ClassVar[dict[str, dict[type, str]]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        handlers = {family: dict(table) for family, table in cls._handlers.items()}
+        for name, attribute in vars(cls).items():
+            for family, classes in getattr(attribute, "_visits", ()):
+                for node_class in classes:
+                    handlers.setdefault(family, {})[node_class] = name
+        cls._handlers = handlers
+
+    def dispatcher(self, family: str, fallback: Dispatch) -> Dispatch:
+        """Dispatch over the ``family`` handlers; nodes of a class without
+        one go to ``fallback``"""
+        names = self._handlers.get(family, {})
+        table: dict[type, Dispatch] = {}
+
+        def resolve(cls: type) -> Dispatch:
+            name = next((names[base] for base in cls.__mro__ if base in names), None)
+            handler = table[cls] = fallback if name is None else getattr(self, name)
+            return handler
+
+        def dispatch(node: Any) -> Any:
+            handler = table.get(type(node))
+            if handler is None:
+                handler = resolve(type(node))
+            return handler(node)
+
+        return dispatch
@@ -0,0 +1,170 @@
+import os
+import struct
+import hashlib
+import tempfile
+from dataclasses import dataclass
+from typing import Optional, Union
+from lib.lexer.dfa_compiler import tables_fingerprint
+from lib.lexer.source_map import SourceMap
+from lib.parser.ast import program
+from lib.parser.ast.serialize import SCHEMA, from_bytes, to_bytes
+from lib.utils.version import VERSION
+
+try:
+    import fcntl
+except ImportError:  # Windows: counts are updated without a lock.
+    fcntl = None  # type: ignore[assignment]
+
+Source = Union[str, bytes, bytearray, memoryview]
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "clash")
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+_SUFFIX = ".ast"
+
+# What a corrupt entry raises while it is decoded.
+_CORRUPT = (OSError, ValueError, IndexError, TypeError, struct.error)
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int
+    misses: int
+    entries: int
+    size: int
+    max_size: int
+
+    def __str__(self) -> str:
+        lookups = self.hits + self.misses
+        rate = f"{100 * self.hits / lookups:.1f}%" if lookups else "-"
+        return (
+            f"AST cache: {self.hits} hits, {self.misses} misses (hit rate {rate}), "
+            f"{self.entries} entries, {self.size / 2**20:.1f} of {self.max_size / 2**20:.1f} MiB"
+        )
+
+
+class ASTCache:
+    """Parsed programs on disk, addressed by a hash of their source.
+
+    Entries are written to a temporary file and renamed into place, so
+    compiler processes sharing the directory never read a partial entry.
+    A hit refreshes the entry's mtime; when the directory grows past
+    ``max_bytes`` the entries used longest ago are removed. Hits and misses
+    are counts in a file each, updated under a lock where the platform has
+    ``fcntl``.
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source: Source) -> str:
+        """Hash of the source and of what decides its AST: the lexer tables,
+        the node format and the compiler version, which is bumped when the
+        parser's output changes"""
+        digest = hashlib.sha256()
+        # Offsets count characters in a str source and bytes in a buffer.
+        unit = "str" if isinstance(source, str) else "bytes"
+        digest.update(f"{VERSION}\0{tables_fingerprint()}\0{SCHEMA}\0{unit}\0".encode())
+        digest.update(source.encode("utf-8", "surrogatepass") if isinstance(source, str) else source)
+        return digest.hexdigest()
+
+    def load(self, source: Source, source_map: SourceMap) -> Optional[program.Program]:
+        """The cached AST of ``source``, its nodes positioned through ``source_map``"""
+        path = self._path(self.key(source))
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            prog = program.Program(declarations=from_bytes(data, source_map))
+        except _CORRUPT:
+            # Missing, or unreadable: parsed again and overwritten.
+            self._count("misses")
+            return None
+        self._count("hits")
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # Evicted meanwhile.
+        return prog
+
+    def store(self, source: Source, prog: program.Program) -> None:
+        data = to_bytes(prog.declarations)
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temporary, self._path(self.key(source)))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        self._evict()
+
+    def stats(self) -> CacheStats:
+        entries = self._entries()
+        return CacheStats(
+            hits=self._counter("hits"),
+            misses=self._counter("misses"),
+            entries=len(entries),
+            size=sum(size for _, size, _ in entries),
+            max_size=self.max_bytes,
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        """(mtime, size, path) of every entry"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+
+    def _count(self, counter: str) -> None:
+        try:
+            fd = os.open(os.path.join(self.directory, counter), os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError:
+            return
+        try:
+            if fcntl is not None:
+                # Released when the file is closed.
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            count = str(_parse_count(os.read(fd, 64)) + 1).encode()
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, count)
+            os.ftruncate(fd, len(count))
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _counter(self, counter: str) -> int:
+        try:
+            with open(os.path.join(self.directory, counter), "rb") as f:
+                return _parse_count(f.read(64))
+        except FileNotFoundError:
+            return 0
+
+
+def _parse_count(data: bytes) -> int:
+    return int(data) if data.isdigit() else 0
+
@@ -0,0 +1,127 @@
+import os
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Sequence
+from lib.lexer.token import TokenType
+from lib.lexer.token_stream import TokenStream
+from lib.parser.parser import Parser
+from lib.parser.ast import program
+from lib.parser.ast.base import Node
+from lib.parser.ast.serialize import Flat, flatten, unflatten
+from lib.utils.error_handler import ParserError
+from lib.utils.trampoline import trampoline
+
+# Below this many tokens per worker, starting processes costs more than it saves.
+MIN_CHUNK_TOKENS = 64 * 1024
+
+_OPENERS = frozenset((TokenType.LPAREN, TokenType.LBRACKET, TokenType.LBRACE))
+_CLOSERS = frozenset((TokenType.RPAREN, TokenType.RBRACKET, TokenType.RBRACE))
+_DECLARATIONS = frozenset((TokenType.VAR, TokenType.FUNC, TokenType.STRUCT))
+_ENDINGS = frozenset((TokenType.SEMICOLON, TokenType.RBRACE))
+
+# Worker result: the declarations parsed, in compact form, and where parsing
+# stopped; if the flag is set, the declaration starting there has an error.
+SegmentResult = tuple[Flat, int, bool]
+
+_parser: Optional[Parser] = None
+
+
+def declaration_starts(kinds: Sequence[int]) -> list[int]:
+    """Indexes of the 'var'/'func'/'struct' tokens that look like the start
+    of a top-level declaration: outside any bracket, right after a ';' or '}'.
+
+    Only a guess, made by balancing brackets; ``parse_parallel`` checks that
+    the parse of each segment really ends where the next one starts.
+    """
+    starts = []
+    depth = 0
+    previous = TokenType.SEMICOLON
+    for index, kind in enumerate(kinds):
+        if kind in _OPENERS:
+            depth += 1
+        elif kind in _CLOSERS:
+            depth -= 1
+        elif depth == 0 and kind in _DECLARATIONS and previous in _ENDINGS:
+            starts.append(index)
+        previous = kind
+    return starts
+
+
+def segment_bounds(kinds: Sequence[int], segments: int) -> list[int]:
+    """Token indexes splitting the stream into about ``segments`` pieces of
+    similar size, each cut at a declaration start"""
+    starts = declaration_starts(kinds)
+    bounds = [0]
+    for k in range(1, segments):
+        i = bisect_left(starts, len(kinds) * k // segments)
+        if i < len(starts) and starts[i] > bounds[-1]:
+            bounds.append(starts[i])
+    bounds.append(len(kinds))
+    return bounds
+
+
+def _start_worker(stream: TokenStream) -> None:
+    global _parser
+    _parser = Parser(stream)
+
+
+def _parse_segment(start: int, end: int) -> SegmentResult:
+    parser = _parser
+    assert parser is not None
+    parser.current = start
+    nodes: list[Node] = []
+    while True:
+        parser.skip_trivia()
+        if parser.current >= end or parser.is_at_end():
+            return flatten(nodes), parser.current, False
+        declaration = parser.current
+        try:
+            nodes.append(trampoline(parser.parse_toplevel()))
+        except ParserError:
+            # ParserError doesn't survive pickling; the parent parses this
+            # declaration again to raise it.
+            return flatten(nodes), declaration, True
+
+
+def _parse_until(parser: Parser, prog: program.Program, stop: int) -> None:
+    while parser.current < stop:
+        parser.skip_trivia()
+        if parser.current >= stop or parser.is_at_end():
+            return
+        prog.declarations.append(trampoline(parser.parse_toplevel()))
+
+
+def parse_parallel(parser: Parser, workers: Optional[int] = None) -> program.Program:
+    """Same Program as ``parser.parse()``, with top-level declarations parsed
+    in worker processes"""
+    stream = parser.tokens
+    workers = workers or os.cpu_count() or 1
+    if not isinstance(stream, TokenStream) or parser.current:
+        return parser.parse()
+    segments = min(workers * 4, len(stream) // MIN_CHUNK_TOKENS)
+    if workers < 2 or segments < 2:
+        return parser.parse()
+
+    kinds: array = stream.kinds
+    bounds = segment_bounds(kinds, segments)
+    prog = program.Program()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker, initargs=(stream,)) as pool:
+        results = pool.map(_parse_segment, bounds[:-1], bounds[1:])
+        try:
+            for start, (flat, stop, failed) in zip(bounds, results):
+                # Declarations before ``start`` are parsed here if the previous
+                # segment didn't end exactly at it (the guess was wrong).
+                _parse_until(parser, prog, start)
+                if parser.current != start:
+                    continue
+                prog.declarations += unflatten(flat, stream.source_map)
+                parser.current = stop
+                if failed:
+                    # Every earlier declaration parsed cleanly: this is the first error.
+                    prog.declarations.append(trampoline(parser.parse_toplevel()))
+        except ParserError:
+            pool.shutdown(cancel_futures=True)
+            raise
+    _parse_until(parser, prog, len(stream))
+    return prog
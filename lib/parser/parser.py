@@ -1,11 +1,79 @@
-from typing import Optional
+import sys
+from typing import Any, Iterator, Optional, Union
 from lib.lexer.token import Token, TokenType
+from lib.lexer.token_stream import TokenStream
+from lib.lexer.symbol_pool import FIXED_TEXT
+from lib.parser.token_cursor import KindView, TokenCursor
 from lib.parser.ast import program, declarations, statements, expressions, types
+from lib.parser.ast.arena import Arena
 from lib.utils.error_handler import ParserError
+from lib.utils.trampoline import Step, trampoline
+
+# Binding powers of the infix operators, loosest first; 0 is "not an infix operator".
+ASSIGNMENT, LOGICAL_OR, LOGICAL_AND, EQUALITY, RELATIONAL, ADDITIVE, MULTIPLICATIVE, POWER = range(1, 9)
+
+RIGHT_ASSOCIATIVE = frozenset((ASSIGNMENT, POWER))
+
+_INFIX_OPERATORS = {
+    ASSIGNMENT: (
+        TokenType.EQUALS, TokenType.PLUS_EQUAL, TokenType.MINUS_EQUAL,
+        TokenType.MULTIPLY_EQUAL, TokenType.DIVIDE_EQUAL, TokenType.MODULE_EQUAL,
+    ),
+    LOGICAL_OR: (TokenType.OR,),
+    LOGICAL_AND: (TokenType.AND,),
+    EQUALITY: (TokenType.EQUAL_EQUAL, TokenType.NOT_EQUAL),
+    RELATIONAL: (TokenType.LESS, TokenType.LESS_OR_EQUAL, TokenType.GREATER, TokenType.GREATER_OR_EQUAL),
+    ADDITIVE: (TokenType.PLUS, TokenType.MINUS),
+    MULTIPLICATIVE: (TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULE),
+    POWER: (TokenType.POWER,),
+}
+
+# Tokens that are a whole primary expression on their own.
+ATOM_KINDS = frozenset((
+    TokenType.INTEGER, TokenType.FLOAT, TokenType.STRING, TokenType.TRUE, TokenType.FALSE,
+    TokenType.PRINT, TokenType.LEN, TokenType.IDENTIFIER,
+))
+
+POSTFIX_KINDS = frozenset((TokenType.DOT, TokenType.LBRACKET, TokenType.LPAREN))
+
+PREFIX_KINDS = frozenset((TokenType.NOT, TokenType.MINUS))
+
+BASE_TYPE_KINDS = (
+    TokenType.VOID_TYPE, TokenType.INT_TYPE, TokenType.FLOAT_TYPE,
+    TokenType.BOOL_TYPE, TokenType.STR_TYPE, TokenType.IDENTIFIER,
+)
+
+# Constructs an expression can be nested in, as tracked by the recognizer.
+GROUP, INDEX, CALL, LIST, FIELDS = range(5)
+
+# Indexed by TokenType value.
+BINDING_POWER: tuple[int, ...] = tuple(
+    next((power for power, kinds in _INFIX_OPERATORS.items() if value in kinds), 0)
+    for value in range(max(TokenType) + 1)
+)
 
 class Parser:
-    def __init__(self, tokens: list[Token]):
-        self.tokens = tokens
+    """Recursive-descent parser for Clash.
+
+    Rules that can nest (statements, blocks and expressions) are generators
+    run by ``trampoline``: instead of calling a sub-rule they ``yield`` its
+    generator and get its node back, so nesting depth is not limited by
+    Python's recursion limit.
+    """
+
+    def __init__(self, tokens: Union[list[Token], TokenStream, Iterator[Token]]):
+        self.tokens: Union[list[Token], TokenStream, TokenCursor]
+        self.kinds: Union[list[TokenType], KindView]
+        if isinstance(tokens, TokenStream):
+            # Lookahead only needs the kinds; Tokens are built when a rule reads one.
+            self.tokens, self.kinds = tokens, tokens.types()
+        elif isinstance(tokens, list):
+            self.tokens, self.kinds = tokens, [t.type for t in tokens]
+        else:
+            # Pulled from the iterator as parsing goes; the stream ends at EOF.
+            self.tokens = TokenCursor(tokens)
+            self.kinds = self.tokens.kinds
+        self.count = len(tokens) if isinstance(tokens, (list, TokenStream)) else sys.maxsize
         self.current = 0
 
     def parse(self) -> program.Program:
@@ -15,20 +83,54 @@ class Parser:
             self.skip_trivia()
             if self.is_at_end():
                 break
-            prog_node.declarations.append(self.parse_toplevel())
+            prog_node.declarations.append(trampoline(self.parse_toplevel()))
 
         return prog_node
+
+    def parse_arena(self) -> Arena:
+        """``parse()`` into an Arena, one top-level declaration at a time, so
+        the object tree of the whole program never exists at once"""
+        arena = Arena()
+        while not self.is_at_end():
+            self.skip_trivia()
+            if self.is_at_end():
+                break
+            arena.append(trampoline(self.parse_toplevel()))
+        return arena
+
+    def parse_parallel(self, workers: Optional[int] = None) -> program.Program:
+        """``parse()`` with top-level declarations parsed in worker processes"""
+        from lib.parser.parallel import parse_parallel
+        return parse_parallel(self, workers)
+
+    def recognize(self) -> None:
+        """Check the syntax like ``parse`` does, raising the same
+        ``ParserError``s, without building the AST."""
+        while not self.is_at_end():
+            self.skip_trivia()
+            if self.is_at_end():
+                break
+            if self.match(TokenType.VAR):
+                self._recognize_var_declaration()
+            elif self.match(TokenType.FUNC):
+                self._recognize_func_declaration()
+            elif self.match(TokenType.STRUCT):
+                self._recognize_struct_declaration()
+            else:
+                open_blocks: list[bool] = []
+                self._recognize_statement(open_blocks)
+                self._recognize_open_blocks(open_blocks)
     
-    def parse_toplevel(self):
+    def parse_toplevel(self) -> Step[Union[declarations.Declaration, statements.Statement]]:
         if self.check(TokenType.VAR) or self.check(TokenType.FUNC) or self.check(TokenType.STRUCT):
-            return self.parse_declaration()
-        return self.parse_statement()
+            return (yield self.parse_declaration())
+        return (yield self.parse_statement())
 
-    def parse_declaration(self) -> declarations.Declaration:
+    def parse_declaration(self) -> Step[declarations.Declaration]:
         if self.match(TokenType.VAR):
-            return self.parse_var_declaration()
+            return (yield self.parse_var_declaration())
         if self.match(TokenType.FUNC):
-            return self.parse_func_declaration()
+            return (yield self.parse_func_declaration())
         if self.match(TokenType.STRUCT):
             return self.parse_struct_declaration()
 
@@ -41,10 +143,10 @@ class Parser:
 
     # region --- Declarations ---
 
-    def parse_var_declaration(self) -> declarations.VarDecl:
+    def parse_var_declaration(self) -> Step[declarations.VarDecl]:
         start_token = self.previous()
         name_token = self.consume(TokenType.IDENTIFIER, "Expected a name for the variable.")
-        name_node = expressions.Identifier(name=name_token.value, line=name_token.line, col=name_token.column)
+        name_node = expressions.Identifier(name=name_token.value, **self._position(name_token))
 
         self.consume(TokenType.COLON, "Expected ':' after the name of the variable.")
 
@@ -52,16 +154,16 @@ class Parser:
         
         initializer: Optional[expressions.Expression] = None
         if self.match(TokenType.EQUALS):
-            initializer = self.parse_expression()
+            initializer = yield self.parse_binary(ASSIGNMENT)
 
         self.consume(TokenType.SEMICOLON, "Expected ';' after the variable declaration.")
 
-        return declarations.VarDecl(name=name_node, type_spec=type_spec, initializer=initializer, line=start_token.line, col=start_token.column)
+        return declarations.VarDecl(name=name_node, type_spec=type_spec, initializer=initializer, **self._position(start_token))
 
-    def parse_func_declaration(self) -> declarations.FuncDecl:
+    def parse_func_declaration(self) -> Step[declarations.FuncDecl]:
         start_token = self.previous()
         name_tok = self.consume(TokenType.IDENTIFIER, "Expected a name for the function.")
-        name_node = expressions.Identifier(name=name_tok.value, line=name_tok.line, col=name_tok.column)
+        name_node = expressions.Identifier(name=name_tok.value, **self._position(name_tok))
 
         self.consume(TokenType.LPAREN, "Expected '(' after the name of the function.")
 
@@ -77,20 +179,20 @@ class Parser:
         self.consume(TokenType.COLON, "Expected ':' after ')'.")
         return_type = self.parse_type_specifier()
 
-        body = self.parse_block_stmt()
+        body = yield self.parse_block_stmt()
 
-        return declarations.FuncDecl(name=name_node, return_type=return_type, body=body, params=params, line=start_token.line, col=start_token.column)
+        return declarations.FuncDecl(name=name_node, return_type=return_type, body=body, params=params, **self._position(start_token))
 
     def parse_param_decl(self) -> declarations.ParamDecl:
         name_tok = self.consume(TokenType.IDENTIFIER, "Expected the name of the parameter.")
         self.consume(TokenType.COLON, "Expected ':' after the name of the parameter.")
         type_spec = self.parse_type_specifier()
-        return declarations.ParamDecl(name=expressions.Identifier(name=name_tok.value, line=name_tok.line, col=name_tok.column), type_spec=type_spec, line=name_tok.line, col=name_tok.column)
+        return declarations.ParamDecl(name=expressions.Identifier(name=name_tok.value, **self._position(name_tok)), type_spec=type_spec, **self._position(name_tok))
 
     def parse_struct_declaration(self) -> declarations.StructDecl:
         start_token = self.previous()  # STRUCT token
         name_token = self.consume(TokenType.IDENTIFIER, "Expected a name for the struct.")
-        name_node = expressions.Identifier(name=name_token.value, line=name_token.line, col=name_token.column)
+        name_node = expressions.Identifier(name=name_token.value, **self._position(name_token))
 
         self.consume(TokenType.LBRACE, "Expected '{' after the name of the struct.")
 
@@ -105,29 +207,29 @@ class Parser:
         self.consume(TokenType.RBRACE, "Expected '}' after the fields of the struct.")
         self.consume(TokenType.SEMICOLON, "Expected ';' after the struct declaration.")
 
-        return declarations.StructDecl(name=name_node, fields=fields, line=start_token.line, col=start_token.column)
+        return declarations.StructDecl(name=name_node, fields=fields, **self._position(start_token))
 
     def parse_field_decl(self) -> declarations.FieldDecl:
         name_token = self.consume(TokenType.IDENTIFIER, "Expected a name for the field of the struct.")
-        name_node = expressions.Identifier(name=name_token.value, line=name_token.line, col=name_token.column)
+        name_node = expressions.Identifier(name=name_token.value, **self._position(name_token))
 
         self.consume(TokenType.COLON, "Expected ':' after the name of the field.")
 
         type_spec = self.parse_type_specifier()
         
-        return declarations.FieldDecl(name=name_node, type_spec=type_spec, line=name_token.line, col=name_token.column)
+        return declarations.FieldDecl(name=name_node, type_spec=type_spec, **self._position(name_token))
     
     # endregion
 
     # region --- Type Analyzer ---
 
     def parse_type_specifier(self) -> types.TypeSpecifier:
-        if self.match(TokenType.LIST_TYPE):
-            start_token = self.previous()
+        # 'list[' prefixes first, then the base type, then one ']' per prefix,
+        # wrapping inside out: no recursion however deep the list type.
+        list_tokens = []
+        while self.match(TokenType.LIST_TYPE):
+            list_tokens.append(self.previous())
             self.consume(TokenType.LBRACKET, "Expected '[' after 'list'.")
-            element_type = self.parse_type_specifier()
-            self.consume(TokenType.RBRACKET, "Expected ']' after the list type.")
-            return types.ListType(element_type=element_type, line=start_token.line, col=start_token.column)
 
         if self.match(
             TokenType.VOID_TYPE,
@@ -139,7 +241,11 @@ class Parser:
         ):
             type_token = self.previous()
             base_type_name = type_token.value
-            return types.BaseType(name=base_type_name, line=type_token.line, col=type_token.column)
+            type_spec: types.TypeSpecifier = types.BaseType(name=base_type_name, **self._position(type_token))
+            for start_token in reversed(list_tokens):
+                self.consume(TokenType.RBRACKET, "Expected ']' after the list type.")
+                type_spec = types.ListType(element_type=type_spec, **self._position(start_token))
+            return type_spec
 
         raise ParserError(
             "Expected a type specifier (int, str, list, etc).",
@@ -152,7 +258,7 @@ class Parser:
 
     # region --- Statements ---
 
-    def parse_block_stmt(self) -> statements.BlockStmt:
+    def parse_block_stmt(self) -> Step[statements.BlockStmt]:
         start_token = self.peek()
         self.consume(TokenType.LBRACE, "Expected '{' to start the block.")
         stmts: list[statements.Statement] = []
@@ -160,75 +266,74 @@ class Parser:
             self.skip_trivia()
             if self.check(TokenType.RBRACE) or self.is_at_end():
                 break
-            stmts.append(self.parse_statement())
+            stmts.append((yield self.parse_statement()))
         self.consume(TokenType.RBRACE, "Expected '}' at the end of the block.")
-        return statements.BlockStmt(statements=stmts, line=start_token.line, col=start_token.column)
+        return statements.BlockStmt(statements=stmts, **self._position(start_token))
 
-    def parse_statement(self) -> statements.Statement:
+    def parse_statement(self) -> Step[statements.Statement]:
         if self.match(TokenType.VAR):
-            return self.parse_var_declaration()
+            return (yield self.parse_var_declaration())
 
         if self.match(TokenType.IF):
-            return self.parse_if_stmt()
+            return (yield self.parse_if_stmt())
 
         if self.match(TokenType.LOOP):
             start_token = self.previous()
-            body = self.parse_block_stmt()
-            return statements.LoopStmt(body=body, line=start_token.line, col=start_token.column)
+            body = yield self.parse_block_stmt()
+            return statements.LoopStmt(body=body, **self._position(start_token))
 
         if self.match(TokenType.RETURN):
             start_token = self.previous()
             value = None
             if not self.check(TokenType.SEMICOLON):
-                value = self.parse_expression()
+                value = yield self.parse_binary(ASSIGNMENT)
             self.consume(TokenType.SEMICOLON, "Expected ';' after 'return'.")
-            return statements.ReturnStmt(value=value, line=start_token.line, col=start_token.column)
+            return statements.ReturnStmt(value=value, **self._position(start_token))
 
         if self.match(TokenType.BREAK):
             start_token = self.previous()
             self.consume(TokenType.SEMICOLON, "Expected ';' after 'break'.")
-            return statements.BreakStmt(line=start_token.line, col=start_token.column)
+            return statements.BreakStmt(**self._position(start_token))
 
         if self.match(TokenType.CONTINUE):
             start_token = self.previous()
             self.consume(TokenType.SEMICOLON, "Expected ';' after 'continue'.")
-            return statements.ContinueStmt(line=start_token.line, col=start_token.column)
+            return statements.ContinueStmt(**self._position(start_token))
 
         if self.check(TokenType.LBRACE):
-            return self.parse_block_stmt()
+            return (yield self.parse_block_stmt())
 
         start_token = self.peek()
-        expr = self.parse_expression()
+        expr = yield self.parse_binary(ASSIGNMENT)
         self.consume(TokenType.SEMICOLON, "Expected ';' after the expression.")
-        return statements.ExpressionStmt(expression=expr, line=start_token.line, col=start_token.column)
+        return statements.ExpressionStmt(expression=expr, **self._position(start_token))
 
-    def parse_if_stmt(self) -> statements.IfStmt:
+    def parse_if_stmt(self) -> Step[statements.IfStmt]:
         start_token = self.previous()  # IF token
         self.consume(TokenType.LPAREN, "Expected '(' after 'if'.")
-        condition = self.parse_expression()
+        condition = yield self.parse_binary(ASSIGNMENT)
         self.consume(TokenType.RPAREN, "Expected ')' after the condition of 'if'.")
-        then_branch = self.parse_block_stmt()
+        then_branch = yield self.parse_block_stmt()
 
         elif_branches: list[statements.ElifBranch] = []
         while self.match(TokenType.ELIF):
             elif_token = self.previous()
             self.consume(TokenType.LPAREN, "Expected '(' after 'elif'.")
-            elif_cond = self.parse_expression()
+            elif_cond = yield self.parse_binary(ASSIGNMENT)
             self.consume(TokenType.RPAREN, "Expected ')' after the condition of 'elif'.")
-            elif_body = self.parse_block_stmt()
-            elif_branches.append(statements.ElifBranch(condition=elif_cond, body=elif_body, line=elif_token.line, col=elif_token.column))
+            elif_body = yield self.parse_block_stmt()
+            elif_branches.append(statements.ElifBranch(condition=elif_cond, body=elif_body, **self._position(elif_token)))
 
         else_branch: Optional[statements.BlockStmt] = None
         if self.match(TokenType.ELSE):
-            else_branch = self.parse_block_stmt()
+            else_branch = yield self.parse_block_stmt()
 
         return statements.IfStmt(
             condition=condition,
             then_branch=then_branch,
             elif_branches=elif_branches,
             else_branch=else_branch,
-            line=start_token.line,
-            col=start_token.column
+            **self._position(start_token)
         )
     
     # endregion
@@ -236,155 +341,91 @@ class Parser:
     # region --- Expressions ---
 
     def parse_expression(self) -> expressions.Expression:
-        return self.parse_assignment()
+        return trampoline(self.parse_binary(ASSIGNMENT))
+
+    def parse_binary(self, min_power: int) -> Step[expressions.Expression]:
+        """Expression whose infix operators all bind at least as tightly as
+        ``min_power``.
+
+        Operator precedence parsing over ``BINDING_POWER`` with explicit
+        operand and operator stacks: an operator waiting for its right operand
+        is reduced once a looser (or, if left-associative, an equally tight)
+        operator follows. Prefix '-'/'!' wait on the stack like an operator
+        of power ``POWER``, so their operand may only contain '**'.
+        """
+        kinds = self.kinds
+        operands: list[expressions.Expression] = []
+        # (binding power, infix kind or None for a prefix operator, token if the node is positioned at it)
+        waiting: list[tuple[int, Optional[TokenType], Optional[Token]]] = []
+        count = self.count
+        while True:
+            current = self.current
+            while current < count and kinds[current] in PREFIX_KINDS:
+                self.current = current = current + 1
+                waiting.append((POWER, None, self.previous()))
+            if current + 1 < count and kinds[current] in ATOM_KINDS and kinds[current + 1] not in POSTFIX_KINDS:
+                operands.append(self.parse_atom())
+            else:
+                operands.append((yield self.parse_postfix()))
 
-    def parse_assignment(self) -> expressions.Expression:
-        left = self.parse_logical_or()
-        if self.match(
-            TokenType.EQUALS,
-            TokenType.PLUS_EQUAL,
-            TokenType.MINUS_EQUAL,
-            TokenType.MULTIPLY_EQUAL,
-            TokenType.DIVIDE_EQUAL,
-            TokenType.MODULE_EQUAL
-        ):
-            op_token = self.previous()
-            op_lexeme = op_token.value
-            value = self.parse_assignment()
-            return expressions.AssignExpr(target=left, op=op_lexeme, value=value, line=op_token.line, col=op_token.column)
-        return left
-
-    def parse_logical_or(self) -> expressions.Expression:
-        expr_left = self.parse_logical_and()
-        while self.match(TokenType.OR):
-            op_token = self.previous()
-            op_lexeme = op_token.value
-            right = self.parse_logical_and()
-            expr_left = expressions.BinaryOp(left=expr_left, op=op_lexeme, right=right, line=expr_left.line, col=expr_left.col)
-        return expr_left
-
-    def parse_logical_and(self) -> expressions.Expression:
-        expr_left = self.parse_equality()
-        while self.match(TokenType.AND):
-            op_token = self.previous()
-            op_lexeme = op_token.value
-            right = self.parse_equality()
-            expr_left = expressions.BinaryOp(left=expr_left, op=op_lexeme, right=right, line=expr_left.line, col=expr_left.col)
-        return expr_left
-
-    def parse_equality(self) -> expressions.Expression:
-        expr_left = self.parse_relational()
-        while self.match(TokenType.EQUAL_EQUAL, TokenType.NOT_EQUAL):
-            op_token = self.previous()
-            op_lexeme = op_token.value
-            right = self.parse_relational()
-            expr_left = expressions.BinaryOp(left=expr_left, op=op_lexeme, right=right, line=expr_left.line, col=expr_left.col)
-        return expr_left
-
-    def parse_relational(self) -> expressions.Expression:
-        expr_left = self.parse_additive()
-        while self.match(
-            TokenType.LESS, TokenType.LESS_OR_EQUAL,
-            TokenType.GREATER, TokenType.GREATER_OR_EQUAL
-        ):
-            op_token = self.previous()
-            op_lexeme = op_token.value
-            right = self.parse_additive()
-            expr_left = expressions.BinaryOp(left=expr_left, op=op_lexeme, right=right, line=expr_left.line, col=expr_left.col)
-        return expr_left
-
-    def parse_additive(self) -> expressions.Expression:
-        expr_left = self.parse_multiplicative()
-        while self.match(TokenType.PLUS, TokenType.MINUS):
-            op_token = self.previous()
-            op_lexeme = op_token.value
-            right = self.parse_multiplicative()
-            expr_left = expressions.BinaryOp(left=expr_left, op=op_lexeme, right=right, line=expr_left.line, col=expr_left.col)
-        return expr_left
-        
-    def parse_multiplicative(self) -> expressions.Expression:
-        expr_left = self.parse_unary()
-        while self.match(TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULE):
-            op_token = self.previous()
-            op_lexeme = op_token.value
-            right = self.parse_unary()
-            expr_left = expressions.BinaryOp(left=expr_left, op=op_lexeme, right=right, line=expr_left.line, col=expr_left.col)
-        return expr_left
-
-    def parse_unary(self) -> expressions.Expression:
-        if self.match(TokenType.NOT, TokenType.MINUS):
-            op_token = self.previous()
-            op_lexeme = op_token.value
-            right = self.parse_unary()
-            return expressions.UnaryOp(op=op_lexeme, right=right, line=op_token.line, col=op_token.column)
-        return self.parse_power()
-
-    def parse_power(self) -> expressions.Expression:
-        expr_left = self.parse_postfix()
-        if self.match(TokenType.POWER):
-            op_token = self.previous()
-            op_lexeme = op_token.value
-            right = self.parse_unary()
-            return expressions.BinaryOp(left=expr_left, op=op_lexeme, right=right, line=expr_left.line, col=expr_left.col)
-        return expr_left
-
-    def parse_postfix(self) -> expressions.Expression:
-        expr_node = self.parse_primary()
+            kind = kinds[self.current] if self.current < count else TokenType.EOF
+            power = BINDING_POWER[kind]
+            while waiting:
+                top_power, top_kind, top_token = waiting[-1]
+                if top_power < power or (top_power == power and power in RIGHT_ASSOCIATIVE):
+                    break
+                waiting.pop()
+                right = operands.pop()
+                if top_token is None:
+                    left = operands.pop()
+                    operands.append(expressions.BinaryOp(left=left, op=FIXED_TEXT[top_kind], right=right, **left.position()))
+                elif top_kind is None:
+                    operands.append(expressions.UnaryOp(op=top_token.value, right=right, **self._position(top_token)))
+                else:
+                    target = operands.pop()
+                    operands.append(expressions.AssignExpr(target=target, op=top_token.value, value=right, **self._position(top_token)))
+            if power < min_power:
+                return operands.pop()
+            self.current += 1
+            waiting.append((power, kind, self.previous() if power == ASSIGNMENT else None))
+
+    def parse_postfix(self) -> Step[expressions.Expression]:
+        expr_node = self.parse_atom()
+        if expr_node is None:
+            expr_node = yield self.parse_primary()
         while True:
             if self.match(TokenType.DOT):
                 dot_token = self.previous()
                 ident_tok = self.consume(TokenType.IDENTIFIER, "Expected an identifier after '.'.")
-                expr_node = expressions.MemberAccess(obj=expr_node, member=expressions.Identifier(name=ident_tok.value, line=ident_tok.line, col=ident_tok.column), line=dot_token.line, col=dot_token.column)
+                expr_node = expressions.MemberAccess(obj=expr_node, member=expressions.Identifier(name=ident_tok.value, **self._position(ident_tok)), **self._position(dot_token))
             elif self.match(TokenType.LBRACKET):
                 bracket_token = self.previous()
-                index_expr = self.parse_expression()
+                index_expr = yield self.parse_binary(ASSIGNMENT)
                 self.consume(TokenType.RBRACKET, "Expected ']' after the index expression.")
-                expr_node = expressions.ArrayAccess(array=expr_node, index=index_expr, line=bracket_token.line, col=bracket_token.column)
+                expr_node = expressions.ArrayAccess(array=expr_node, index=index_expr, **self._position(bracket_token))
             elif self.match(TokenType.LPAREN):
                 paren_token = self.previous()
                 args: list[expressions.Expression] = []
                 if not self.check(TokenType.RPAREN):
-                    args.append(self.parse_expression())
+                    args.append((yield self.parse_binary(ASSIGNMENT)))
                     while self.match(TokenType.COMMA):
                         if self.check(TokenType.RPAREN):
                             break
-                        args.append(self.parse_expression())
+                        args.append((yield self.parse_binary(ASSIGNMENT)))
                 self.consume(TokenType.RPAREN, "Expected ')' after the arguments.")
-                expr_node = expressions.FuncCall(callee=expr_node, arguments=args, line=paren_token.line, col=paren_token.column)
+                expr_node = expressions.FuncCall(callee=expr_node, arguments=args, **self._position(paren_token))
             else:
                 break
         return expr_node
 
-    def parse_primary(self) -> expressions.Expression:
-        if self.match(TokenType.INTEGER):
-            token = self.previous()
-            return expressions.IntLiteral(value=int(token.value), line=token.line, col=token.column)
-        if self.match(TokenType.FLOAT):
-            token = self.previous()
-            return expressions.FloatLiteral(value=float(token.value), line=token.line, col=token.column)
-        if self.match(TokenType.STRING):
-            token = self.previous()
-            return expressions.StringLiteral(value=token.value, line=token.line, col=token.column)
-        if self.match(TokenType.TRUE):
-            token = self.previous()
-            return expressions.BoolLiteral(value=True, line=token.line, col=token.column)
-        if self.match(TokenType.FALSE):
-            token = self.previous()
-            return expressions.BoolLiteral(value=False, line=token.line, col=token.column)
-
-        if self.match(TokenType.PRINT):
-            token = self.previous()
-            return expressions.Identifier(name="print", line=token.line, col=token.column)
-        if self.match(TokenType.LEN):
-            token = self.previous()
-            return expressions.Identifier(name="len", line=token.line, col=token.column)
-        if self.match(TokenType.IDENTIFIER):
-            token = self.previous()
-            return expressions.Identifier(name=token.value, line=token.line, col=token.column)
+    def parse_primary(self) -> Step[expressions.Expression]:
+        atom = self.parse_atom()
+        if atom is not None:
+            return atom
 
         if self.match(TokenType.LPAREN):
             _paren_token = self.previous()
-            expr = self.parse_expression()
+            expr = yield self.parse_binary(ASSIGNMENT)
             self.consume(TokenType.RPAREN, "Expected ')' after the expression.")
             return expr
 
@@ -392,38 +433,38 @@ class Parser:
             bracket_token = self.previous()
             elements: list[expressions.Expression] = []
             if not self.check(TokenType.RBRACKET):
-                elements.append(self.parse_expression())
+                elements.append((yield self.parse_binary(ASSIGNMENT)))
                 while self.match(TokenType.COMMA):
                     if self.check(TokenType.RBRACKET):
                         break
-                    elements.append(self.parse_expression())
+                    elements.append((yield self.parse_binary(ASSIGNMENT)))
             self.consume(TokenType.RBRACKET, "Expected ']' at the end of the list literal.")
-            return expressions.LiteralList(elements=elements, line=bracket_token.line, col=bracket_token.column)
+            return expressions.LiteralList(elements=elements, **self._position(bracket_token))
 
         if self.match(TokenType.NEW):
             new_token = self.previous()
             self.consume(TokenType.LBRACE, "Expected '{' after 'new'.")
             fields_inits: list[expressions.FieldInit] = []
             if not self.check(TokenType.RBRACE):
-                fields_inits.append(self.parse_field_init())
+                fields_inits.append((yield self.parse_field_init()))
                 while self.match(TokenType.COMMA):
                     if self.check(TokenType.RBRACE):
                         break
-                    fields_inits.append(self.parse_field_init())
+                    fields_inits.append((yield self.parse_field_init()))
             self.consume(TokenType.RBRACE, "Expected '}' at the end of the struct literal.")
-            return expressions.StructLiteral(fields=fields_inits, line=new_token.line, col=new_token.column)
+            return expressions.StructLiteral(fields=fields_inits, **self._position(new_token))
 
         if self.match(TokenType.LBRACE):
             brace_token = self.previous()
             fields_inits: list[expressions.FieldInit] = []
             if not self.check(TokenType.RBRACE):
-                fields_inits.append(self.parse_field_init())
+                fields_inits.append((yield self.parse_field_init()))
                 while self.match(TokenType.COMMA):
                     if self.check(TokenType.RBRACE):
                         break
-                    fields_inits.append(self.parse_field_init())
+                    fields_inits.append((yield self.parse_field_init()))
             self.consume(TokenType.RBRACE, "Expected '}' at the end of the struct literal.")
-            return expressions.StructLiteral(fields=fields_inits, line=brace_token.line, col=brace_token.column)
+            return expressions.StructLiteral(fields=fields_inits, **self._position(brace_token))
 
         raise ParserError(
             "Invalid primary expression.",
@@ -432,14 +473,246 @@ class Parser:
             token=self.peek()
         )
 
-    def parse_field_init(self) -> expressions.FieldInit:
+    def parse_atom(self) -> Optional[expressions.Expression]:
+        """Literal or name at the current token, if there is one"""
+        kind = self.kinds[self.current] if self.current < self.count else TokenType.EOF
+        if kind not in ATOM_KINDS:
+            return None
+        token = self.advance()
+        if kind is TokenType.IDENTIFIER:
+            return expressions.Identifier(name=token.value, **self._position(token))
+        if kind is TokenType.INTEGER:
+            value = token.literal if token.literal is not None else int(token.value)
+            return expressions.IntLiteral(value=value, **self._position(token))
+        if kind is TokenType.FLOAT:
+            value = token.literal if token.literal is not None else float(token.value)
+            return expressions.FloatLiteral(value=value, **self._position(token))
+        if kind is TokenType.STRING:
+            return expressions.StringLiteral(value=token.value, **self._position(token))
+        if kind is TokenType.TRUE or kind is TokenType.FALSE:
+            return expressions.BoolLiteral(value=kind is TokenType.TRUE, **self._position(token))
+        # Built-in functions are plain names in the AST.
+        return expressions.Identifier(name="print" if kind is TokenType.PRINT else "len", **self._position(token))
+
+    def parse_field_init(self) -> Step[expressions.FieldInit]:
         name_tok = self.consume(TokenType.IDENTIFIER, "Expected a field name in the struct literal.")
         self.consume(TokenType.COLON, "Expected ':' after the field name in the struct literal.")
-        value_expr = self.parse_expression()
-        return expressions.FieldInit(name=expressions.Identifier(name=name_tok.value, line=name_tok.line, col=name_tok.column), value=value_expr, line=name_tok.line, col=name_tok.column)
+        value_expr = yield self.parse_binary(ASSIGNMENT)
+        return expressions.FieldInit(name=expressions.Identifier(name=name_tok.value, **self._position(name_tok)), value=value_expr, **self._position(name_tok))
     
     # endregion
 
+    # region --- Recognizer ---
+
+    # The grammar again, reading only token kinds: no nodes and no Token
+    # objects unless there is an error to report. Rules must check tokens in
+    # the same order as the parse_* ones so that errors come out the same.
+
+    def _recognize_var_declaration(self) -> None:
+        self.expect(TokenType.IDENTIFIER, "Expected a name for the variable.")
+        self.expect(TokenType.COLON, "Expected ':' after the name of the variable.")
+        self._recognize_type()
+        if self.match(TokenType.EQUALS):
+            self.recognize_expression()
+        self.expect(TokenType.SEMICOLON, "Expected ';' after the variable declaration.")
+
+    def _recognize_func_declaration(self) -> None:
+        self.expect(TokenType.IDENTIFIER, "Expected a name for the function.")
+        self.expect(TokenType.LPAREN, "Expected '(' after the name of the function.")
+        if not self.check(TokenType.RPAREN):
+            self._recognize_param_decl()
+            while self.match(TokenType.COMMA):
+                if self.check(TokenType.RPAREN):
+                    break
+                self._recognize_param_decl()
+        self.expect(TokenType.RPAREN, "Expected ')' after the parameter list.")
+        self.expect(TokenType.COLON, "Expected ':' after ')'.")
+        self._recognize_type()
+        open_blocks: list[bool] = []
+        self._open_block(open_blocks, False)
+        self._recognize_open_blocks(open_blocks)
+
+    def _recognize_param_decl(self) -> None:
+        self.expect(TokenType.IDENTIFIER, "Expected the name of the parameter.")
+        self.expect(TokenType.COLON, "Expected ':' after the name of the parameter.")
+        self._recognize_type()
+
+    def _recognize_struct_declaration(self) -> None:
+        self.expect(TokenType.IDENTIFIER, "Expected a name for the struct.")
+        self.expect(TokenType.LBRACE, "Expected '{' after the name of the struct.")
+        if not self.check(TokenType.RBRACE):
+            self._recognize_field_decl()
+            while self.match(TokenType.COMMA):
+                if self.check(TokenType.RBRACE):
+                    break
+                self._recognize_field_decl()
+        self.expect(TokenType.RBRACE, "Expected '}' after the fields of the struct.")
+        self.expect(TokenType.SEMICOLON, "Expected ';' after the struct declaration.")
+
+    def _recognize_field_decl(self) -> None:
+        self.expect(TokenType.IDENTIFIER, "Expected a name for the field of the struct.")
+        self.expect(TokenType.COLON, "Expected ':' after the name of the field.")
+        self._recognize_type()
+
+    def _recognize_type(self) -> None:
+        depth = 0
+        while self.match(TokenType.LIST_TYPE):
+            self.expect(TokenType.LBRACKET, "Expected '[' after 'list'.")
+            depth += 1
+        if not self.match(*BASE_TYPE_KINDS):
+            raise ParserError(
+                "Expected a type specifier (int, str, list, etc).",
+                line=self.peek().line,
+                column=self.peek().column,
+                token=self.peek()
+            )
+        for _ in range(depth):
+            self.expect(TokenType.RBRACKET, "Expected ']' after the list type.")
+
+    def _recognize_statement(self, open_blocks: list[bool]) -> None:
+        """A statement, up to the '{' of its block if it has one.
+
+        ``open_blocks`` has an entry per block entered and not yet closed,
+        true if 'elif'/'else' may follow its '}'.
+        """
+        if self.match(TokenType.VAR):
+            self._recognize_var_declaration()
+        elif self.match(TokenType.IF):
+            self.expect(TokenType.LPAREN, "Expected '(' after 'if'.")
+            self.recognize_expression()
+            self.expect(TokenType.RPAREN, "Expected ')' after the condition of 'if'.")
+            self._open_block(open_blocks, True)
+        elif self.match(TokenType.LOOP):
+            self._open_block(open_blocks, False)
+        elif self.match(TokenType.RETURN):
+            if not self.check(TokenType.SEMICOLON):
+                self.recognize_expression()
+            self.expect(TokenType.SEMICOLON, "Expected ';' after 'return'.")
+        elif self.match(TokenType.BREAK):
+            self.expect(TokenType.SEMICOLON, "Expected ';' after 'break'.")
+        elif self.match(TokenType.CONTINUE):
+            self.expect(TokenType.SEMICOLON, "Expected ';' after 'continue'.")
+        elif self.check(TokenType.LBRACE):
+            self._open_block(open_blocks, False)
+        else:
+            self.recognize_expression()
+            self.expect(TokenType.SEMICOLON, "Expected ';' after the expression.")
+
+    def _open_block(self, open_blocks: list[bool], branch: bool) -> None:
+        self.expect(TokenType.LBRACE, "Expected '{' to start the block.")
+        open_blocks.append(branch)
+
+    def _recognize_open_blocks(self, open_blocks: list[bool]) -> None:
+        """The rest of every block in ``open_blocks``, innermost first"""
+        while open_blocks:
+            if not self.check(TokenType.RBRACE) and not self.is_at_end():
+                self.skip_trivia()
+                if not self.check(TokenType.RBRACE) and not self.is_at_end():
+                    self._recognize_statement(open_blocks)
+                    continue
+            self.expect(TokenType.RBRACE, "Expected '}' at the end of the block.")
+            if not open_blocks.pop():
+                continue
+            if self.match(TokenType.ELIF):
+                self.expect(TokenType.LPAREN, "Expected '(' after 'elif'.")
+                self.recognize_expression()
+                self.expect(TokenType.RPAREN, "Expected ')' after the condition of 'elif'.")
+                self._open_block(open_blocks, True)
+            elif self.match(TokenType.ELSE):
+                self._open_block(open_blocks, False)
+
+    def recognize_expression(self) -> None:
+        """``parse_binary(ASSIGNMENT)`` without the nodes.
+
+        Precedence only decides the shape of the tree, so syntactically an
+        expression is operands separated by infix operators. Brackets and
+        literals still open around the current operand are kept on a stack.
+        """
+        kinds = self.kinds
+        count = self.count
+        enclosing: list[int] = []
+        while True:
+            current = self.current
+            while current < count and kinds[current] in PREFIX_KINDS:
+                current += 1
+            kind = kinds[current] if current < count else TokenType.EOF
+            self.current = current + 1
+            if kind in ATOM_KINDS:
+                pass
+            elif kind is TokenType.LPAREN:
+                enclosing.append(GROUP)
+                continue
+            elif kind is TokenType.LBRACKET:
+                if not self.match(TokenType.RBRACKET):
+                    enclosing.append(LIST)
+                    continue
+            elif kind is TokenType.NEW or kind is TokenType.LBRACE:
+                if kind is TokenType.NEW:
+                    self.expect(TokenType.LBRACE, "Expected '{' after 'new'.")
+                if not self.match(TokenType.RBRACE):
+                    self._recognize_field_name()
+                    enclosing.append(FIELDS)
+                    continue
+            else:
+                self.current = current
+                raise ParserError(
+                    "Invalid primary expression.",
+                    line=self.peek().line,
+                    column=self.peek().column,
+                    token=self.peek()
+                )
+
+            # After a primary: postfix operators, then an infix operator or
+            # the end of the innermost enclosing construct.
+            while True:
+                kind = kinds[self.current] if self.current < count else TokenType.EOF
+                if kind is TokenType.DOT:
+                    self.current += 1
+                    self.expect(TokenType.IDENTIFIER, "Expected an identifier after '.'.")
+                    continue
+                if kind is TokenType.LBRACKET:
+                    self.current += 1
+                    enclosing.append(INDEX)
+                    break
+                if kind is TokenType.LPAREN:
+                    self.current += 1
+                    if self.match(TokenType.RPAREN):
+                        continue
+                    enclosing.append(CALL)
+                    break
+                if BINDING_POWER[kind]:
+                    self.current += 1
+                    break
+                if not enclosing:
+                    return
+                construct = enclosing.pop()
+                if construct == GROUP:
+                    self.expect(TokenType.RPAREN, "Expected ')' after the expression.")
+                elif construct == INDEX:
+                    self.expect(TokenType.RBRACKET, "Expected ']' after the index expression.")
+                elif construct == CALL:
+                    if self.match(TokenType.COMMA) and not self.check(TokenType.RPAREN):
+                        enclosing.append(CALL)
+                        break
+                    self.expect(TokenType.RPAREN, "Expected ')' after the arguments.")
+                elif construct == LIST:
+                    if self.match(TokenType.COMMA) and not self.check(TokenType.RBRACKET):
+                        enclosing.append(LIST)
+                        break
+                    self.expect(TokenType.RBRACKET, "Expected ']' at the end of the list literal.")
+                else:
+                    if self.match(TokenType.COMMA) and not self.check(TokenType.RBRACE):
+                        self._recognize_field_name()
+                        enclosing.append(FIELDS)
+                        break
+                    self.expect(TokenType.RBRACE, "Expected '}' at the end of the struct literal.")
+
+    def _recognize_field_name(self) -> None:
+        self.expect(TokenType.IDENTIFIER, "Expected a field name in the struct literal.")
+        self.expect(TokenType.COLON, "Expected ':' after the field name in the struct literal.")
+
+    # endregion
+
     # region --- Helpers ---
 
     def consume(self, t_type: TokenType, message: str) -> Token:
@@ -452,17 +725,24 @@ class Parser:
             token=self.peek()
         )
 
+    def expect(self, t_type: TokenType, message: str) -> None:
+        """``consume`` without making a Token of the consumed one"""
+        if self.check(t_type):
+            self.current += 1
+            return
+        self.consume(t_type, message)
+
     def match(self, *types: TokenType) -> bool:
         for t_type in types:
             if self.check(t_type):
-                self.advance()
+                self.current += 1
                 return True
         return False
 
     def check(self, t_type: TokenType) -> bool:
         if self.is_at_end():
             return False
-        return self.peek().type == t_type
+        return self.kinds[self.current] == t_type
 
     def advance(self) -> Token:
         if not self.is_at_end():
@@ -470,9 +750,9 @@ class Parser:
         return self.previous()
 
     def is_at_end(self) -> bool:
-        if self.current >= len(self.tokens):
+        if self.current >= self.count:
             return True
-        return self.peek().type == TokenType.EOF
+        return self.kinds[self.current] == TokenType.EOF
 
     def peek(self) -> Token:
         return self.tokens[self.current]
@@ -480,6 +760,13 @@ class Parser:
     def previous(self) -> Token:
         return self.tokens[self.current - 1]
 
+    def _position(self, token: Token) -> dict[str, Any]:
+        """Position keywords for a node starting at ``token``"""
+        if token.source_map is not None:
+            # Resolved to line/column only if something reads them.
+            return {"offset": token.offset, "source_map": token.source_map}
+        return {"line": token.line, "col": token.column}
+
     def skip_trivia(self) -> None:
-        while not self.is_at_end() and self.peek().type in (TokenType.WHITESPACE, TokenType.COMMENT):
+        while not self.is_at_end() and self.kinds[self.current] in (TokenType.WHITESPACE, TokenType.COMMENT):
             self.advance()
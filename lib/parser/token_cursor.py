@@ -0,0 +1,58 @@
+from typing import Iterable, Optional
+from lib.lexer.token import Token, TokenType
+
+# The grammar reads at most the current token and the one before it.
+LOOKBEHIND = 4
+
+
+class TokenCursor:
+    """Tokens of an iterator addressed by absolute index, keeping only the
+    last ``size`` of them in a ring buffer.
+
+    Tokens are pulled from the iterator on first access, so lexing runs
+    interleaved with whatever reads the cursor. If the iterator ends
+    without an EOF token, one is made up after the last token.
+    """
+
+    __slots__ = ("tokens", "window", "size", "read", "kinds")
+
+    def __init__(self, tokens: Iterable[Token], size: int = LOOKBEHIND) -> None:
+        self.tokens = iter(tokens)
+        self.window: list[Optional[Token]] = [None] * size
+        self.size = size
+        self.read = 0
+        self.kinds = KindView(self)
+
+    def __getitem__(self, index: int) -> Token:
+        if index >= self.read:
+            self._fill(index)
+        elif index < self.read - self.size:
+            raise IndexError(f"Token {index} is no longer buffered (cursor is at {self.read}).")
+        token = self.window[index % self.size]
+        assert token is not None
+        return token
+
+    def _fill(self, index: int) -> None:
+        window, size = self.window, self.size
+        while self.read <= index:
+            last = window[(self.read - 1) % size] if self.read else None
+            if last is not None and last.type is TokenType.EOF:
+                token = last
+            else:
+                token = next(self.tokens, None)
+                if token is None:
+                    token = Token(TokenType.EOF, "", last.line if last else 1, last.column if last else 1)
+            window[self.read % size] = token
+            self.read += 1
+
+
+class KindView:
+    """``cursor.kinds[i]`` is ``cursor[i].type``"""
+
+    __slots__ = ("cursor",)
+
+    def __init__(self, cursor: TokenCursor) -> None:
+        self.cursor = cursor
+
+    def __getitem__(self, index: int) -> TokenType:
+        return self.cursor[index].type
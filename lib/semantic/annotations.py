@@ -0,0 +1,35 @@
+from typing import Hashable, Optional
+from lib.parser.ast.arena import node_key
+from lib.parser.ast.base import Node
+from lib.semantic.type_universe import Type
+
+
+class TypeAnnotations:
+    """The type the analyzer inferred for each expression it checked.
+
+    Keyed by node identity (``node_key``: arena views by arena and index);
+    the table keeps the annotated nodes alive, so an id is never reused for
+    another node while it exists. Expressions whose type couldn't be
+    inferred have no entry.
+    """
+
+    __slots__ = ("_types", "_nodes")
+
+    def __init__(self) -> None:
+        self._types: dict[Hashable, Type] = {}
+        self._nodes: list[Node] = []
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def record(self, node: Node, t: Optional[Type]) -> Optional[Type]:
+        """Annotate ``node`` with ``t``, which is returned"""
+        if t is not None:
+            key = node_key(node)
+            self._types[key] = t
+            if type(key) is int:
+                self._nodes.append(node)
+        return t
+
+    def get(self, node: Node) -> Optional[Type]:
+        return self._types.get(node_key(node))
@@ -0,0 +1,235 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+from lib.parser.ast import program, declarations, expressions, types
+from lib.parser.ast.base import Node
+from lib.parser.ast.serialize import FIELDS, FIRST_NODE, node_code
+from lib.semantic.resolver import BUILTINS
+from lib.semantic.semantic_analyzer import SemanticAnalyzer
+
+# Interface id of a name that no declaration before a node defines.
+UNDECLARED = -1
+
+_LINE = re.compile(r"^(Semantic error at line )(\d+)")
+
+
+@dataclass(slots=True, eq=False)
+class DeclarationResult:
+    """The analysis of one top-level node of a program"""
+
+    node: Node
+    # The node's content, with lines counted from its first one; equal keys
+    # mean the node was only moved.
+    key: tuple[Any, ...]
+    line: int
+    # Global name the node declares, its interface (what other nodes can
+    # see of it) and the type names the interface mentions.
+    declares: Optional[str]
+    interface: Optional[tuple[Any, ...]]
+    interface_names: tuple[str, ...]
+    # Every name the node mentions, sorted, and the (name, interface id)
+    # pairs its diagnostics depend on, as of when it was analyzed.
+    names: tuple[str, ...]
+    context: tuple[tuple[str, int], ...]
+    # Indexes of the declarations the node depends on.
+    depends_on: tuple[int, ...]
+    errors: list[str]
+
+
+class IncrementalAnalysis:
+    """The diagnostics of a program, kept per top-level node so that
+    ``reanalyze`` can reuse them after an edit.
+
+    A node depends on the declarations of the names it mentions, through
+    their interfaces (a function's signature, a struct's fields, a global's
+    type), and on those of the types the interfaces mention. Nodes
+    whose content and dependencies are unchanged keep their diagnostics
+    (moved to their new line); the others are checked again.
+    """
+
+    __slots__ = ("program", "results", "checked", "_interfaces")
+
+    def __init__(self, prog: program.Program, results: list[DeclarationResult], checked: int, interfaces: dict[Any, int]) -> None:
+        self.program = prog
+        self.results = results
+        # How many top-level nodes were checked to build this analysis.
+        self.checked = checked
+        # Interface -> id, the same in every analysis of the program.
+        self._interfaces = interfaces
+
+    @property
+    def errors(self) -> list[str]:
+        """What ``SemanticAnalyzer.analyze`` reports for the program"""
+        return [error for result in self.results for error in result.errors]
+
+    def dependents(self, index: int) -> list[int]:
+        """Indexes of the top-level nodes that depend on the one at ``index``"""
+        return [i for i, result in enumerate(self.results) if index in result.depends_on]
+
+
+def analyze_incrementally(prog: program.Program) -> IncrementalAnalysis:
+    """Analyze every top-level node of ``prog``, keeping the results
+    ``reanalyze`` needs"""
+    return reanalyze(None, prog)
+
+
+def reanalyze(previous: Optional[IncrementalAnalysis], prog: program.Program) -> IncrementalAnalysis:
+    """The analysis of ``prog``, an edited version of ``previous.program``.
+
+    Top-level nodes are matched to the previous ones by content: those
+    that are the same object as before, or equal up to their position, and
+    whose dependencies have the same interfaces, reuse their diagnostics;
+    the rest are checked. The result's errors are those of a full
+    ``SemanticAnalyzer.analyze(prog)``.
+    """
+    interfaces: dict[Any, int] = previous._interfaces if previous is not None else {}
+    by_node: dict[int, DeclarationResult] = {}
+    by_key: dict[tuple[Any, ...], DeclarationResult] = {}
+    if previous is not None:
+        for result in previous.results:
+            by_node[id(result.node)] = result
+            by_key.setdefault(result.key, result)
+
+    analyzer = SemanticAnalyzer()
+    # Name -> (interface id, index of the declaration) of the global it
+    # names so far; the built-ins come first, like in the analyzer.
+    visible: dict[str, tuple[int, int]] = {name: (_interface_id(interfaces, ("builtin", name)), UNDECLARED) for name in BUILTINS}
+    results: list[DeclarationResult] = []
+    checked = 0
+    nodes = prog.declarations
+    for index, node in enumerate(nodes):
+        old = by_node.get(id(node))
+        if old is not None and old.line == node.line:
+            fresh, key = old, old.key
+        else:
+            key = _source_key(node, nodes[index + 1] if index + 1 < len(nodes) else None)
+            old = by_key.get(key) if key is not None else None
+            if old is not None:
+                fresh = old
+            else:
+                fresh = _describe(node)
+                if key is None:
+                    key = fresh.key
+                    old = by_key.get(key)
+        line = node.line
+
+        context = _context(fresh.names, visible, results)
+        errors: Optional[list[str]] = None
+        if old is not None and old.context == context:
+            errors = old.errors if old.line == line else _shift(old.errors, line - old.line)
+        if errors is not None:
+            analyzer.declare_toplevel(node)
+        else:
+            errors = analyzer.analyze_toplevel(node)
+            checked += 1
+
+        depends_on = tuple(sorted({visible[name][1] for name, _ in context if name in visible and visible[name][1] != UNDECLARED}))
+        results.append(DeclarationResult(
+            node, key, line, fresh.declares, fresh.interface, fresh.interface_names,
+            fresh.names, context, depends_on, list(errors),
+        ))
+        if fresh.declares is not None and fresh.declares not in visible:
+            visible[fresh.declares] = (_interface_id(interfaces, fresh.interface), index)
+    return IncrementalAnalysis(prog, results, checked, interfaces)
+
+
+def _interface_id(interfaces: dict[Any, int], interface: Any) -> int:
+    return interfaces.setdefault(interface, len(interfaces))
+
+
+def _context(names: tuple[str, ...], visible: dict[str, tuple[int, int]], results: list[DeclarationResult]) -> tuple[tuple[str, int], ...]:
+    """(name, interface id) of ``names`` and, transitively, of the type
+    names in the interfaces of their declarations: the analyzer looks a
+    struct up by name where its type is used, so a node that uses a global
+    of type ``P`` depends on the declaration of ``P`` too"""
+    seen: dict[str, int] = {}
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        interface, index = visible.get(name, (UNDECLARED, UNDECLARED))
+        seen[name] = interface
+        if index != UNDECLARED:
+            pending += results[index].interface_names
+    return tuple(sorted(seen.items()))
+
+
+def _shift(errors: list[str], lines: int) -> Optional[list[str]]:
+    """``errors`` moved ``lines`` lines down, or None if one of them shows
+    a node (whose position is part of the message) and has to be rebuilt"""
+    if any("(line=" in error for error in errors):
+        return None
+    return [_LINE.sub(lambda m: m.group(1) + str(int(m.group(2)) + lines), error, count=1) for error in errors]
+
+
+def _source_key(node: Node, following: Optional[Node]) -> Optional[tuple[Any, ...]]:
+    """The source of ``node`` up to the next top-level node and the column
+    it starts at, if it was parsed from a source: the same text parses to
+    the same nodes, at the same relative positions, and is far cheaper to
+    compare than the nodes themselves"""
+    source_map = node.source_map
+    if source_map is None:
+        return None
+    end = following.offset if following is not None and following.source_map is source_map else len(source_map.source)
+    text = source_map.source[node.offset:end]
+    return node.col, text if isinstance(text, (str, bytes)) else bytes(text)
+
+
+def _describe(node: Node) -> DeclarationResult:
+    """A result for ``node`` with its key, interface and names, not yet
+    analyzed"""
+    base = node.line
+    key: list[Any] = []
+    names: set[str] = set()
+    pending: list[Any] = [node]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, Node):
+            code = node_code(type(item))
+            key += (code, item.line - base, item.col)
+            children = [getattr(item, name) for name in FIELDS[code - FIRST_NODE]]
+            if code in _NAMED:
+                names.add(children[0])
+            pending += children
+        elif type(item) is list:
+            key.append(len(item))
+            pending += item
+        else:
+            key.append(item)
+
+    declares: Optional[str] = None
+    interface: Optional[tuple[Any, ...]] = None
+    specs: list[types.TypeSpecifier] = []
+    if isinstance(node, declarations.FuncDecl):
+        specs = [p.type_spec for p in node.params] + [node.return_type]
+        declares = node.name.name
+        interface = ("func", declares, tuple(map(_type_text, specs)))
+    elif isinstance(node, declarations.StructDecl):
+        specs = [f.type_spec for f in node.fields]
+        declares = node.name.name
+        interface = ("struct", declares, tuple(f.name.name for f in node.fields), tuple(map(_type_text, specs)))
+    elif isinstance(node, declarations.VarDecl):
+        specs = [node.type_spec]
+        declares = node.name.name
+        interface = ("var", declares, _type_text(node.type_spec))
+    interface_names = tuple(sorted({_base_name(spec) for spec in specs}))
+    return DeclarationResult(node, tuple(key), base, declares, interface, interface_names, tuple(sorted(names)), (), (), [])
+
+
+# Codes of the nodes whose first field is a name: identifiers (uses, and
+# the names of declarations) and base types.
+_NAMED = frozenset({node_code(expressions.Identifier), node_code(types.BaseType)})
+
+
+def _base_name(spec: types.TypeSpecifier) -> str:
+    while isinstance(spec, types.ListType):
+        spec = spec.element_type
+    return spec.name  # type: ignore[attr-defined]
+
+
+def _type_text(spec: types.TypeSpecifier) -> str:
+    depth = 0
+    while isinstance(spec, types.ListType):
+        spec, depth = spec.element_type, depth + 1
+    return "list[" * depth + spec.name + "]" * depth  # type: ignore[attr-defined]
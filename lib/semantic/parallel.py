@@ -0,0 +1,117 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from typing import Iterator, Mapping, Optional
+from lib.parser.ast import program, declarations
+from lib.semantic.resolver import Resolution
+from lib.semantic.semantic_analyzer import SemanticAnalyzer
+from lib.semantic.symbols_table import Symbol, SymbolTable
+from lib.semantic.type_universe import TypeUniverse
+
+# Below this many functions per worker, starting processes costs more than it saves.
+MIN_CHUNK_FUNCTIONS = 256
+
+
+@dataclass(frozen=True)
+class Signatures:
+    """What function bodies can see of a program: the structs, function
+    signatures and global variables it declares, in order, and the
+    universe of their types. Pickled together, the types in the symbols
+    stay the very objects of the universe, as identity comparison needs."""
+
+    universe: TypeUniverse
+    globals: tuple[Symbol, ...]
+
+
+class VisibleGlobals(Mapping[str, Symbol]):
+    """The first ``count`` globals of a program by name: those declared
+    before the body being checked, as in the sequential analysis"""
+
+    def __init__(self, signatures: Signatures) -> None:
+        self._index = {symbol.name: (index, symbol) for index, symbol in enumerate(signatures.globals)}
+        self.count = 0
+
+    def __getitem__(self, name: str) -> Symbol:
+        index, symbol = self._index[name]
+        if index >= self.count:
+            raise KeyError(name)
+        return symbol
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, (index, _) in self._index.items() if index < self.count)
+
+    def __len__(self) -> int:
+        return min(self.count, len(self._index))
+
+
+class _SignaturePass(SemanticAnalyzer):
+    """Analyzes all but function bodies, setting each one aside with where
+    its errors go and how many globals it sees"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.bodies: list[tuple[declarations.FuncDecl, int, int]] = []
+
+    def _analyze_function_body(self, func: declarations.FuncDecl) -> None:
+        self.bodies.append((func, len(self.errors), len(self.symbol_table.scopes[0])))
+
+
+_signatures: Optional[Signatures] = None
+_bodies: list[tuple[declarations.FuncDecl, int]] = []
+
+
+# Each worker gets the signatures and the bodies (with the number of
+# globals each one sees) once, when it starts; a task is a range of bodies.
+def _start_worker(signatures: Signatures, bodies: list[tuple[declarations.FuncDecl, int]]) -> None:
+    global _signatures, _bodies
+    _signatures, _bodies = signatures, bodies
+
+
+def _check_bodies(start: int, end: int) -> list[list[str]]:
+    signatures = _signatures
+    assert signatures is not None
+    visible = VisibleGlobals(signatures)
+    analyzer = SemanticAnalyzer(SymbolTable(visible), signatures.universe)
+    errors = []
+    for func, count in _bodies[start:end]:
+        visible.count = count
+        errors.append(analyzer.analyze_function_body(func))
+    return errors
+
+
+def analyze_parallel(prog: program.Program, workers: Optional[int] = None) -> list[str]:
+    """The errors of ``SemanticAnalyzer().analyze(prog)``, with function
+    bodies checked in worker processes.
+
+    A first pass analyzes everything else in order and collects the
+    signatures; each worker checks its share of the bodies against them,
+    and the errors are merged back in source order. No annotations are
+    produced.
+    """
+    workers = workers or os.cpu_count() or 1
+    functions = sum(isinstance(node, declarations.FuncDecl) for node in prog.declarations)
+    chunks = min(workers * 4, functions // MIN_CHUNK_FUNCTIONS)
+    if workers < 2 or chunks < 2:
+        return SemanticAnalyzer().analyze(prog)
+
+    # Names are looked up by name: the resolver would walk the bodies too.
+    first = _SignaturePass()
+    errors = first.analyze(prog, Resolution())
+    bodies = first.bodies
+    if not bodies:
+        return errors
+    signatures = Signatures(first.universe, tuple(first.symbol_table.scopes[0].values()))
+    bounds = [len(bodies) * k // chunks for k in range(chunks + 1)]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_start_worker, initargs=(signatures, [(func, count) for func, _, count in bodies])
+    ) as pool:
+        checked = list(chain.from_iterable(pool.map(_check_bodies, bounds[:-1], bounds[1:])))
+
+    merged: list[str] = []
+    done = 0
+    for (_, at, _), body_errors in zip(bodies, checked):
+        merged += errors[done:at]
+        merged += body_errors
+        done = at
+    return merged + errors[done:]
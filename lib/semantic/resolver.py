@@ -0,0 +1,232 @@
+from dataclasses import dataclass
+from typing import Hashable, Optional
+from lib.parser.ast import program, declarations, statements, expressions
+from lib.parser.ast.arena import node_key
+from lib.parser.ast.base import Node
+from lib.parser.ast.visitor import Dispatch, Visitor, visits
+from lib.utils.trampoline import Step, trampoline
+
+# Names the analyzer defines before the program's own, in global slots 0 and 1.
+BUILTINS = ("print", "len")
+
+
+@dataclass(frozen=True, slots=True)
+class Binding:
+    """Where a name is stored: ``depth`` is the nesting of the scope that
+    declares it (0 for globals, 1 for parameters, more for blocks) and
+    ``slot`` its index among the globals, or among the locals of the
+    function (or of the top-level code) it belongs to"""
+
+    depth: int
+    slot: int
+
+    @property
+    def is_global(self) -> bool:
+        return self.depth == 0
+
+
+class Resolution:
+    """The binding of each declared name and of each identifier that
+    refers to one, plus the names of the slots of every frame.
+
+    Keyed by node identity (``node_key``), keeping the nodes alive like
+    ``TypeAnnotations``. Identifiers that don't refer to a declaration
+    seen before them have no entry.
+    """
+
+    __slots__ = ("_bindings", "_nodes", "globals", "main", "_frames")
+
+    def __init__(self) -> None:
+        self._bindings: dict[Hashable, Binding] = {}
+        self._nodes: list[Node] = []
+        # Declared name of each slot: the globals, the top-level code's
+        # locals, and each function's locals (parameters first).
+        self.globals: list[str] = []
+        self.main: list[str] = []
+        self._frames: dict[Hashable, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._bindings)
+
+    def record(self, node: Node, binding: Binding) -> None:
+        key = node_key(node)
+        self._bindings[key] = binding
+        if type(key) is int:
+            self._nodes.append(node)
+
+    def get(self, node: Node) -> Optional[Binding]:
+        return self._bindings.get(node_key(node))
+
+    def frame(self, func: declarations.FuncDecl) -> list[str]:
+        """Names of the local slots of ``func``"""
+        return self._frames.get(node_key(func), [])
+
+    def add_frame(self, func: declarations.FuncDecl) -> list[str]:
+        key = node_key(func)
+        frame = self._frames[key] = []
+        if type(key) is int:
+            self._nodes.append(func)
+        return frame
+
+
+class Resolver(Visitor):
+    """Binds every identifier to the declaration it refers to, scoped like
+    ``SemanticAnalyzer`` scopes names: a name is visible after its
+    declaration, in its block and the blocks inside it, and a repeated
+    declaration in the same scope doesn't rebind it.
+
+    Each name has a stack of its visible bindings, innermost last, so a
+    lookup doesn't search the scopes. Statements are trampolined like in
+    the analyzer; expressions declare nothing, so their identifiers are
+    found with a work list.
+    """
+
+    def __init__(self) -> None:
+        self.resolution: Resolution = Resolution()
+        # Name -> its visible bindings, innermost last.
+        self._visible: dict[str, list[Binding]] = {}
+        # Names declared by each open scope, innermost last.
+        self._scopes: list[list[str]] = [[]]
+        # Slot names of the frame being resolved.
+        self._frame: list[str] = self.resolution.main
+        self._resolve_toplevel: Dispatch = self.dispatcher("toplevel", self._skip)
+        self._resolve_statement: Dispatch = self.dispatcher("statement", self._skip)
+        self._children: Dispatch = self.dispatcher("expression", self._no_children)
+        for name in BUILTINS:
+            self._declare(name)
+
+    def resolve(self, prog: program.Program) -> Resolution:
+        for node in prog.declarations:
+            trampoline(self._resolve_toplevel(node))
+        return self.resolution
+
+    def _declare(self, name: str, node: Optional[Node] = None) -> Binding:
+        """A new slot for ``name`` in the current scope, bound to it unless
+        the scope already declares the name"""
+        depth = len(self._scopes) - 1
+        slots = self.resolution.globals if depth == 0 else self._frame
+        binding = Binding(depth, len(slots))
+        slots.append(name)
+        stack = self._visible.setdefault(name, [])
+        if not stack or stack[-1].depth != depth:
+            stack.append(binding)
+            self._scopes[-1].append(name)
+        if node is not None:
+            self.resolution.record(node, binding)
+        return binding
+
+    def _begin_scope(self) -> None:
+        self._scopes.append([])
+
+    def _end_scope(self) -> None:
+        for name in self._scopes.pop():
+            self._visible[name].pop()
+
+    def _skip(self, node: object) -> None:
+        return None
+
+    @visits("toplevel", statements.Statement)
+    def _resolve_toplevel_statement(self, st: statements.Statement) -> Step[None]:
+        return self._resolve_statement(st)
+
+    @visits("toplevel", declarations.StructDecl)
+    def _resolve_struct_decl(self, decl: declarations.StructDecl) -> None:
+        self._declare(decl.name.name, decl.name)
+
+    @visits("toplevel", declarations.FuncDecl)
+    def _resolve_func_decl(self, func: declarations.FuncDecl) -> Step[None]:
+        self._declare(func.name.name, func.name)
+        outer_frame, self._frame = self._frame, self.resolution.add_frame(func)
+        self._begin_scope()
+        for p in func.params:
+            self._declare(p.name.name, p.name)
+        yield self._resolve_block(func.body)
+        self._end_scope()
+        self._frame = outer_frame
+
+    @visits("toplevel", declarations.VarDecl)
+    @visits("statement", declarations.VarDecl)
+    def _resolve_var_decl(self, decl: declarations.VarDecl) -> None:
+        # Declared before its initializer is resolved, as the analyzer does.
+        self._declare(decl.name.name, decl.name)
+        if decl.initializer is not None:
+            self._resolve_expression(decl.initializer)
+
+    @visits("statement", statements.BlockStmt)
+    def _resolve_block(self, block: statements.BlockStmt) -> Step[None]:
+        self._begin_scope()
+        for st in block.statements:
+            yield self._resolve_statement(st)
+        self._end_scope()
+
+    @visits("statement", statements.ExpressionStmt)
+    def _resolve_expression_stmt(self, st: statements.ExpressionStmt) -> None:
+        if st.expression is not None:
+            self._resolve_expression(st.expression)
+
+    @visits("statement", statements.ReturnStmt)
+    def _resolve_return_stmt(self, st: statements.ReturnStmt) -> None:
+        if st.value is not None:
+            self._resolve_expression(st.value)
+
+    @visits("statement", statements.LoopStmt)
+    def _resolve_loop_stmt(self, st: statements.LoopStmt) -> Step[None]:
+        yield self._resolve_block(st.body)
+
+    @visits("statement", statements.IfStmt)
+    def _resolve_if_stmt(self, st: statements.IfStmt) -> Step[None]:
+        self._resolve_expression(st.condition)
+        yield self._resolve_block(st.then_branch)
+        for br in st.elif_branches:
+            self._resolve_expression(br.condition)
+            yield self._resolve_block(br.body)
+        if st.else_branch is not None:
+            yield self._resolve_block(st.else_branch)
+
+    def _resolve_expression(self, expr: expressions.Expression) -> None:
+        pending: list[expressions.Expression] = [expr]
+        while pending:
+            pending += self._children(pending.pop())
+
+    def _no_children(self, expr: expressions.Expression) -> tuple[expressions.Expression, ...]:
+        return ()
+
+    @visits("expression", expressions.Identifier)
+    def _resolve_identifier(self, ident: expressions.Identifier) -> tuple[expressions.Expression, ...]:
+        stack = self._visible.get(ident.name)
+        if stack:
+            self.resolution.record(ident, stack[-1])
+        return ()
+
+    @visits("expression", expressions.LiteralList)
+    def _list_children(self, lit: expressions.LiteralList) -> list[expressions.Expression]:
+        return lit.elements
+
+    @visits("expression", expressions.StructLiteral)
+    def _struct_children(self, lit: expressions.StructLiteral) -> list[expressions.Expression]:
+        return [fi.value for fi in lit.fields]
+
+    @visits("expression", expressions.AssignExpr)
+    def _assign_children(self, expr: expressions.AssignExpr) -> tuple[expressions.Expression, ...]:
+        return expr.target, expr.value
+
+    @visits("expression", expressions.BinaryOp)
+    def _binary_children(self, expr: expressions.BinaryOp) -> tuple[expressions.Expression, ...]:
+        return expr.left, expr.right
+
+    @visits("expression", expressions.UnaryOp)
+    def _unary_children(self, expr: expressions.UnaryOp) -> tuple[expressions.Expression, ...]:
+        return (expr.right,)
+
+    @visits("expression", expressions.FuncCall)
+    def _call_children(self, call: expressions.FuncCall) -> list[expressions.Expression]:
+        return [call.callee, *call.arguments]
+
+    @visits("expression", expressions.MemberAccess)
+    def _member_children(self, expr: expressions.MemberAccess) -> tuple[expressions.Expression, ...]:
+        # The member is a field name, not a reference.
+        return (expr.obj,)
+
+    @visits("expression", expressions.ArrayAccess)
+    def _index_children(self, expr: expressions.ArrayAccess) -> tuple[expressions.Expression, ...]:
+        return expr.array, expr.index
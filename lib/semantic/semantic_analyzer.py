@@ -1,151 +1,243 @@
 from typing import Optional
-from lib.parser.ast import program, declarations, statements, expressions, types
+from lib.parser.ast import program, declarations, statements, expressions
+from lib.parser.ast.visitor import Dispatch, Visitor, visits
 from lib.utils.error_handler import SemanticError
+from lib.utils.trampoline import Step, trampoline
+from lib.semantic.type_universe import BOOL, INT, STR, VOID, Type, TypeUniverse
+from lib.semantic.annotations import TypeAnnotations
+from lib.semantic.resolver import Binding, Resolution, Resolver
 from lib.semantic.symbols_table import (
     SymbolTable,
+    Symbol,
     VariableSymbol,
     FunctionSymbol,
     StructSymbol,
 )
 
-class SemanticAnalyzer:
-    def __init__(self, symbol_table: Optional[SymbolTable] = None) -> None:
+class SemanticAnalyzer(Visitor):
+    """Scope and type checks over the AST, collecting error messages.
+
+    Everything that walks into statements or expressions is a generator run
+    by ``trampoline`` (a nested check is ``yield``-ed rather than called), so
+    deeply nested programs don't hit Python's recursion limit.
+
+    Symbols are stored in the slots the ``Resolver`` assigned to their
+    declarations, and identifiers find theirs by binding rather than by
+    searching the scopes for their name.
+    """
+
+    def __init__(self, symbol_table: Optional[SymbolTable] = None, universe: Optional[TypeUniverse] = None) -> None:
         self.symbol_table: SymbolTable = symbol_table if symbol_table is not None else SymbolTable()
         self.errors: list[str] = []
-        self._function_return_stack: list[types.TypeSpecifier] = []
+        # Given when the symbol table holds types of another analysis.
+        self.universe: TypeUniverse = universe if universe is not None else TypeUniverse()
+        self.annotations: TypeAnnotations = TypeAnnotations()
+        self.resolution: Resolution = Resolution()
+        self._function_return_stack: list[Type] = []
         self._loop_depth: int = 0
         self._install_builtins()
-
-    def analyze(self, prog: program.Program) -> list[str]:
+        self._analyze_toplevel: Dispatch = self.dispatcher("toplevel", self._unknown_toplevel)
+        self._analyze_statement: Dispatch = self.dispatcher("statement", self._unknown_statement)
+        self._declare_toplevel: Dispatch = self.dispatcher("declaration", self._declares_nothing)
+        # Type of a name or literal, or the Step computing the type of a
+        # compound expression (either way, ``yield`` it). Handlers pass what
+        # they return through ``_typed``, which records it in ``annotations``.
+        self._type_of_expression: Dispatch = self.dispatcher("expression", self._unknown_expression)
+        self._typed = self.annotations.record
+
+    def analyze(self, prog: program.Program, resolution: Optional[Resolution] = None) -> list[str]:
+        """Check ``prog``, resolving its names first unless its
+        ``resolution`` is given"""
+        self.resolution = resolution if resolution is not None else Resolver().resolve(prog)
         for node in prog.declarations:
-            self._analyze_toplevel(node)
+            trampoline(self._analyze_toplevel(node))
+        return self.errors
+
+    def annotate(self, prog: program.Program, resolution: Optional[Resolution] = None) -> tuple[list[str], TypeAnnotations]:
+        """``analyze``, plus the type inferred for each expression, which the
+        code generators use to specialize operations"""
+        return self.analyze(prog, resolution), self.annotations
+
+    def analyze_parallel(self, prog: program.Program, workers: Optional[int] = None) -> list[str]:
+        """The errors of ``analyze()``, with function bodies checked in worker
+        processes; no annotations"""
+        from lib.semantic.parallel import analyze_parallel
+        self.errors = analyze_parallel(prog, workers)
         return self.errors
 
+    def analyze_function_body(self, func: declarations.FuncDecl) -> list[str]:
+        """Check the body of ``func``, with its signature and the globals
+        it sees in the symbol table already; the errors it adds"""
+        first = len(self.errors)
+        trampoline(self._analyze_function_body(func))
+        return self.errors[first:]
+
+    def analyze_toplevel(self, node: object) -> list[str]:
+        """Check one top-level node of a program whose earlier nodes were
+        analyzed or declared already; the errors it adds"""
+        first = len(self.errors)
+        trampoline(self._analyze_toplevel(node))
+        return self.errors[first:]
+
+    def declare_toplevel(self, node: object) -> None:
+        """Define the global symbol a top-level node declares, as
+        ``analyze_toplevel`` would, without checking the node"""
+        self._declare_toplevel(node)
+
+    def _declares_nothing(self, node: object) -> None:
+        return None
+
+    @visits("declaration", declarations.StructDecl)
+    def _declare_struct(self, decl: declarations.StructDecl) -> None:
+        if self.symbol_table.lookup_in_current(decl.name.name) is None:
+            field_map: dict[str, Type] = {}
+            for field in decl.fields:
+                if field.name.name not in field_map:
+                    field_map[field.name.name] = self.universe.of(field.type_spec)
+            self.symbol_table.define(StructSymbol(name=decl.name.name, fields=field_map))
+
+    @visits("declaration", declarations.FuncDecl)
+    def _declare_func_signature(self, func: declarations.FuncDecl) -> None:
+        if self.symbol_table.lookup_in_current(func.name.name) is None:
+            params = [self.universe.of(p.type_spec) for p in func.params]
+            self.symbol_table.define(FunctionSymbol(name=func.name.name, params=params, return_type=self.universe.of(func.return_type)))
+
+    @visits("declaration", declarations.VarDecl)
+    def _declare_global_var(self, decl: declarations.VarDecl) -> None:
+        if self.symbol_table.lookup_in_current(decl.name.name) is None:
+            self.symbol_table.define(VariableSymbol(name=decl.name.name, type_spec=self.universe.of(decl.type_spec)))
+
     def _install_builtins(self) -> None:
-        void_t = types.BaseType(name="void")
-        int_t = types.BaseType(name="int")
-        self.symbol_table.define(FunctionSymbol(name="print", params=[], return_type=void_t))
-        self.symbol_table.define(FunctionSymbol(name="len", params=[], return_type=int_t))
+        # In the global slots the Resolver reserves for them.
+        self.symbol_table.define(FunctionSymbol(name="print", params=[], return_type=self.universe.void), Binding(0, 0))
+        self.symbol_table.define(FunctionSymbol(name="len", params=[], return_type=self.universe.int), Binding(0, 1))
+
+    def _symbol(self, ident: expressions.Identifier) -> Optional[Symbol]:
+        binding = self.resolution.get(ident)
+        sym = self.symbol_table.at(binding) if binding is not None else None
+        # Names the resolver didn't bind, such as those defined in a symbol
+        # table given to the analyzer, are looked up by name.
+        return sym if sym is not None else self.symbol_table.lookup(ident.name)
 
     def _report(self, message: str, node: Optional[object] = None) -> None:
         line = getattr(node, "line", 1)
         column = getattr(node, "col", 1)
         self.errors.append(str(SemanticError(message, line=line, column=column, node=node)))
 
-    def _analyze_toplevel(self, node: object) -> None:
-        if isinstance(node, declarations.StructDecl):
-            self._analyze_struct_decl(node)
-        elif isinstance(node, declarations.FuncDecl):
-            self._declare_func(node)
-        elif isinstance(node, declarations.VarDecl):
-            self._analyze_var_decl(node)
-        elif isinstance(node, statements.Statement):
-            self._analyze_statement(node)
-        else:
-            self._report("Unknown top-level node.", node=node)
+    def _unknown_toplevel(self, node: object) -> None:
+        self._report("Unknown top-level node.", node=node)
+
+    @visits("toplevel", statements.Statement)
+    def _analyze_toplevel_statement(self, st: statements.Statement) -> Step[None]:
+        return self._analyze_statement(st)
 
+    @visits("toplevel", declarations.StructDecl)
     def _analyze_struct_decl(self, decl: declarations.StructDecl) -> None:
         struct_name = decl.name.name
         if self.symbol_table.lookup_in_current(struct_name) is not None:
             self._report(f"Redeclaration of symbol '{struct_name}'.", node=decl.name)
             return
-        field_map: dict[str, types.TypeSpecifier] = {}
+        field_map: dict[str, Type] = {}
         for field in decl.fields:
             fname = field.name.name
             if fname in field_map:
                 self._report(f"Duplicate field '{fname}' in struct '{struct_name}'.", node=field)
                 continue
-            field_map[fname] = field.type_spec
-        self.symbol_table.define(StructSymbol(name=struct_name, fields=field_map))
+            field_map[fname] = self.universe.of(field.type_spec)
+        self.symbol_table.define(StructSymbol(name=struct_name, fields=field_map), self.resolution.get(decl.name))
 
-    def _declare_func(self, func: declarations.FuncDecl) -> None:
+    @visits("toplevel", declarations.FuncDecl)
+    def _declare_func(self, func: declarations.FuncDecl) -> Step[None]:
         name = func.name.name
         if self.symbol_table.lookup_in_current(name) is not None:
             self._report(f"Redeclaration of symbol '{name}'.", node=func.name)
             return
-        self.symbol_table.define(FunctionSymbol(name=name, params=func.params, return_type=func.return_type))
-        self._analyze_function_body(func)
-
-    def _analyze_function_body(self, func: declarations.FuncDecl) -> None:
+        params = [self.universe.of(p.type_spec) for p in func.params]
+        self.symbol_table.define(
+            FunctionSymbol(name=name, params=params, return_type=self.universe.of(func.return_type)),
+            self.resolution.get(func.name)
+        )
+        yield self._analyze_function_body(func)
+
+    def _analyze_function_body(self, func: declarations.FuncDecl) -> Step[None]:
+        self.symbol_table.begin_frame()
         self.symbol_table.begin_scope()
         for p in func.params:
             pname = p.name.name
             if self.symbol_table.lookup_in_current(pname) is not None:
                 self._report(f"Redeclaration of parameter '{pname}' in function '{func.name.name}'.", node=p.name)
                 continue
-            self.symbol_table.define(VariableSymbol(name=pname, type_spec=p.type_spec))
-        self._function_return_stack.append(func.return_type)
-        self._analyze_block(func.body)
+            self.symbol_table.define(VariableSymbol(name=pname, type_spec=self.universe.of(p.type_spec)), self.resolution.get(p.name))
+        self._function_return_stack.append(self.universe.of(func.return_type))
+        yield self._analyze_block(func.body)
         self._function_return_stack.pop()
         self.symbol_table.end_scope()
+        self.symbol_table.end_frame()
 
-    def _analyze_var_decl(self, decl: declarations.VarDecl) -> None:
+    @visits("toplevel", declarations.VarDecl)
+    @visits("statement", declarations.VarDecl)
+    def _analyze_var_decl(self, decl: declarations.VarDecl) -> Step[None]:
         name = decl.name.name
+        declared = self.universe.of(decl.type_spec)
         if self.symbol_table.lookup_in_current(name) is not None:
             self._report(f"Redeclaration of symbol '{name}'.", node=decl.name)
         else:
-            self.symbol_table.define(VariableSymbol(name=name, type_spec=decl.type_spec))
+            self.symbol_table.define(VariableSymbol(name=name, type_spec=declared), self.resolution.get(decl.name))
         if decl.initializer is not None:
-            # Handle list literal with a known list target type
-            if isinstance(decl.type_spec, types.ListType) and isinstance(decl.initializer, expressions.LiteralList):
-                self._check_list_literal_assignment(decl.type_spec, decl.initializer)
-                return
-            init_t = self._type_of_expression(decl.initializer)
-            if init_t is None:
-                if isinstance(decl.initializer, expressions.StructLiteral):
-                    self._check_struct_literal_assignment(decl.type_spec, decl.initializer)
-                return
-            if not self._is_assignable(decl.type_spec, init_t):
+            init_t = yield self._check_expression(decl.initializer, declared)
+            if init_t is not None and not self._is_assignable(declared, init_t):
                 self._report(
-                    f"Type mismatch in variable initialization of '{name}' (expected {self._type_str(decl.type_spec)}, got {self._type_str(init_t)}).",
+                    f"Type mismatch in variable initialization of '{name}' (expected {self._type_str(declared)}, got {self._type_str(init_t)}).",
                     node=decl
                 )
 
-    def _analyze_block(self, block: statements.BlockStmt) -> None:
+    @visits("statement", statements.BlockStmt)
+    def _analyze_block(self, block: statements.BlockStmt) -> Step[None]:
         self.symbol_table.begin_scope()
         for st in block.statements:
-            self._analyze_statement(st)
+            yield self._analyze_statement(st)
         self.symbol_table.end_scope()
 
-    def _analyze_statement(self, st: statements.Statement) -> None:
-        if isinstance(st, declarations.VarDecl):
-            self._analyze_var_decl(st)
-        elif isinstance(st, statements.BlockStmt):
-            self._analyze_block(st)
-        elif isinstance(st, statements.ExpressionStmt):
-            if st.expression is not None:
-                self._type_of_expression(st.expression)
-        elif isinstance(st, statements.ReturnStmt):
-            self._check_return_stmt(st)
-        elif isinstance(st, statements.BreakStmt):
-            if self._loop_depth <= 0:
-                self._report("Break used outside of loop.", node=st)
-        elif isinstance(st, statements.ContinueStmt):
-            if self._loop_depth <= 0:
-                self._report("Continue used outside of loop.", node=st)
-        elif isinstance(st, statements.LoopStmt):
-            self._loop_depth += 1
-            self._analyze_block(st.body)
-            self._loop_depth -= 1
-        elif isinstance(st, statements.IfStmt):
-            self._analyze_if_stmt(st)
-        else:
-            self._report("Unknown statement.", node=st)
-
-    def _analyze_if_stmt(self, node: statements.IfStmt) -> None:
-        cond_t = self._type_of_expression(node.condition)
+    def _unknown_statement(self, st: statements.Statement) -> None:
+        self._report("Unknown statement.", node=st)
+
+    @visits("statement", statements.ExpressionStmt)
+    def _analyze_expression_stmt(self, st: statements.ExpressionStmt) -> Step[None]:
+        if st.expression is not None:
+            yield self._type_of_expression(st.expression)
+
+    @visits("statement", statements.BreakStmt)
+    def _check_break_stmt(self, st: statements.BreakStmt) -> None:
+        if self._loop_depth <= 0:
+            self._report("Break used outside of loop.", node=st)
+
+    @visits("statement", statements.ContinueStmt)
+    def _check_continue_stmt(self, st: statements.ContinueStmt) -> None:
+        if self._loop_depth <= 0:
+            self._report("Continue used outside of loop.", node=st)
+
+    @visits("statement", statements.LoopStmt)
+    def _analyze_loop_stmt(self, st: statements.LoopStmt) -> Step[None]:
+        self._loop_depth += 1
+        yield self._analyze_block(st.body)
+        self._loop_depth -= 1
+
+    @visits("statement", statements.IfStmt)
+    def _analyze_if_stmt(self, node: statements.IfStmt) -> Step[None]:
+        cond_t = yield self._type_of_expression(node.condition)
         if not self._is_bool(cond_t):
             self._report("If condition must be 'bool'.", node=node.condition)
-        self._analyze_block(node.then_branch)
+        yield self._analyze_block(node.then_branch)
         for br in node.elif_branches:
-            c = self._type_of_expression(br.condition)
+            c = yield self._type_of_expression(br.condition)
             if not self._is_bool(c):
                 self._report("Elif condition must be 'bool'.", node=br.condition)
-            self._analyze_block(br.body)
+            yield self._analyze_block(br.body)
         if node.else_branch is not None:
-            self._analyze_block(node.else_branch)
+            yield self._analyze_block(node.else_branch)
 
-    def _check_return_stmt(self, st: statements.ReturnStmt) -> None:
+    @visits("statement", statements.ReturnStmt)
+    def _check_return_stmt(self, st: statements.ReturnStmt) -> Step[None]:
         if not self._function_return_stack:
             self._report("Return used outside of function.", node=st)
             return
@@ -154,187 +246,212 @@ class SemanticAnalyzer:
             if not self._is_void(expected):
                 self._report(f"Missing return value (expected {self._type_str(expected)}).", node=st)
             return
-        got = self._type_of_expression(st.value)
+        got = yield self._check_expression(st.value, expected)
         if got is None:
             self._report("Could not infer return type.", node=st.value or st)
             return
         if not self._is_assignable(expected, got):
             self._report(f"Return type mismatch (expected {self._type_str(expected)}, got {self._type_str(got)}).", node=st)
 
-    def _type_of_expression(self, expr: expressions.Expression) -> Optional[types.TypeSpecifier]:
-        if isinstance(expr, expressions.Identifier):
-            sym = self.symbol_table.lookup(expr.name)
-            if sym is None:
-                self._report(f"Undeclared identifier '{expr.name}'.", node=expr)
-                return None
-            if isinstance(sym, VariableSymbol):
-                return sym.type_spec
-            if isinstance(sym, FunctionSymbol):
-                return sym.return_type
-            if isinstance(sym, StructSymbol):
-                return types.BaseType(name=sym.name)
-            return None
-
-        if isinstance(expr, expressions.IntLiteral):
-            return types.BaseType(name="int")
-        if isinstance(expr, expressions.FloatLiteral):
-            return types.BaseType(name="float")
-        if isinstance(expr, expressions.StringLiteral):
-            return types.BaseType(name="str")
-        if isinstance(expr, expressions.BoolLiteral):
-            return types.BaseType(name="bool")
-
-        if isinstance(expr, expressions.LiteralList):
-            if len(expr.elements) == 0:
-                self._report("Cannot infer element type of empty list literal.", node=expr)
-                return types.ListType(element_type=types.BaseType(name="void"))
-            first_t = self._type_of_expression(expr.elements[0])
-            if first_t is None:
-                self._report("Cannot infer element type of list literal.", node=expr)
-                return types.ListType(element_type=types.BaseType(name="void"))
-            for el in expr.elements[1:]:
-                et = self._type_of_expression(el)
-                if et is None or not self._is_assignable(first_t, et):
-                    self._report("List literal elements must have a compatible type.", node=el)
-                    break
-            return types.ListType(element_type=first_t)
+    def _unknown_expression(self, expr: expressions.Expression) -> None:
+        return None
 
+    def _check_expression(self, expr: expressions.Expression, expected: Type) -> Step[Optional[Type]]:
+        """Check ``expr`` against the type the context expects.
+
+        List and struct literals are checked element by element (field by
+        field) against ``expected``, which becomes their type, so nested
+        literals take their types from the declaration instead of being
+        inferred and compared afterwards. Any other expression is inferred
+        and its type returned for the caller to compare. Either way each
+        node is visited once.
+        """
+        if isinstance(expr, expressions.LiteralList) and expected.is_list:
+            yield self._check_list_literal_assignment(expected, expr)
+            return self._typed(expr, expected)
         if isinstance(expr, expressions.StructLiteral):
+            yield self._check_struct_literal_assignment(expected, expr)
+            return self._typed(expr, expected)
+        return (yield self._type_of_expression(expr))
+
+    @visits("expression", expressions.Identifier)
+    def _type_of_identifier(self, expr: expressions.Identifier) -> Optional[Type]:
+        sym = self._symbol(expr)
+        if sym is None:
+            self._report(f"Undeclared identifier '{expr.name}'.", node=expr)
             return None
+        if isinstance(sym, VariableSymbol):
+            return self._typed(expr, sym.type_spec)
+        if isinstance(sym, FunctionSymbol):
+            return self._typed(expr, sym.return_type)
+        if isinstance(sym, StructSymbol):
+            return self._typed(expr, self.universe.named(sym.name))
+        return None
 
-        if isinstance(expr, expressions.AssignExpr):
-            target_t = self._type_of_expression(expr.target) if hasattr(expr, "target") else None
-            value_t = self._type_of_expression(expr.value) if hasattr(expr, "value") else None
-            op = getattr(expr, "op", "=")
-            if op == "=":
-                if isinstance(target_t, types.ListType) and isinstance(expr.value, expressions.LiteralList):
-                    self._check_list_literal_assignment(target_t, expr.value)
-                    return target_t
-                if isinstance(expr.value, expressions.StructLiteral) and target_t is not None:
-                    self._check_struct_literal_assignment(target_t, expr.value)
-                    return target_t
-                if target_t is not None and value_t is not None and not self._is_assignable(target_t, value_t):
-                    self._report(
-                        f"Type mismatch in assignment (expected {self._type_str(target_t)}, got {self._type_str(value_t)}).",
-                        node=expr
-                    )
-                return target_t
-            if target_t is None or value_t is None:
-                self._report("Could not infer types in compound assignment.", node=expr)
-                return target_t
-            bin_op = op[:-1]
-            res_t = self._binary_result_type(bin_op, target_t, value_t)
-            if res_t is None or not self._is_assignable(target_t, res_t):
-                self._report(
-                    f"Incompatible types for '{op}' (left {self._type_str(target_t)}, right {self._type_str(value_t)}).",
-                    node=expr
-                )
-            return target_t
-
-        if isinstance(expr, expressions.BinaryOp):
-            left_t = self._type_of_expression(expr.left) if hasattr(expr, "left") else None
-            right_t = self._type_of_expression(expr.right) if hasattr(expr, "right") else None
-            op = getattr(expr, "op", "")
-            if left_t is None or right_t is None:
-                self._report("Could not infer operand type for binary operation.", node=expr)
-                return None
-            res_t = self._binary_result_type(op, left_t, right_t)
-            if res_t is None:
+    @visits("expression", expressions.IntLiteral)
+    def _type_of_int_literal(self, expr: expressions.IntLiteral) -> Type:
+        return self._typed(expr, self.universe.int)
+
+    @visits("expression", expressions.FloatLiteral)
+    def _type_of_float_literal(self, expr: expressions.FloatLiteral) -> Type:
+        return self._typed(expr, self.universe.float)
+
+    @visits("expression", expressions.StringLiteral)
+    def _type_of_string_literal(self, expr: expressions.StringLiteral) -> Type:
+        return self._typed(expr, self.universe.str)
+
+    @visits("expression", expressions.BoolLiteral)
+    def _type_of_bool_literal(self, expr: expressions.BoolLiteral) -> Type:
+        return self._typed(expr, self.universe.bool)
+
+    @visits("expression", expressions.LiteralList)
+    def _type_of_list_literal(self, expr: expressions.LiteralList) -> Step[Optional[Type]]:
+        if len(expr.elements) == 0:
+            self._report("Cannot infer element type of empty list literal.", node=expr)
+            return self._typed(expr, self.universe.list_of(self.universe.void))
+        first_t = yield self._type_of_expression(expr.elements[0])
+        if first_t is None:
+            self._report("Cannot infer element type of list literal.", node=expr)
+            return self._typed(expr, self.universe.list_of(self.universe.void))
+        # Without an expected type, every element is inferred and compared
+        # with the first; the first mismatch is reported.
+        for el in expr.elements[1:]:
+            et = yield self._type_of_expression(el)
+            if et is None or not self._is_assignable(first_t, et):
+                self._report("List literal elements must have a compatible type.", node=el)
+                break
+        return self._typed(expr, self.universe.list_of(first_t))
+
+    @visits("expression", expressions.StructLiteral)
+    def _type_of_struct_literal(self, expr: expressions.StructLiteral) -> Optional[Type]:
+        return None
+
+    @visits("expression", expressions.AssignExpr)
+    def _type_of_assignment(self, expr: expressions.AssignExpr) -> Step[Optional[Type]]:
+        target_t = (yield self._type_of_expression(expr.target)) if hasattr(expr, "target") else None
+        op = getattr(expr, "op", "=")
+        if target_t is not None and op == "=":
+            value_t = yield self._check_expression(expr.value, target_t)
+        else:
+            value_t = (yield self._type_of_expression(expr.value)) if hasattr(expr, "value") else None
+        if op == "=":
+            if target_t is not None and value_t is not None and not self._is_assignable(target_t, value_t):
                 self._report(
-                    f"Incompatible types for '{op}' (left {self._type_str(left_t)}, right {self._type_str(right_t)}).",
+                    f"Type mismatch in assignment (expected {self._type_str(target_t)}, got {self._type_str(value_t)}).",
                     node=expr
                 )
-            return res_t
-
-        if isinstance(expr, expressions.UnaryOp):
-            op = getattr(expr, "op", "")
-            right_t = self._type_of_expression(expr.right) if hasattr(expr, "right") else None
-            if op == "!":
-                if not self._is_bool(right_t):
-                    self._report("Operator '!' expects operand of type 'bool'.", node=expr)
-                return types.BaseType(name="bool")
-            if op == "-":
-                if not self._is_number(right_t):
-                    self._report("Unary '-' expects numeric operand.", node=expr)
-                    return None
-                return right_t
-            self._report("Unknown unary operator.", node=expr)
+            return self._typed(expr, target_t)
+        if target_t is None or value_t is None:
+            self._report("Could not infer types in compound assignment.", node=expr)
+            return self._typed(expr, target_t)
+        bin_op = op[:-1]
+        res_t = self._binary_result_type(bin_op, target_t, value_t)
+        if res_t is None or not self._is_assignable(target_t, res_t):
+            self._report(
+                f"Incompatible types for '{op}' (left {self._type_str(target_t)}, right {self._type_str(value_t)}).",
+                node=expr
+            )
+        return self._typed(expr, target_t)
+
+    @visits("expression", expressions.BinaryOp)
+    def _type_of_binary_op(self, expr: expressions.BinaryOp) -> Step[Optional[Type]]:
+        left_t = (yield self._type_of_expression(expr.left)) if hasattr(expr, "left") else None
+        right_t = (yield self._type_of_expression(expr.right)) if hasattr(expr, "right") else None
+        op = getattr(expr, "op", "")
+        if left_t is None or right_t is None:
+            self._report("Could not infer operand type for binary operation.", node=expr)
             return None
-
-        if isinstance(expr, expressions.MemberAccess):
-            obj_t = self._type_of_expression(expr.obj) if hasattr(expr, "obj") else None
-            mem = getattr(getattr(expr, "member", None), "name", "")
-            if isinstance(obj_t, types.ListType):
-                if mem == "length":
-                    return types.BaseType(name="int")
-                self._report(f"List type has no member '{mem}'.", node=expr)
+        res_t = self._binary_result_type(op, left_t, right_t)
+        if res_t is None:
+            self._report(
+                f"Incompatible types for '{op}' (left {self._type_str(left_t)}, right {self._type_str(right_t)}).",
+                node=expr
+            )
+        return self._typed(expr, res_t)
+
+    @visits("expression", expressions.UnaryOp)
+    def _type_of_unary_op(self, expr: expressions.UnaryOp) -> Step[Optional[Type]]:
+        op = getattr(expr, "op", "")
+        right_t = (yield self._type_of_expression(expr.right)) if hasattr(expr, "right") else None
+        if op == "!":
+            if not self._is_bool(right_t):
+                self._report("Operator '!' expects operand of type 'bool'.", node=expr)
+            return self._typed(expr, self.universe.bool)
+        if op == "-":
+            if not self._is_number(right_t):
+                self._report("Unary '-' expects numeric operand.", node=expr)
                 return None
-            if isinstance(obj_t, types.BaseType):
-                sym = self.symbol_table.lookup(obj_t.name)
-                if isinstance(sym, StructSymbol):
-                    if mem in sym.fields:
-                        return sym.fields[mem]
-                    self._report(f"Struct '{obj_t.name}' has no field '{mem}'.", node=expr)
-                    return None
-            self._report("Member access on non-struct type.", node=expr)
-            return None
+            return self._typed(expr, right_t)
+        self._report("Unknown unary operator.", node=expr)
+        return None
 
-        if isinstance(expr, expressions.ArrayAccess):
-            arr_t = self._type_of_expression(expr.array) if hasattr(expr, "array") else None
-            idx_t = self._type_of_expression(expr.index) if hasattr(expr, "index") else None
-            if not self._is_number(idx_t) and not self._is_int(idx_t):
-                self._report("Array index must be of type 'int'.", node=expr.index if hasattr(expr, "index") else expr)
-            if isinstance(arr_t, types.ListType):
-                return arr_t.element_type
-            self._report("Subscript operator used on non-list type.", node=expr)
+    @visits("expression", expressions.MemberAccess)
+    def _type_of_member_access(self, expr: expressions.MemberAccess) -> Step[Optional[Type]]:
+        obj_t = (yield self._type_of_expression(expr.obj)) if hasattr(expr, "obj") else None
+        mem = getattr(getattr(expr, "member", None), "name", "")
+        if obj_t is not None and obj_t.is_list:
+            if mem == "length":
+                return self._typed(expr, self.universe.int)
+            self._report(f"List type has no member '{mem}'.", node=expr)
             return None
-
-        if isinstance(expr, expressions.FuncCall):
-            callee_t = self._type_of_expression(expr.callee) if hasattr(expr, "callee") else None
-            args = list(getattr(expr, "arguments", []))
-            if isinstance(expr.callee, expressions.Identifier) and expr.callee.name == "print":
-                for a in args:
-                    self._type_of_expression(a)
-                return types.BaseType(name="void")
-            if isinstance(expr.callee, expressions.Identifier) and expr.callee.name == "len":
-                if len(args) != 1:
-                    self._report(f"'len' expects 1 argument, got {len(args)}.", node=expr)
-                    for a in args:
-                        self._type_of_expression(a)
-                    return types.BaseType(name="int")
-                at = self._type_of_expression(args[0])
-                if isinstance(at, types.ListType) or (isinstance(at, types.BaseType) and at.name == "str"):
-                    return types.BaseType(name="int")
-                self._report("Argument to 'len' must be a list or 'str'.", node=args[0] if args else expr)
-                return types.BaseType(name="int")
-            if isinstance(expr.callee, expressions.Identifier):
-                sym = self.symbol_table.lookup(expr.callee.name)
-                if isinstance(sym, FunctionSymbol):
-                    if len(sym.params) != len(args):
-                        self._report(f"Function '{sym.name}' expects {len(sym.params)} arguments, got {len(args)}.", node=expr)
-                    for p, a in zip(sym.params, args):
-                        # If argument is a list literal and parameter is list-typed, validate elements against parameter element type
-                        if isinstance(a, expressions.LiteralList) and isinstance(p.type_spec, types.ListType):
-                            self._check_list_literal_assignment(p.type_spec, a)
-                            continue
-                        # If argument is struct literal and parameter is a struct type, validate fields
-                        if isinstance(a, expressions.StructLiteral) and isinstance(p.type_spec, types.BaseType):
-                            self._check_struct_literal_assignment(p.type_spec, a)
-                            continue
-                        at = self._type_of_expression(a)
-                        if at is None:
-                            continue
-                        if not self._is_assignable(p.type_spec, at):
-                            self._report(f"Argument type mismatch for '{sym.name}' (expected {self._type_str(p.type_spec)}, got {self._type_str(at)}).", node=a)
-                    return sym.return_type
-                self._report("Call target is not a function.", node=expr.callee)
+        if obj_t is not None:
+            sym = self.symbol_table.lookup(obj_t.name)
+            if isinstance(sym, StructSymbol):
+                if mem in sym.fields:
+                    return self._typed(expr, sym.fields[mem])
+                self._report(f"Struct '{obj_t.name}' has no field '{mem}'.", node=expr)
                 return None
-            return callee_t
+        self._report("Member access on non-struct type.", node=expr)
+        return None
 
+    @visits("expression", expressions.ArrayAccess)
+    def _type_of_array_access(self, expr: expressions.ArrayAccess) -> Step[Optional[Type]]:
+        arr_t = (yield self._type_of_expression(expr.array)) if hasattr(expr, "array") else None
+        idx_t = (yield self._type_of_expression(expr.index)) if hasattr(expr, "index") else None
+        if not self._is_number(idx_t) and not self._is_int(idx_t):
+            self._report("Array index must be of type 'int'.", node=expr.index if hasattr(expr, "index") else expr)
+        if arr_t is not None and arr_t.element is not None:
+            return self._typed(expr, arr_t.element)
+        self._report("Subscript operator used on non-list type.", node=expr)
         return None
 
-    def _check_struct_literal_assignment(self, target_t: types.TypeSpecifier, lit: expressions.StructLiteral) -> None:
-        if not isinstance(target_t, types.BaseType):
+    @visits("expression", expressions.FuncCall)
+    def _type_of_call(self, expr: expressions.FuncCall) -> Step[Optional[Type]]:
+        callee_t = (yield self._type_of_expression(expr.callee)) if hasattr(expr, "callee") else None
+        args = list(getattr(expr, "arguments", []))
+        if isinstance(expr.callee, expressions.Identifier) and expr.callee.name == "print":
+            for a in args:
+                yield self._type_of_expression(a)
+            return self._typed(expr, self.universe.void)
+        if isinstance(expr.callee, expressions.Identifier) and expr.callee.name == "len":
+            if len(args) != 1:
+                self._report(f"'len' expects 1 argument, got {len(args)}.", node=expr)
+                for a in args:
+                    yield self._type_of_expression(a)
+                return self._typed(expr, self.universe.int)
+            at = yield self._type_of_expression(args[0])
+            if at is not None and (at.is_list or at.id == STR):
+                return self._typed(expr, self.universe.int)
+            self._report("Argument to 'len' must be a list or 'str'.", node=args[0] if args else expr)
+            return self._typed(expr, self.universe.int)
+        if isinstance(expr.callee, expressions.Identifier):
+            sym = self._symbol(expr.callee)
+            if isinstance(sym, FunctionSymbol):
+                if len(sym.params) != len(args):
+                    self._report(f"Function '{sym.name}' expects {len(sym.params)} arguments, got {len(args)}.", node=expr)
+                for param_t, a in zip(sym.params, args):
+                    at = yield self._check_expression(a, param_t)
+                    if at is None:
+                        continue
+                    if not self._is_assignable(param_t, at):
+                        self._report(f"Argument type mismatch for '{sym.name}' (expected {self._type_str(param_t)}, got {self._type_str(at)}).", node=a)
+                return self._typed(expr, sym.return_type)
+            self._report("Call target is not a function.", node=expr.callee)
+            return None
+        return self._typed(expr, callee_t)
+
+    def _check_struct_literal_assignment(self, target_t: Type, lit: expressions.StructLiteral) -> Step[None]:
+        if target_t.is_list:
             self._report("Struct literal assigned to non-struct type.", node=lit)
             return
         sym = self.symbol_table.lookup(target_t.name)
@@ -349,84 +466,41 @@ class SemanticAnalyzer:
             if fname not in provided:
                 self._report(f"Missing field '{fname}' for struct '{sym.name}'.", node=lit)
                 continue
-            vt = self._type_of_expression(provided[fname])
+            vt = yield self._check_expression(provided[fname], ftype)
             if vt is None or not self._is_assignable(ftype, vt):
                 self._report(f"Incompatible type for field '{fname}' in struct '{sym.name}' (expected {self._type_str(ftype)}, got {self._type_str(vt)}).", node=provided[fname])
 
-    def _check_list_literal_assignment(self, target_t: types.ListType, lit: expressions.LiteralList) -> None:
-        elem_t = target_t.element_type
+    def _check_list_literal_assignment(self, target_t: Type, lit: expressions.LiteralList) -> Step[None]:
+        elem_t = target_t.element
+        assert elem_t is not None
         for el in lit.elements:
-            if isinstance(el, expressions.StructLiteral):
-                if isinstance(elem_t, types.BaseType):
-                    self._check_struct_literal_assignment(elem_t, el)
-                else:
-                    self._report("Struct literal assigned to non-struct element type in list.", node=el)
+            if isinstance(el, expressions.StructLiteral) and elem_t.is_list:
+                self._report("Struct literal assigned to non-struct element type in list.", node=el)
             else:
-                at = self._type_of_expression(el)
+                at = yield self._check_expression(el, elem_t)
                 if at is None:
                     self._report("Could not infer element type in list literal.", node=el)
                     continue
                 if not self._is_assignable(elem_t, at):
                     self._report(f"Incompatible list element type (expected {self._type_str(elem_t)}, got {self._type_str(at)}).", node=el)
 
-    def _binary_result_type(
-        self,
-        op: str,
-        left: types.TypeSpecifier,
-        right: types.TypeSpecifier,
-    ) -> Optional[types.TypeSpecifier]:
-        if op in ("&&", "||"):
-            if self._is_bool(left) and self._is_bool(right):
-                return types.BaseType(name="bool")
-            return None
-        if op in ("==", "!=", "<", "<=", ">", ">="):
-            if (self._is_number(left) and self._is_number(right)) or (self._is_str(left) and self._is_str(right)) or (self._is_bool(left) and self._is_bool(right)):
-                return types.BaseType(name="bool")
-            return None
-        if op in ("+", "-", "*", "/", "%", "**"):
-            if op == "+" and (self._is_str(left) or self._is_str(right)):
-                return types.BaseType(name="str")
-            if self._is_number(left) and self._is_number(right):
-                if self._is_float(left) or self._is_float(right):
-                    return types.BaseType(name="float")
-                return types.BaseType(name="int")
-            return None
-        return None
+    def _binary_result_type(self, op: str, left: Type, right: Type) -> Optional[Type]:
+        return self.universe.binary_result(op, left, right)
+
+    def _is_assignable(self, target: Type, value: Type) -> bool:
+        return self.universe.is_assignable(target, value)
+
+    def _type_str(self, t: Optional[Type]) -> str:
+        return "unknown" if t is None else str(t)
+
+    def _is_void(self, t: Type) -> bool:
+        return t.id == VOID
+
+    def _is_bool(self, t: Optional[Type]) -> bool:
+        return t is not None and t.id == BOOL
+
+    def _is_int(self, t: Optional[Type]) -> bool:
+        return t is not None and t.id == INT
 
-    def _is_assignable(self, target: types.TypeSpecifier, value: types.TypeSpecifier) -> bool:
-        if isinstance(target, types.BaseType) and isinstance(value, types.BaseType):
-            if target.name == value.name:
-                return True
-            if target.name == "float" and value.name == "int":
-                return True
-            return False
-        if isinstance(target, types.ListType) and isinstance(value, types.ListType):
-            return self._is_assignable(target.element_type, value.element_type)
-        return False
-
-    def _type_str(self, t: Optional[types.TypeSpecifier]) -> str:
-        if t is None:
-            return "unknown"
-        if isinstance(t, types.BaseType):
-            return t.name
-        if isinstance(t, types.ListType):
-            return f"list[{self._type_str(t.element_type)}]"
-        return "type"
-
-    def _is_void(self, t: types.TypeSpecifier) -> bool:
-        return isinstance(t, types.BaseType) and t.name == "void"
-
-    def _is_bool(self, t: Optional[types.TypeSpecifier]) -> bool:
-        return isinstance(t, types.BaseType) and t.name == "bool" if t is not None else False
-
-    def _is_str(self, t: Optional[types.TypeSpecifier]) -> bool:
-        return isinstance(t, types.BaseType) and t.name == "str" if t is not None else False
-
-    def _is_int(self, t: Optional[types.TypeSpecifier]) -> bool:
-        return isinstance(t, types.BaseType) and t.name == "int" if t is not None else False
-
-    def _is_float(self, t: Optional[types.TypeSpecifier]) -> bool:
-        return isinstance(t, types.BaseType) and t.name == "float" if t is not None else False
-
-    def _is_number(self, t: Optional[types.TypeSpecifier]) -> bool:
-        return self._is_int(t) or self._is_float(t)
+    def _is_number(self, t: Optional[Type]) -> bool:
+        return self.universe.is_number(t)
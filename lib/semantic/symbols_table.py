@@ -1,6 +1,7 @@
 from dataclasses import dataclass
-from typing import Dict, List, Optional
-from lib.parser.ast import declarations, types
+from typing import Dict, List, Mapping, Optional
+from lib.semantic.type_universe import Type
+from lib.semantic.resolver import Binding
 
 @dataclass(slots=True)
 class Symbol:
@@ -8,20 +9,26 @@ class Symbol:
 
 @dataclass(slots=True)
 class VariableSymbol(Symbol):
-    type_spec: types.TypeSpecifier
+    type_spec: Type
 
 @dataclass(slots=True)
 class FunctionSymbol(Symbol):
-    params: list[declarations.ParamDecl]
-    return_type: types.TypeSpecifier
+    params: list[Type]
+    return_type: Type
 
 @dataclass(slots=True)
 class StructSymbol(Symbol):
-    fields: Dict[str, types.TypeSpecifier]
+    fields: Dict[str, Type]
 
 class SymbolTable:
-    def __init__(self) -> None:
+    def __init__(self, outer: Optional[Mapping[str, Symbol]] = None) -> None:
         self.scopes: List[Dict[str, Symbol]] = [{}]
+        # A read-only scope under all the others (such as the globals a
+        # function body sees), searched last and never defined into.
+        self.outer = outer
+        # Symbols by the slot of their resolver binding: the globals, then
+        # the locals of the top-level code and of the function being analyzed.
+        self.frames: List[List[Optional[Symbol]]] = [[], []]
 
     def begin_scope(self) -> None:
         self.scopes.append({})
@@ -30,18 +37,35 @@ class SymbolTable:
         if len(self.scopes) > 1:
             self.scopes.pop()
 
-    def define(self, symbol: Symbol) -> bool:
+    def begin_frame(self) -> None:
+        self.frames.append([])
+
+    def end_frame(self) -> None:
+        if len(self.frames) > 2:
+            self.frames.pop()
+
+    def define(self, symbol: Symbol, binding: Optional[Binding] = None) -> bool:
         scope = self.scopes[-1]
         if symbol.name in scope:
             return False
         scope[symbol.name] = symbol
+        if binding is not None:
+            frame = self.frames[0] if binding.depth == 0 else self.frames[-1]
+            if len(frame) <= binding.slot:
+                frame.extend([None] * (binding.slot + 1 - len(frame)))
+            frame[binding.slot] = symbol
         return True
 
+    def at(self, binding: Binding) -> Optional[Symbol]:
+        """The symbol defined with ``binding``, without a lookup by name"""
+        frame = self.frames[0] if binding.depth == 0 else self.frames[-1]
+        return frame[binding.slot] if binding.slot < len(frame) else None
+
     def lookup(self, name: str) -> Optional[Symbol]:
         for scope in reversed(self.scopes):
             if name in scope:
                 return scope[name]
-        return None
+        return self.outer.get(name) if self.outer is not None else None
 
     def lookup_in_current(self, name: str) -> Optional[Symbol]:
         scope = self.scopes[-1]
@@ -0,0 +1,128 @@
+from dataclasses import dataclass
+from typing import Optional
+from lib.parser.ast import types
+
+# Ids of the built-in types, the first ones every universe creates.
+VOID, INT, FLOAT, STR, BOOL = range(5)
+BUILTIN_NAMES = ("void", "int", "float", "str", "bool")
+
+LOGICAL_OPS = ("&&", "||")
+COMPARISON_OPS = ("==", "!=", "<", "<=", ">", ">=")
+ARITHMETIC_OPS = ("+", "-", "*", "/", "%", "**")
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Type:
+    """A type of the analyzed program. A universe holds one object per
+    distinct type, so types compare by identity and ``id`` is dense."""
+
+    id: int
+    # The type's name; "list" for list types.
+    name: str
+    element: Optional["Type"] = None
+
+    @property
+    def is_list(self) -> bool:
+        return self.element is not None
+
+    def __str__(self) -> str:
+        depth = 0
+        t = self
+        while t.element is not None:
+            t, depth = t.element, depth + 1
+        return "list[" * depth + t.name + "]" * depth
+
+
+class TypeUniverse:
+    """The interned types of one analysis: built-ins, named (struct) types and
+    list types, plus the relations between them as lookup tables"""
+
+    def __init__(self) -> None:
+        self.types: list[Type] = []
+        self._named: dict[str, Type] = {}
+        # Element type id -> list type.
+        self._lists: dict[int, Type] = {}
+        # (op, left id, right id) -> result type, None if the operands don't fit.
+        self._binary: dict[tuple[str, int, int], Optional[Type]] = {}
+        # (target id, value id) -> whether a value can be stored in a target.
+        self._assignable: dict[tuple[int, int], bool] = {}
+        self.void, self.int, self.float, self.str, self.bool = map(self.named, BUILTIN_NAMES)
+        builtins = self.types[:]
+        for op in LOGICAL_OPS + COMPARISON_OPS + ARITHMETIC_OPS:
+            for left in builtins:
+                for right in builtins:
+                    self._binary[op, left.id, right.id] = self._binary_rule(op, left, right)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def named(self, name: str) -> Type:
+        t = self._named.get(name)
+        if t is None:
+            t = self._named[name] = Type(len(self.types), name)
+            self.types.append(t)
+        return t
+
+    def list_of(self, element: Type) -> Type:
+        t = self._lists.get(element.id)
+        if t is None:
+            t = self._lists[element.id] = Type(len(self.types), "list", element)
+            self.types.append(t)
+        return t
+
+    def of(self, spec: types.TypeSpecifier) -> Type:
+        """The type a type annotation of the AST denotes"""
+        depth = 0
+        while isinstance(spec, types.ListType):
+            spec = spec.element_type
+            depth += 1
+        t = self.named(spec.name)  # type: ignore[attr-defined]
+        for _ in range(depth):
+            t = self.list_of(t)
+        return t
+
+    def binary_result(self, op: str, left: Type, right: Type) -> Optional[Type]:
+        key = (op, left.id, right.id)
+        try:
+            return self._binary[key]
+        except KeyError:
+            # Struct and list operands, met after the table was built.
+            result = self._binary[key] = self._binary_rule(op, left, right)
+            return result
+
+    def is_assignable(self, target: Type, value: Type) -> bool:
+        key = (target.id, value.id)
+        try:
+            return self._assignable[key]
+        except KeyError:
+            result = self._assignable[key] = self._assignable_rule(target, value)
+            return result
+
+    def is_number(self, t: Optional[Type]) -> bool:
+        return t is not None and (t.id == INT or t.id == FLOAT)
+
+    def _binary_rule(self, op: str, left: Type, right: Type) -> Optional[Type]:
+        if op in LOGICAL_OPS:
+            return self.bool if left.id == right.id == BOOL else None
+        if op in COMPARISON_OPS:
+            if (self.is_number(left) and self.is_number(right)) or left.id == right.id == STR or left.id == right.id == BOOL:
+                return self.bool
+            return None
+        if op in ARITHMETIC_OPS:
+            if op == "+" and (left.id == STR or right.id == STR):
+                return self.str
+            if self.is_number(left) and self.is_number(right):
+                return self.float if FLOAT in (left.id, right.id) else self.int
+            return None
+        return None
+
+    def _assignable_rule(self, target: Type, value: Type) -> bool:
+        # Lists are assignable when their elements are, all the way down;
+        # a type is assignable to itself without walking its elements.
+        while target is not value and target.element is not None and value.element is not None:
+            target, value = target.element, value.element
+        if target is value:
+            return True
+        if target.element is not None or value.element is not None:
+            return False
+        return target.id == FLOAT and value.id == INT
@@ -0,0 +1,52 @@
+from types import GeneratorType
+from typing import Any, Generator, Optional, TypeVar
+
+T = TypeVar("T")
+
+# A rule written as a generator: it yields the Step of every sub-rule it needs
+# and receives that sub-rule's result back from the yield. Yielding anything
+# that is not a generator hands it straight back, which lets a sub-rule
+# answer simple cases without a Step of its own.
+Step = Generator[Any, Any, T]
+
+
+def trampoline(step: Step[T]) -> T:
+    """Run ``step`` to completion on an explicit stack instead of Python's call
+    stack, so nesting depth is bounded only by memory.
+
+    Exceptions travel through the suspended steps exactly as they would
+    through nested calls. Like a yield, anything that is not a generator is
+    handed straight back.
+    """
+    if type(step) is not GeneratorType:
+        return step  # type: ignore[return-value]
+    stack: list[Step[Any]] = [step]
+    send = step.send
+    value: Any = None
+    error: Optional[BaseException] = None
+    while True:
+        try:
+            if error is None:
+                child = send(value)
+            else:
+                child, error = stack[-1].throw(error), None
+        except StopIteration as done:
+            stack.pop()
+            if not stack:
+                return done.value
+            send = stack[-1].send
+            value = done.value
+            continue
+        except BaseException as exc:
+            stack.pop()
+            if not stack:
+                raise
+            send = stack[-1].send
+            error = exc
+            continue
+        if type(child) is GeneratorType:
+            stack.append(child)
+            send = child.send
+            value = None
+        else:
+            value = child
@@ -0,0 +1,2 @@
+# Reported by --version; cached compiler output is only reused by the same version.
+VERSION = "1.0.0"
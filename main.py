@@ -5,13 +5,20 @@ import pyfiglet
 import subprocess
 import tempfile
 from pprint import pprint
+from typing import Iterator, Optional
 from lib.utils.args_validators import clash_file
-from lib.lexer.lexer import Lexer
+from lib.lexer.lexer import ENGINES, Lexer
+from lib.lexer.buffer_lexer import BufferLexer, map_source
+from lib.lexer.token import Token
+from lib.lexer.token_stream import TokenStream
 from lib.parser.parser import Parser
+from lib.parser.ast import program
+from lib.parser.ast_cache import DEFAULT_DIRECTORY, DEFAULT_MAX_BYTES, ASTCache
 from lib.semantic.semantic_analyzer import SemanticAnalyzer
 from lib.codegen.codegen import CodeGenerator
 from lib.codegen.llvm_codegen import LLVMCodeGenerator
 from lib.utils.error_handler import LexerError, ParserError, CodegenError
+from lib.utils.version import VERSION
 
 def main() -> None:
     if len(sys.argv) == 1:
@@ -21,7 +28,7 @@ def main() -> None:
     args_parser.add_argument(
         '-v', '--version',
         action='version',
-        version='Clash 1.0.0',
+        version=f'Clash {VERSION}',
         help="show program's version number and exit"
     )
     args_parser.add_argument(
@@ -39,11 +46,54 @@ def main() -> None:
         action='store_true',
         help="run only the parser and print the AST to the console"
     )
+    args_parser.add_argument(
+        '--check-syntax',
+        action='store_true',
+        help="only check that the file is syntactically valid, without building the AST"
+    )
     args_parser.add_argument(
         '-s', '--semantic',
         action='store_true',
         help="run only the semantic analyzer and print any errors to the console"
     )
+    args_parser.add_argument(
+        '--lexer-engine',
+        choices=ENGINES,
+        default="dfa",
+        help="lexer backend: generated DFA scanner (default), table-driven DFA or master regex"
+    )
+    args_parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help="lex and parse large files (and, with -s, check their functions) in this many worker processes (0 = one per CPU)"
+    )
+    args_parser.add_argument(
+        '--mmap',
+        action='store_true',
+        help="lex the file in place through a memory map instead of reading it into a string"
+    )
+    args_parser.add_argument(
+        '--cache',
+        action='store_true',
+        help="reuse the AST of an unchanged file from the on-disk cache, skipping lexing and parsing"
+    )
+    args_parser.add_argument(
+        '--cache-dir',
+        default=DEFAULT_DIRECTORY,
+        help=f"directory of the AST cache (default {DEFAULT_DIRECTORY})"
+    )
+    args_parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=DEFAULT_MAX_BYTES // 2**20,
+        help="size of the AST cache in MiB; the entries used longest ago are evicted"
+    )
+    args_parser.add_argument(
+        '--cache-stats',
+        action='store_true',
+        help="print the hit/miss statistics of the AST cache"
+    )
     # args_parser.add_argument(
     #     '-c', '--compiler',
     #     action='store_true',
@@ -51,28 +101,61 @@ def main() -> None:
     # )
 
     args = args_parser.parse_args()
-    with open(args.filename, "r", encoding="utf-8") as f:
-        code = f.read()
     
      # Lexer
     try:
-        lexer: Lexer = Lexer(code)
-        tokens = list(lexer.tokenize())
+        lexer: Lexer | BufferLexer
+        if args.mmap:
+            lexer = BufferLexer(map_source(args.filename))
+        else:
+            with open(args.filename, "r", encoding="utf-8") as f:
+                code = f.read()
+            lexer = Lexer(code, engine=args.lexer_engine)
+        source = lexer.buffer if isinstance(lexer, BufferLexer) else code
+        cache: Optional[ASTCache] = None
+        if (args.cache or args.cache_stats) and not (args.lexer or args.check_syntax):
+            cache = ASTCache(args.cache_dir, args.cache_size * 2**20)
+        ast: Optional[program.Program] = None
+        if cache is not None and args.cache:
+            ast = cache.load(source, lexer.source_map)
+        tokens: TokenStream | Iterator[Token]
+        if isinstance(lexer, Lexer) and args.jobs != 1 and ast is None:
+            tokens = lexer.tokenize_parallel(args.jobs or None)
+        elif args.lexer or args.check_syntax:
+            tokens = lexer.tokenize_stream()
+        else:
+            # Lexed lazily, as the parser reads it (so not at all on a cache hit).
+            tokens = lexer.tokenize()
     except LexerError as e:
         print(e, file=sys.stderr)
         sys.exit(1)
 
     if args.lexer:
-        pprint(tokens)
+        pprint(list(tokens))
+        return
+
+    if args.check_syntax:
+        try:
+            Parser(tokens).recognize()
+        except ParserError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        print("No syntax errors found.")
         return
 
     # Parser
-    try:
-        parser: Parser = Parser(tokens)
-        ast = parser.parse()
-    except ParserError as e:
-        print(e, file=sys.stderr)
-        sys.exit(1)
+    if ast is None:
+        try:
+            parser: Parser = Parser(tokens)
+            ast = parser.parse_parallel(args.jobs or None) if args.jobs != 1 else parser.parse()
+        except (LexerError, ParserError) as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        if cache is not None and args.cache:
+            cache.store(source, ast)
+
+    if cache is not None and args.cache_stats:
+        print(cache.stats(), file=sys.stderr)
 
     if args.parser:
         pprint(ast)
@@ -80,7 +163,11 @@ def main() -> None:
     
     # Semantic
     semantic_analyzer = SemanticAnalyzer()
-    semantic_errors = semantic_analyzer.analyze(ast)
+    if args.semantic and args.jobs != 1:
+        # Only the errors are needed: function bodies are checked in workers.
+        semantic_errors = semantic_analyzer.analyze_parallel(ast, args.jobs or None)
+    else:
+        semantic_errors, annotations = semantic_analyzer.annotate(ast)
 
     if semantic_errors:
         for err in semantic_errors:
@@ -93,7 +180,7 @@ def main() -> None:
     
     gen = CodeGenerator()
     try:
-        gen.run(ast)
+        gen.run(ast, annotations, semantic_analyzer.resolution)
     except CodegenError as e:
         print(e, file=sys.stderr)
         sys.exit(1)
@@ -101,7 +188,7 @@ def main() -> None:
     if False:  # args.compiler:
         llvm_gen = LLVMCodeGenerator()
         try:
-            src = llvm_gen.generate(ast)
+            src = llvm_gen.generate(ast, annotations, semantic_analyzer.resolution)
         except CodegenError as e:
             print(e, file=sys.stderr)
             sys.exit(1)
@@ -120,4 +120,117 @@ def test_assign_to_length_raises_codegen_error():
     ast = Parser(tokens).parse()
     cg = CodeGenerator()
     with pytest.raises(CodegenError):
-        cg.generate(ast)
\ No newline at end of file
+        cg.generate(ast)
+
+def test_deeply_nested_expressions_are_generated():
+    depth = 5000
+    code = generate("var v: int = " + " ** ".join(["2"] * depth) + ";")
+    assert code.endswith("v = " + "(2 ** " * (depth - 1) + "2" + ")" * (depth - 1))
+
+
+def test_unknown_nodes_raise_codegen_errors():
+    from lib.parser.ast import program, statements, expressions
+
+    class Odd(statements.Statement):
+        pass
+
+    class OddExpr(expressions.Expression):
+        pass
+
+    with pytest.raises(CodegenError, match="Unknown statement"):
+        CodeGenerator().generate(program.Program(declarations=[statements.BlockStmt(statements=[Odd()])]))
+    with pytest.raises(CodegenError, match="Unknown top-level node"):
+        CodeGenerator().generate(program.Program(declarations=[OddExpr()]))
+    with pytest.raises(CodegenError, match="Unknown expression"):
+        CodeGenerator().generate(program.Program(declarations=[statements.ExpressionStmt(expression=OddExpr())]))
+
+
+def test_annotations_specialize_additions():
+    from lib.semantic.semantic_analyzer import SemanticAnalyzer
+
+    src = """
+    var n: int = 1 + 2;
+    var x: float = n + 0.5;
+    var s: str = "a" + "b";
+    var t: str = s + n;
+    var xs: list[int] = [1];
+    n += 4;
+    s += "c";
+    xs[0] += n;
+    """
+    ast = Parser(list(Lexer(src).tokenize())).parse()
+    errors, annotations = SemanticAnalyzer().annotate(ast)
+    assert errors == []
+    py = CodeGenerator().generate(ast, annotations)
+    assert "def _op_add(a, b):" in py and py.count("_op_add(") == 1
+    assert "n = (1 + 2)" in py and "t = (str(s) + str(n))" in py and "n += 4" in py
+    env = CodeGenerator().run(ast, annotations)
+    assert (env["n"], env["x"], env["s"], env["t"], env["xs"]) == (7, 3.5, "abc", "ab3", [8])
+    dynamic = compile_and_run(src)
+    assert [env[k] for k in ("n", "x", "s", "t", "xs")] == [dynamic[k] for k in ("n", "x", "s", "t", "xs")]
+
+    # Arena views are new objects on every access; their annotations are found by arena and index.
+    views = Parser(Lexer(src).tokenize_stream()).parse_arena().program()
+    errors, annotations = SemanticAnalyzer().annotate(views)
+    assert errors == [] and CodeGenerator().generate(views, annotations) == py
+
+
+def test_resolution_gives_shadowed_locals_their_own_slots():
+    from lib.semantic.semantic_analyzer import SemanticAnalyzer
+    from lib.codegen.llvm_codegen import LLVMCodeGenerator
+
+    src = """
+    var y: int = 1 + 1;
+    func f(x: int): int {
+        var y: int = x;
+        if (true) { var y: int = 10; y += 1; }
+        return y + 0;
+    }
+    if (true) { var y: int = 7; }
+    var r: int = f(5);
+    """
+    ast = Parser(list(Lexer(src).tokenize())).parse()
+    analyzer = SemanticAnalyzer()
+    errors, annotations = analyzer.annotate(ast)
+    assert errors == []
+    env = CodeGenerator().run(ast, annotations, analyzer.resolution)
+    assert (env["r"], env["y"]) == (5, 2)
+    assert "y_2 = 10" in CodeGenerator().generate(ast, annotations, analyzer.resolution)
+    ir = LLVMCodeGenerator().generate(ast, annotations, analyzer.resolution)
+    main = ir[ir.index('define i32 @"main"'):]
+    assert main.startswith('define i32 @"main"()\n{\nentry:\n  %".2" = add i32 1, 1\n  store i32 %".2", i32* @"y"')
+    assert main.count("alloca") == 1
+
+
+@pytest.mark.parametrize("src, expected", [
+    ("var y_1: int = 5; func f(): int { var y: int = 1; { var y: int = 2; } return y_1; } print(f());", "5"),
+    ("func x_1(): int { return 7; } func f(): int { var x: int = 1; { var x: int = 2; } return x_1(); } print(f());", "7"),
+])
+def test_renamed_locals_do_not_capture_globals(src: str, expected: str, capsys):
+    from lib.semantic.semantic_analyzer import SemanticAnalyzer
+
+    ast = Parser(list(Lexer(src).tokenize())).parse()
+    analyzer = SemanticAnalyzer()
+    errors, annotations = analyzer.annotate(ast)
+    assert errors == []
+    CodeGenerator().run(ast, annotations, analyzer.resolution)
+    assert capsys.readouterr().out.strip() == expected
+
+
+@pytest.mark.parametrize("src", [
+    "func f(): int { var x: int = 2 ** 3 + 1; return x; }",
+    "func f(): bool { return 2 ** 2 < 5; }",
+    "func f(): float { return -(2 ** 3) * 1.5; }",
+])
+def test_llvm_annotations_defer_to_the_ir_types_of_powers(src: str):
+    from llvmlite import binding as llvm
+    from lib.semantic.semantic_analyzer import SemanticAnalyzer
+    from lib.codegen.llvm_codegen import LLVMCodeGenerator
+
+    # '**' is a double in the IR even where the analysis says int.
+    ast = Parser(list(Lexer(src).tokenize())).parse()
+    errors, annotations = SemanticAnalyzer().annotate(ast)
+    assert errors == []
+    ir = LLVMCodeGenerator().generate(ast, annotations)
+    assert ir == LLVMCodeGenerator().generate(ast)
+    llvm.parse_assembly(ir).verify()
@@ -121,3 +121,363 @@ def test_token_positions_line_and_column() -> None:
         (TokenType.EOF, 2, 10),
     ]
     assert got == expected
+
+
+def test_pregenerated_dfa_tables_are_up_to_date() -> None:
+    from lib.lexer import dfa_tables
+    from lib.lexer.dfa_compiler import tables_fingerprint
+
+    assert dfa_tables.FINGERPRINT == tables_fingerprint()
+
+
+def test_loaded_dfa_matches_fresh_subset_construction() -> None:
+    from lib.lexer.dfa_compiler import compile_dfa, load_dfa
+
+    loaded = load_dfa()
+    fresh = compile_dfa()
+    assert loaded.initial_state == fresh.initial_state
+    assert loaded.char_classes == fresh.char_classes
+    assert loaded.accepting == fresh.accepting
+    assert loaded.rows == fresh.rows
+
+
+def test_dense_table_accepts_same_prefixes_as_automata_dfa() -> None:
+    from lib.lexer.dfa_compiler import load_dfa
+    from lib.lexer.nfa_to_dfa import build_dfa
+
+    reference = build_dfa()
+    compiled = load_dfa()
+    samples = ["", "if", "iffy", "x1_", "12", "12.", "12.5", "/", "//", "// c\n  ", "&", "&&",
+               "**=", '"', '"abc"', '"a', "\t\r\n", "#", ".", "!=", "_"]
+    for text in samples:
+        state = reference.initial_state
+        ok = True
+        for c in text:
+            if c not in reference.transitions.get(state, {}):
+                ok = False
+                break
+            state = reference.transitions[state][c]
+        expected = ok and state in reference.final_states
+
+        table_state = compiled.initial_state
+        for k in compiled.classify(text):
+            table_state = compiled.transitions[table_state + k]
+        assert bool(compiled.accepting[table_state]) == expected, text
+
+
+def test_lexer_import_does_not_load_automata() -> None:
+    import subprocess
+    import sys
+
+    probe = "import sys, lib.lexer.lexer; print('automata' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_state_tags_agree_with_lexeme_classification() -> None:
+    import random
+    from pathlib import Path
+    from lib.lexer.dfa_compiler import classify_lexeme
+    from lib.utils.error_handler import LexerError
+
+    examples = Path(__file__).resolve().parent.parent / "examples"
+    sources = [p.read_text(encoding="utf-8") for p in examples.rglob("*.clash")]
+    rng = random.Random(1234)
+    alphabet = 'abfilnrstuvx_019 .;:=!<>+-*/%&|"(){}[],\n'
+    sources += ["".join(rng.choice(alphabet) for _ in range(80)) for _ in range(300)]
+
+    checked = 0
+    for src in sources:
+        try:
+            for tok in Lexer(src).tokenize():
+                if tok.type != TokenType.EOF:
+                    assert tok.type == classify_lexeme(tok.value), tok
+                    checked += 1
+        except LexerError:
+            pass
+    assert checked > 1000
+
+
+def test_trivia_is_skipped_by_get_next_token() -> None:
+    lexer = Lexer("  // a comment\n\t x // trailing")
+    tok = lexer.get_next_token()
+    assert (tok.type, tok.value, tok.line, tok.column) == (TokenType.IDENTIFIER, "x", 2, 3)
+    assert lexer.get_next_token().type == TokenType.EOF
+
+
+def _token_stream(src: str, engine: str) -> list[tuple[TokenType, str, int, int]] | str:
+    from lib.utils.error_handler import LexerError
+
+    try:
+        return [(t.type, t.value, t.line, t.column) for t in Lexer(src, engine=engine).tokenize()]
+    except LexerError as e:
+        return str(e)
+
+
+def _differential_sources() -> list[str]:
+    import random
+    from pathlib import Path
+
+    examples = Path(__file__).resolve().parent.parent / "examples"
+    sources = [p.read_text(encoding="utf-8") for p in sorted(examples.rglob("*.clash"))]
+    rng = random.Random(4321)
+    alphabet = 'aefilnoprstuvx_0159 .;:=!<>+-*/%&|"(){}[],\n\t#@$\''
+    words = ["if", "elif", "else", "var", "func", "int", "integer", "continue", "contador",
+             "1.5", "3.", "//c", "==", "**", '"str"', "&&", "||", " ", "\n"]
+    for _ in range(400):
+        if rng.random() < 0.5:
+            sources.append("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 120))))
+        else:
+            sources.append(" ".join(rng.choice(words) for _ in range(rng.randint(0, 40))))
+    return sources
+
+
+def test_generated_scanner_matches_table_scanner() -> None:
+    from lib.lexer.scanner_codegen import load_scanner
+
+    assert load_scanner() is not None
+    for src in _differential_sources():
+        assert _token_stream(src, "dfa") == _token_stream(src, "table"), src
+
+
+def test_generated_scanner_is_up_to_date() -> None:
+    from lib.lexer import dfa_scanner
+    from lib.lexer.dfa_compiler import tables_fingerprint
+
+    assert dfa_scanner.FINGERPRINT == tables_fingerprint()
+
+
+@pytest.mark.parametrize("engine", ["re"])
+def test_alternative_engine_conforms_to_dfa_engine(engine: str) -> None:
+    for src in _differential_sources():
+        assert _token_stream(src, engine) == _token_stream(src, "dfa"), src
+
+
+@pytest.mark.parametrize("src", [
+    '"unterminated',
+    "a & b",
+    "x = 1 # 2",
+    "12.x",
+    "1..2",
+    "ifx if_ if",
+    "a//b\n  c",
+    "/=//=",
+    '"tab\tinside"',
+    "var s: str = \"ol\u00e1\";",
+])
+def test_regex_engine_edge_cases(src: str) -> None:
+    assert _token_stream(src, "re") == _token_stream(src, "table")
+
+
+def test_unknown_lexer_engine_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        Lexer("x", engine="nope")
+
+
+def _buffer_token_stream(data: bytes) -> list[tuple[TokenType, str, int, int]] | str:
+    from lib.lexer.buffer_lexer import BufferLexer
+    from lib.utils.error_handler import LexerError
+
+    try:
+        return [(t.type, t.value, t.line, t.column) for t in BufferLexer(data).tokenize()]
+    except LexerError as e:
+        return str(e)
+
+
+def test_buffer_lexer_conforms_to_str_lexer() -> None:
+    extra = [
+        'var s: str = "olá mundo";\nprint(s);',
+        'x = 1; y = "中文" ; z',
+        '"café" é 1',
+        "// comentário\nvar a = 2;",
+    ]
+    for src in _differential_sources() + extra:
+        assert _buffer_token_stream(src.encode("utf-8")) == _token_stream(src, "dfa"), src
+
+
+def test_buffer_lexer_over_mmap_slices_lexemes_lazily(tmp_path) -> None:
+    from lib.lexer.buffer_lexer import BufferLexer, SpanToken, map_source
+
+    path = tmp_path / "prog.clash"
+    path.write_bytes('var s: str = "olá";\n'.encode("utf-8"))
+    buffer = map_source(str(path))
+    tokens = list(BufferLexer(buffer).tokenize())
+
+    string = tokens[5]
+    assert isinstance(string, SpanToken)
+    assert (string.start, string.end) == (13, 19)
+    assert bytes(buffer[string.start:string.end]) == '"olá"'.encode("utf-8")
+    assert string.value == '"ol "'
+    assert (tokens[6].type, tokens[6].column) == (TokenType.SEMICOLON, 19)
+
+    empty = tmp_path / "empty.clash"
+    empty.write_bytes(b"")
+    assert [t.type for t in BufferLexer(map_source(str(empty))).tokenize()] == [TokenType.EOF]
+
+
+def test_token_stream_matches_tokenize() -> None:
+    from lib.lexer.buffer_lexer import BufferLexer
+
+    for src in _differential_sources()[:60] + ['var s: str = "olá";']:
+        try:
+            expected = [(t.type, t.value, t.line, t.column) for t in Lexer(src).tokenize()]
+        except Exception:
+            continue
+        for lexer in (Lexer(src), BufferLexer(src.encode("utf-8"))):
+            stream = lexer.tokenize_stream()
+            assert len(stream) == len(expected)
+            assert [(t.type, t.value, t.line, t.column) for t in stream] == expected, src
+
+
+def test_token_stream_kinds_compare_as_token_types() -> None:
+    stream = Lexer("x = 1;").tokenize_stream()
+    assert stream.kinds[0] == TokenType.IDENTIFIER
+    assert stream.kind(3) is TokenType.SEMICOLON
+    assert stream[-1].type is TokenType.EOF
+    assert repr(stream[1]) == "Token(type=TokenType.EQUALS, token='=', line=1, col=3)"
+
+
+def test_identifiers_are_interned_and_numbers_pre_converted() -> None:
+    from lib.lexer.buffer_lexer import BufferLexer
+
+    src = "var total = total + 42 * 2.5;"
+    for tokens in (list(Lexer(src).tokenize()), list(Lexer(src).tokenize_stream()),
+                   list(BufferLexer(src.encode()).tokenize_stream())):
+        first, second = tokens[1], tokens[3]
+        assert first.value == second.value == "total" and first.value is second.value
+        assert (tokens[5].literal, tokens[7].literal) == (42, 2.5)
+        assert type(tokens[5].literal) is int and type(tokens[7].literal) is float
+        assert tokens[1].literal is None and tokens[0].value is tokens[0].value
+
+
+def test_source_map_resolves_offsets() -> None:
+    from lib.lexer.source_map import SourceMap
+
+    text = "ab\n\ncd ef\n"
+    source_map = SourceMap(text)
+    assert list(source_map.newlines) == [2, 3, 9]
+    assert [source_map.line_column(i) for i in (0, 2, 3, 4, 7, 10)] == [(1, 1), (1, 3), (2, 1), (3, 1), (3, 4), (4, 1)]
+    assert source_map.line_count == 4
+
+    utf8 = SourceMap('"olá" x\n"é" y'.encode("utf-8"))
+    assert utf8.line_column(7) == (1, 7)
+    assert utf8.line_column(14) == (2, 5)
+
+
+def test_tokens_resolve_positions_lazily() -> None:
+    tok = Lexer("\n\n   foo").get_next_token()
+    assert (tok.offset, tok._line) == (5, 0)
+    assert (tok.line, tok.column) == (3, 4)
+
+
+def test_lexer_error_position_comes_from_source_map() -> None:
+    from lib.utils.error_handler import LexerError
+
+    for lexer in (Lexer("x = 1;\n  y # 2"), _buffer_lexer("x = 1;\n  y # 2")):
+        with pytest.raises(LexerError, match="line 2, column 5"):
+            lexer.tokenize_stream()
+
+
+def _buffer_lexer(src: str):
+    from lib.lexer.buffer_lexer import BufferLexer
+
+    return BufferLexer(src.encode("utf-8"))
+
+
+def _assert_relex_matches_full(src: str, offset: int, removed: int, inserted: str) -> None:
+    from lib.lexer.incremental import relex
+
+    stream = Lexer(src).tokenize_stream()
+    # Edit offsets are positions in the normalized text the lexer scanned.
+    src = stream.source
+    edited = src[:offset] + inserted + src[offset + removed:]
+    full = Lexer(edited).tokenize_stream()
+    incremental = relex(stream, offset, removed, inserted)
+    assert incremental.source == edited
+    assert (incremental.kinds, incremental.starts, incremental.lengths) == (full.kinds, full.starts, full.lengths)
+    assert [t.value for t in incremental] == [t.value for t in full]
+    assert incremental.source_map.newlines == full.source_map.newlines
+
+
+@pytest.mark.parametrize("src, offset, removed, inserted", [
+    ('var s: str = "ab";\nx = 1;', 15, 0, "c"),          # inside a string literal
+    ('var s: str = "ab";\nx = 1;', 14, 0, '"'),          # closes the literal early
+    ('x = "a";\ny = "b";', 5, 0, "\n"),                  # newline ends the literal: error
+    ("x = 1; // note\ny = 2;", 10, 1, ""),               # inside a comment
+    ("x = 1; / note\ny = 2;", 7, 0, "/"),                # turns the rest of the line into a comment
+    ("x = 1; // note\ny = 2;", 7, 2, ""),                # uncomments it
+    ("abc = 1;", 3, 0, "d"),                             # extends the identifier before the edit
+    ("x = 1.5;", 5, 1, ""),                              # "1." waits for a digit
+    ("x = 1;", 6, 0, " y;"),                             # at the end of the source
+    ("x = 1;", 0, 6, ""),                                # everything removed
+    ("", 0, 0, "var x: int;"),
+])
+def test_incremental_relex_matches_full_relex(src: str, offset: int, removed: int, inserted: str) -> None:
+    from lib.utils.error_handler import LexerError
+
+    try:
+        _assert_relex_matches_full(src, offset, removed, inserted)
+    except LexerError as e:
+        with pytest.raises(LexerError) as full:
+            Lexer(src[:offset] + inserted + src[offset + removed:]).tokenize_stream()
+        assert str(full.value) == str(e)
+
+
+def test_incremental_relex_random_edits() -> None:
+    import random
+    from lib.utils.error_handler import LexerError
+
+    rng = random.Random(99)
+    for src in _differential_sources()[:40]:
+        try:
+            src = Lexer(src).tokenize_stream().source
+        except LexerError:
+            continue
+        for _ in range(10):
+            offset = rng.randint(0, len(src))
+            removed = rng.randint(0, min(3, len(src) - offset))
+            inserted = "".join(rng.choice('ab1. "/\n=;') for _ in range(rng.randint(0, 3)))
+            try:
+                Lexer(src[:offset] + inserted + src[offset + removed:]).tokenize_stream()
+            except LexerError:
+                continue
+            _assert_relex_matches_full(src, offset, removed, inserted)
+
+
+def test_parallel_lexing_matches_sequential(monkeypatch) -> None:
+    from benchmarks.synthetic import synthetic_program
+    from lib.lexer import parallel
+
+    monkeypatch.setattr(parallel, "MIN_CHUNK_CHARS", 500)
+    src = synthetic_program(20) + 'var s: str = "fim // não é comentário";\n// fim "\n'
+    sequential = Lexer(src).tokenize_stream()
+    stream = Lexer(src).tokenize_parallel(workers=2)
+    assert (stream.kinds, stream.starts, stream.lengths) == (sequential.kinds, sequential.starts, sequential.lengths)
+    assert stream.values == sequential.values and stream.pool.lexemes == sequential.pool.lexemes
+    assert list(stream) and [repr(t) for t in stream] == [repr(t) for t in sequential]
+
+
+def test_parallel_lexing_reports_first_error(monkeypatch) -> None:
+    from benchmarks.synthetic import synthetic_program
+    from lib.lexer import parallel
+    from lib.utils.error_handler import LexerError
+
+    monkeypatch.setattr(parallel, "MIN_CHUNK_CHARS", 500)
+    body = synthetic_program(20)
+    src = body[:3000] + "#" + body[3000:6000] + "$" + body[6000:]
+    with pytest.raises(LexerError) as sequential:
+        Lexer(src).tokenize_stream()
+    with pytest.raises(LexerError) as chunked:
+        Lexer(src).tokenize_parallel(workers=2)
+    assert str(chunked.value) == str(sequential.value)
+
+
+def test_split_points_fall_on_newlines() -> None:
+    from lib.lexer.parallel import newlines_are_boundaries, split_points
+    from lib.lexer.dfa_compiler import load_dfa
+
+    assert newlines_are_boundaries(load_dfa())
+    code = "a\nbb\nccc\ndddd\n"
+    bounds = split_points(code, 3)
+    assert bounds[0] == 0 and bounds[-1] == len(code)
+    assert all(code[b] == "\n" for b in bounds[1:-1])
@@ -1,8 +1,9 @@
 import pytest
 
 from lib.lexer.lexer import Lexer
+from lib.lexer.token import Token, TokenType
 from lib.parser.parser import Parser
-from lib.utils.error_handler import ParserError
+from lib.utils.error_handler import LexerError, ParserError
 from lib.parser.ast import program, declarations, statements, expressions, types
 
 
@@ -209,4 +210,379 @@ def test_parse_error_if_missing_paren():
 
 def test_parse_error_param_missing_colon():
     with pytest.raises(ParserError):
-        parse_program("func f(a int): int { return 0; }")
\ No newline at end of file
+        parse_program("func f(a int): int { return 0; }")
+
+def test_parser_accepts_compact_token_stream():
+    src = "struct P { x: int }; func f(p: P): int { if (p.x > 1) { return p.x ** 2; } return -1; }"
+    from_list = parse_program(src)
+    from_stream = Parser(Lexer(src).tokenize_stream()).parse()
+    assert from_stream == from_list
+
+
+def test_parser_error_from_compact_token_stream():
+    with pytest.raises(ParserError) as from_list:
+        parse_program("var x int;")
+    with pytest.raises(ParserError) as from_stream:
+        Parser(Lexer("var x int;").tokenize_stream()).parse()
+    assert str(from_stream.value) == str(from_list.value)
+
+
+def test_node_positions_are_resolved_from_offsets():
+    src = "func f(): int {\n    return 1 +\n        2;\n}"
+    prog = Parser(Lexer(src).tokenize_stream()).parse()
+    ret = prog.declarations[0].body.statements[0]
+    assert ret.source_map is not None and ret.offset == 20
+    assert (ret.line, ret.col) == (2, 5)
+    assert (ret.value.right.line, ret.value.right.col) == (3, 9)
+    assert ret.value.position() == {"offset": ret.value.offset, "source_map": ret.source_map}
+
+
+def test_parser_reads_a_token_iterator_lazily():
+    src = "struct P { x: int }; func f(p: P): int { if (p.x > 1) { return p.x ** 2; } return -1; }"
+    assert Parser(Lexer(src).tokenize()).parse() == parse_program(src)
+
+    pulled = []
+
+    def tokens(text):
+        for token in Lexer(text).tokenize():
+            pulled.append(token)
+            yield token
+
+    with pytest.raises(ParserError) as from_iterator:
+        Parser(tokens("var x int;\n" + src * 50)).parse()
+    assert len(pulled) < 10
+    with pytest.raises(ParserError) as from_list:
+        parse_program("var x int;")
+    assert str(from_iterator.value) == str(from_list.value)
+
+
+def test_lexer_error_surfaces_while_parsing_an_iterator():
+    src = "var x: int = 1;\nvar y: int = 2 $ 3;"
+    with pytest.raises(LexerError) as from_iterator:
+        Parser(Lexer(src).tokenize()).parse()
+    with pytest.raises(LexerError) as upfront:
+        Lexer(src).tokenize_stream()
+    assert str(from_iterator.value) == str(upfront.value)
+
+
+def test_token_cursor_keeps_a_bounded_window():
+    from lib.parser.token_cursor import TokenCursor
+
+    cursor = TokenCursor(Lexer("a + b * c").tokenize(), size=2)
+    assert [cursor[i].value for i in range(5)] == ["a", "+", "b", "*", "c"]
+    assert cursor.kinds[5] is TokenType.EOF and cursor[7].type is TokenType.EOF
+    with pytest.raises(IndexError):
+        cursor[3]
+    assert TokenCursor(iter([])).kinds[0] is TokenType.EOF
+    assert Parser(iter([])).parse() == program.Program()
+
+class _PrecedenceChainParser(Parser):
+    """The recursive-descent expression grammar the Pratt parser replaced, one method per level"""
+
+    def parse_binary(self, min_power):
+        # The rest of the grammar only ever asks for a whole expression.
+        return self._assignment()
+
+    def _assignment(self):
+        left = yield self._level(0)
+        if self.match(TokenType.EQUALS, TokenType.PLUS_EQUAL, TokenType.MINUS_EQUAL,
+                      TokenType.MULTIPLY_EQUAL, TokenType.DIVIDE_EQUAL, TokenType.MODULE_EQUAL):
+            op_token = self.previous()
+            value = yield self._assignment()
+            return expressions.AssignExpr(target=left, op=op_token.value, value=value, **self._position(op_token))
+        return left
+
+    _LEVELS = [
+        (TokenType.OR,), (TokenType.AND,), (TokenType.EQUAL_EQUAL, TokenType.NOT_EQUAL),
+        (TokenType.LESS, TokenType.LESS_OR_EQUAL, TokenType.GREATER, TokenType.GREATER_OR_EQUAL),
+        (TokenType.PLUS, TokenType.MINUS), (TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULE),
+    ]
+
+    def _level(self, depth):
+        if depth == len(self._LEVELS):
+            return (yield self._unary())
+        left = yield self._level(depth + 1)
+        while self.match(*self._LEVELS[depth]):
+            op_token = self.previous()
+            right = yield self._level(depth + 1)
+            left = expressions.BinaryOp(left=left, op=op_token.value, right=right, **left.position())
+        return left
+
+    def _unary(self):
+        if self.match(TokenType.NOT, TokenType.MINUS):
+            op_token = self.previous()
+            right = yield self._unary()
+            return expressions.UnaryOp(op=op_token.value, right=right, **self._position(op_token))
+        left = yield self.parse_postfix()
+        if self.match(TokenType.POWER):
+            op_token = self.previous()
+            right = yield self._unary()
+            return expressions.BinaryOp(left=left, op=op_token.value, right=right, **left.position())
+        return left
+
+
+def _random_expression(rng, depth=0):
+    if depth > 3 or rng.random() < 0.3:
+        return rng.choice(["a", "b", "1", "2.5", '"s"', "true", "f(a, 1)", "p.x", "xs[0]", "[1, 2]", "{x: 1}"])
+    roll = rng.random()
+    if roll < 0.15:
+        return rng.choice(["-", "!"]) + _random_expression(rng, depth + 1)
+    if roll < 0.25:
+        return "(" + _random_expression(rng, depth + 1) + ")"
+    op = rng.choice(["=", "+=", "-=", "*=", "/=", "%=", "||", "&&", "==", "!=", "<", "<=", ">", ">=",
+                     "+", "-", "*", "/", "%", "**"])
+    return f"{_random_expression(rng, depth + 1)} {op} {_random_expression(rng, depth + 1)}"
+
+
+def _parse_outcome(parser_class, tokens):
+    try:
+        return parser_class(tokens).parse()
+    except ParserError as error:
+        return str(error)
+
+
+def test_pratt_parser_matches_precedence_chain():
+    import random
+
+    rng = random.Random(12)
+    for _ in range(600):
+        src = _random_expression(rng) + ";"
+        if rng.random() < 0.2:
+            # Occasionally break the expression to compare error reports too.
+            cut = rng.randrange(len(src))
+            src = src[:cut] + rng.choice(["", "*", "(", ")", "= =", ";"]) + src[cut + 1:]
+        try:
+            tokens = Lexer(src).tokenize_stream()
+        except LexerError:
+            continue
+        assert _parse_outcome(Parser, tokens) == _parse_outcome(_PrecedenceChainParser, tokens), src
+
+
+def test_power_and_assignment_are_right_associative():
+    expr = parse_program("a = b += -c ** d ** e;").declarations[0].expression
+    assert isinstance(expr, expressions.AssignExpr) and isinstance(expr.value, expressions.AssignExpr)
+    unary = expr.value.value
+    assert isinstance(unary, expressions.UnaryOp) and unary.right.op == "**"
+    assert isinstance(unary.right.right, expressions.BinaryOp) and unary.right.right.op == "**"
+
+
+def test_deep_nesting_does_not_hit_the_recursion_limit():
+    depth = 5000
+    expr = parse_program("x = " + "-(" * depth + "[1]" + ")" * depth + ";").declarations[0].expression.value
+    for _ in range(depth):
+        assert isinstance(expr, expressions.UnaryOp) and expr.op == "-"
+        expr = expr.right
+    assert isinstance(expr, expressions.LiteralList)
+
+    body = parse_program("func f(): void {" + "if (true) {" * depth + "}" * depth + "}").declarations[0].body
+    for _ in range(depth):
+        (stmt,) = body.statements
+        assert isinstance(stmt, statements.IfStmt)
+        body = stmt.then_branch
+    assert body.statements == []
+
+    with pytest.raises(ParserError):
+        parse_program("var v: int = " + "(" * depth + "1" + ")" * (depth - 1) + ";")
+
+
+def _recognize_outcome(parse, tokens):
+    try:
+        parse(Parser(tokens))
+    except ParserError as error:
+        return str(error)
+    return None
+
+
+def test_recognizer_accepts_and_rejects_like_the_parser():
+    import random
+
+    src = """struct P { x: int, ys: list[list[float]], };
+    func f(a: int, p: P,): list[int] {
+        var q: P = new { x: -a ** 2, ys: [[1.0], []], };
+        if (a > 1 && !p.ys[0][1] == 2.0) { return [len(p.ys), f(a - 1, q)(1,)]; }
+        elif (a) { loop { break; continue; } } else { { } }
+        p.x += (a + 1) * 3;
+        return [];
+    }
+    print("ok", {x: 1, ys: []}.x);
+    """
+    words = src.split(" ")
+    inserts = ["", "(", ")", "[", "]", "{", "}", ";", ",", ":", ".", "=", "-", "!", "elif", "else", "new", "list", "x"]
+    rng = random.Random(15)
+    for _ in range(400):
+        mutated = list(words)
+        for _ in range(rng.randint(0, 2)):
+            mutated[rng.randrange(len(mutated))] = rng.choice(inserts)
+        try:
+            tokens = Lexer(" ".join(mutated)).tokenize_stream()
+        except LexerError:
+            continue
+        expected = _recognize_outcome(Parser.parse, tokens)
+        assert _recognize_outcome(Parser.recognize, tokens) == expected, " ".join(mutated)
+        assert _recognize_outcome(Parser.recognize, Lexer(" ".join(mutated)).tokenize()) == expected
+
+
+def test_recognizer_handles_deep_nesting():
+    depth = 20_000
+    Parser(Lexer("x = " + "-(" * depth + "[1]" + ")" * depth + ";").tokenize_stream()).recognize()
+    Parser(Lexer("func f(): void {" + "if (a) {} elif (b) {" * depth + "}" * depth + "}").tokenize_stream()).recognize()
+    with pytest.raises(ParserError, match="Expected '}' at the end of the block"):
+        Parser(Lexer("loop {" * depth + "}" * (depth - 1)).tokenize_stream()).recognize()
+
+
+def test_parallel_parsing_matches_sequential(monkeypatch):
+    from benchmarks.synthetic import synthetic_program
+    from lib.parser import parallel
+
+    monkeypatch.setattr(parallel, "MIN_CHUNK_TOKENS", 200)
+    src = synthetic_program(10) + "if (a) { b = 1; } elif (c) {} x = {a: 1}.a;\nvar y: int = 2;\n" + synthetic_program(10)
+    stream = Lexer(src).tokenize_stream()
+    assert Parser(stream).parse_parallel(workers=2) == Parser(stream).parse()
+
+
+def test_parallel_parsing_reports_first_error(monkeypatch):
+    from benchmarks.synthetic import synthetic_program
+    from lib.parser import parallel
+
+    monkeypatch.setattr(parallel, "MIN_CHUNK_TOKENS", 200)
+    lines = synthetic_program(20).split("\n")
+    lines[100] += " var"
+    lines[200] = "}"
+    src = "\n".join(lines)
+    with pytest.raises(ParserError) as sequential:
+        Parser(Lexer(src).tokenize_stream()).parse()
+    with pytest.raises(ParserError) as split:
+        Parser(Lexer(src).tokenize_stream()).parse_parallel(workers=2)
+    assert str(split.value) == str(sequential.value)
+
+
+def test_flattened_declarations_round_trip():
+    from lib.parser.ast.serialize import flatten, unflatten, to_bytes, from_bytes
+
+    src = """struct P { x: int, ys: list[list[float]] };
+    func f(a: int, p: P): bool { if (!a) { return p.ys[0][1] > 2.5; } elif (a) { loop { break; } } else { } return true; }
+    var q: P = new { x: -a ** 2, ys: [[], [1.0]] }; q.x += f(1, q); print("s", len(q.ys));
+    var big: int = 123456789012345678901234567890; var t: str = "x y";
+    """
+    stream = Lexer(src).tokenize_stream()
+    nodes = Parser(stream).parse().declarations
+    for rebuilt in (unflatten(flatten(nodes), stream.source_map), from_bytes(to_bytes(nodes), stream.source_map)):
+        assert rebuilt == nodes
+        assert [(n.line, n.col) for n in rebuilt] == [(n.line, n.col) for n in nodes]
+    with pytest.raises(ValueError):
+        from_bytes(to_bytes(nodes)[:-1])
+
+    positioned = Parser([Token(TokenType.IDENTIFIER, "x", 3, 4), Token(TokenType.SEMICOLON, ";", 3, 5), Token(TokenType.EOF, "", 3, 6)]).parse()
+    assert unflatten(flatten(positioned.declarations)) == positioned.declarations
+
+
+def test_ast_cache_hits_misses_and_stats(tmp_path):
+    from lib.parser.ast_cache import ASTCache
+
+    cache = ASTCache(str(tmp_path))
+    src = "var x: int = 1;\nfunc f(): int { return x + 2; }"
+    lexer = Lexer(src)
+    assert cache.load(src, lexer.source_map) is None
+    prog = Parser(lexer.tokenize_stream()).parse()
+    cache.store(src, prog)
+    cached = cache.load(src, Lexer(src).source_map)
+    assert cached == prog and cached.declarations[1].body.line == 2
+    assert cache.load(src + " ", Lexer(src + " ").source_map) is None
+    assert cache.key(src) != cache.key(src.encode())
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 2, 1)
+    assert not [p for p in tmp_path.iterdir() if p.suffix == ".tmp"]
+
+    # A corrupt entry is a miss, not a crash; the counters hold counts.
+    entry = cache._path(cache.key(src))
+    data = open(entry, "rb").read()
+    for corrupt in (data[:len(data) // 2], data[:8] + bytes(len(data) - 8), b"\xff" * 40):
+        with open(entry, "wb") as f:
+            f.write(corrupt)
+        assert cache.load(src, Lexer(src).source_map) is None
+    assert (tmp_path / "misses").read_bytes() == str(cache.stats().misses).encode()
+
+    # A garbled counter reads as zero instead of a made-up count.
+    (tmp_path / "hits").write_bytes(b"\x00\x00\x00")
+    assert cache.stats().hits == 0
+    cache._count("hits")
+    assert (tmp_path / "hits").read_bytes() == b"1"
+
+
+def test_ast_cache_key_follows_version_tables_and_node_format(monkeypatch, tmp_path):
+    import lib.parser.ast_cache as ast_cache
+
+    cache = ast_cache.ASTCache(str(tmp_path))
+    key = cache.key("var x: int;")
+    for name, value in (("VERSION", "0.0.0-edited"), ("SCHEMA", "Edited()"), ("tables_fingerprint", lambda: "edited")):
+        with monkeypatch.context() as patch:
+            patch.setattr(ast_cache, name, value)
+            assert cache.key("var x: int;") != key
+    assert cache.key("var x: int;") == key
+
+
+def test_ast_cache_evicts_least_recently_used(tmp_path):
+    import os
+    from lib.parser.ast_cache import ASTCache
+
+    sources = [f"var v{i}: int = {i};" * 20 for i in range(4)]
+    cache = ASTCache(str(tmp_path))
+    for age, src in enumerate(sources[:3]):
+        cache.store(src, Parser(Lexer(src).tokenize_stream()).parse())
+        os.utime(cache._path(cache.key(src)), (age, age))
+    entry = os.path.getsize(cache._path(cache.key(sources[0])))
+    cache.max_bytes = 3 * entry
+    assert cache.load(sources[0], Lexer(sources[0]).source_map) is not None  # now the most recent
+    cache.store(sources[3], Parser(Lexer(sources[3]).tokenize_stream()).parse())
+    kept = [src for src in sources if os.path.exists(cache._path(cache.key(src)))]
+    assert kept == [sources[0], sources[2], sources[3]]
+
+
+def test_arena_views_read_like_the_object_ast():
+    from lib.parser.ast.serialize import to_bytes
+    from lib.semantic.semantic_analyzer import SemanticAnalyzer
+    from lib.codegen.codegen import CodeGenerator
+
+    src = """struct P { x: int, ys: list[list[float]] };
+    func f(a: int, p: P): bool { if (!a) { return p.ys[0][1] > 2.5; } elif (a) { loop { break; } } else { } return true; }
+    var q: P = new { x: -2 ** 2, ys: [[], [1.0]] }; q.x += 1; var r: bool = f(1, q);
+    var big: int = 123456789012345678901234567890; var t: str = "x y"; var u: int;
+    """
+    stream = Lexer(src).tokenize_stream()
+    prog = Parser(stream).parse()
+    arena = Parser(stream).parse_arena()
+    views = arena.program()
+    assert len(arena) > 40 and repr(views) == repr(prog)
+    assert views.declarations[5].initializer.value == 123456789012345678901234567890
+    assert views.declarations[7].initializer is None
+    assert isinstance(views.declarations[1], declarations.FuncDecl)
+    assert [(v.line, v.col) for v in views.declarations] == [(n.line, n.col) for n in prog.declarations]
+    assert to_bytes(views.declarations) == to_bytes(prog.declarations)
+    assert SemanticAnalyzer().analyze(views) == SemanticAnalyzer().analyze(prog)
+    assert CodeGenerator().generate(views) == CodeGenerator().generate(prog)
+
+
+def test_arena_views_run_through_the_whole_pipeline():
+    from lib.semantic.semantic_analyzer import SemanticAnalyzer
+    from lib.codegen.codegen import CodeGenerator
+    from lib.codegen.llvm_codegen import LLVMCodeGenerator
+
+    # Kept to what the LLVM backend supports: no structs or lists.
+    src = """var n: int = 2;
+    func f(a: int, x: float): int { var n: int = a; if (x > 1.5) { var n: int = 10; n += 1; } return n + a; }
+    var r: int = f(5, 2.5); var s: str = "r=" + r;
+    if (true) { var n: int = 7; } loop { n += 1; if (n > 4) { break; } }
+    """
+    stream = Lexer(src).tokenize_stream()
+    results = []
+    for prog in (Parser(stream).parse(), Parser(stream).parse_arena().program()):
+        analyzer = SemanticAnalyzer()
+        errors, annotations = analyzer.annotate(prog)
+        env = CodeGenerator().run(prog, annotations, analyzer.resolution)
+        results.append((
+            errors, len(annotations), [env[k] for k in ("n", "r", "s")],
+            CodeGenerator().generate(prog, annotations, analyzer.resolution),
+            LLVMCodeGenerator().generate(prog, annotations, analyzer.resolution),
+        ))
+    assert results[0][:3] == ([], results[0][1], [5, 10, "r=10"])
+    assert results[1] == results[0]
@@ -135,7 +135,7 @@ def test_return_rules_and_mismatches():
     assert has_err(errors, "Return used outside of function.")
     assert has_err(errors, "Return type mismatch (expected int, got str).")
     assert has_err(errors, "Missing return value (expected int).")
-    assert has_err(errors, "Could not infer return type.")
+    assert has_err(errors, "Struct literal assigned to non-struct type.")
 
 
 def test_builtins_print_and_len():
@@ -228,4 +228,150 @@ def test_semantic_success_parametrized(src: str):
 ])
 def test_semantic_errors_parametrized(src: str, snippet: str):
     errors = analyze(src)
-    assert has_err(errors, snippet)
\ No newline at end of file
+    assert has_err(errors, snippet)
+
+def test_deeply_nested_expressions_are_checked():
+    depth = 5000
+    assert analyze("var v: int = " + "-(" * depth + "1" + ")" * depth + ";") == []
+    errors = analyze("var v: int = " + "-(" * depth + "true" + ")" * depth + ";")
+    assert len(errors) == depth and has_err(errors, "Unary '-' expects numeric operand")
+
+
+def test_unknown_nodes_are_reported():
+    from lib.parser.ast import program, statements, expressions
+
+    class Odd(statements.Statement):
+        pass
+
+    prog = program.Program(declarations=[
+        Odd(line=1, col=2),
+        statements.BlockStmt(statements=[Odd(line=3, col=4)]),
+        expressions.IntLiteral(value=1, line=5, col=6),
+    ])
+    errors = SemanticAnalyzer().analyze(prog)
+    assert len(errors) == 3
+    assert "line 1, column 2: Unknown statement." in errors[0]
+    assert "line 3, column 4: Unknown statement." in errors[1]
+    assert "line 5, column 6: Unknown top-level node." in errors[2]
+
+
+def test_type_universe_interns_types_and_caches_relations():
+    from lib.parser.ast import types
+    from lib.semantic.type_universe import TypeUniverse
+
+    u = TypeUniverse()
+    nested = u.of(types.ListType(element_type=types.ListType(element_type=types.BaseType(name="float"))))
+    assert nested is u.list_of(u.list_of(u.float)) and str(nested) == "list[list[float]]"
+    assert u.named("P") is u.named("P") and [t.id for t in u.types] == list(range(len(u)))
+    assert u.binary_result("+", u.int, u.float) is u.float
+    assert u.binary_result("+", u.named("P"), u.str) is u.str
+    assert u.binary_result("<", u.str, u.str) is u.bool and u.binary_result("&&", u.int, u.bool) is None
+    assert u.is_assignable(nested, u.list_of(u.list_of(u.int)))
+    assert not u.is_assignable(u.list_of(u.int), u.list_of(u.float)) and not u.is_assignable(u.int, u.list_of(u.int))
+
+
+def test_literals_are_checked_against_the_expected_type():
+    src = """
+    struct N { v: int, next: list[N] };
+    func f(xs: list[list[float]], n: N): list[float] { return []; }
+    var a: list[list[float]] = [[], [1, 2.5]];
+    var n: N = {v: 1, next: [{v: 2, next: []}]};
+    a = [[2.5, 1], []];
+    f([[]], {v: 3, next: []});
+    var bad: N = {v: 1, next: [{v: "x", next: []}]};
+    f({v: 1, next: []}, n);
+    """
+    errors = analyze(src)
+    assert len(errors) == 2
+    assert "line 8, column 36: Incompatible type for field 'v' in struct 'N' (expected int, got str)." in errors[0]
+    assert "line 9, column 7: Struct literal assigned to non-struct type." in errors[1]
+
+    # Without an expected type the elements are inferred; only the first mismatch is reported.
+    assert analyze("struct P { x: int }; print([1, {x: 1}, \"s\"]);") == [
+        "Semantic error at line 1, column 32: List literal elements must have a compatible type."
+    ]
+
+    depth = 3000
+    nested = "[" * depth + "1, 2.5" + "]" * depth
+    assert analyze(f"var d: {'list[' * depth}float{']' * depth} = {nested};\nd = {nested};") == []
+
+
+def test_resolver_binds_identifiers_to_depth_and_slot():
+    from lib.semantic.resolver import Binding, Resolver
+
+    src = """
+    var g: int = 1;
+    func f(a: int): int { var b: int = a + g; if (b > 0) { var a: int = b; return a; } return a; }
+    print(h);
+    """
+    ast = Parser(list(Lexer(src).tokenize())).parse()
+    resolution = Resolver().resolve(ast)
+    g, f, _ = ast.declarations
+    inner = f.body.statements[1].then_branch.statements
+    assert resolution.globals == ["print", "len", "g", "f"] and resolution.frame(f) == ["a", "b", "a"]
+    assert resolution.get(f.body.statements[0].initializer.right) == Binding(0, 2)
+    assert resolution.get(inner[0].initializer) == Binding(2, 1)
+    assert resolution.get(inner[1].value) == Binding(3, 2)
+    assert resolution.get(f.body.statements[2].value) == Binding(1, 0)
+    assert resolution.get(ast.declarations[2].expression.arguments[0]) is None
+    analyzer = SemanticAnalyzer()
+    assert analyzer.analyze(ast, resolution) == ["Semantic error at line 4, column 11: Undeclared identifier 'h'. -> 'h'"]
+
+    # Arena views, new objects on every access, are found by arena and index.
+    views = Parser(Lexer(src).tokenize_stream()).parse_arena().program()
+    arena_resolution = Resolver().resolve(views)
+    f = views.declarations[1]
+    assert arena_resolution.frame(f) == ["a", "b", "a"] and len(arena_resolution) == len(resolution)
+    assert arena_resolution.get(f.body.statements[0].initializer.right) == Binding(0, 2)
+
+
+def test_reanalyze_checks_only_edited_declarations_and_their_dependents():
+    from lib.semantic.incremental import analyze_incrementally, reanalyze
+
+    def parse(src: str):
+        return Parser(Lexer(src).tokenize_stream()).parse()
+
+    src = """struct P { x: int };
+func f(a: int): P { return {x: a}; }
+func g(): int { return f(1).x; }
+func h(): int { return y; }
+"""
+    state = analyze_incrementally(parse(src))
+    assert state.checked == 4 and state.errors == analyze(src)
+    assert state.dependents(0) == [1, 2] and state.dependents(1) == [2]
+
+    # A body edit above h: only f is checked, h's error moves down a line.
+    edited = src.replace("return {x: a}; }", "return {x: a};\n}")
+    state = reanalyze(state, parse(edited))
+    assert state.checked == 1 and state.errors == analyze(edited)
+    assert has_err(state.errors, "line 5, column 24: Undeclared identifier 'y'")
+
+    # A field change reaches g through f's return type.
+    edited = edited.replace("x: int", "x: str")
+    state = reanalyze(state, parse(edited))
+    assert state.checked == 3 and state.errors == analyze(edited)
+    assert has_err(state.errors, "line 4, column 17: Return type mismatch (expected int, got str)")
+
+    # Without source positions the nodes themselves are compared.
+    state = reanalyze(state, Parser(list(Lexer(edited).tokenize())).parse())
+    assert state.errors == analyze(edited)
+
+
+def test_parallel_analysis_merges_body_errors_in_source_order(monkeypatch):
+    import lib.semantic.parallel as parallel
+
+    monkeypatch.setattr(parallel, "MIN_CHUNK_FUNCTIONS", 1)
+    src = """struct P { x: int };
+func f0(a: int): int { return later; }
+var g: int = "g";
+func f1(): P { return {x: 1.5}; }
+print(f1().y);
+func f1(): int { return "no body check"; }
+func f2(): int { var p: P = f1(); return p.x + g; }
+func f3(): str { return later; }
+var later: str = "l";
+"""
+    ast = Parser(Lexer(src).tokenize_stream()).parse()
+    errors = parallel.analyze_parallel(ast, workers=2)
+    assert errors == analyze(src)
+    assert len(errors) == 8 and has_err(errors, "line 8, column 25: Undeclared identifier 'later'")